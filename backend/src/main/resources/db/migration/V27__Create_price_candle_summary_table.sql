@@ -0,0 +1,34 @@
+-- V27: 종목별 가격 데이터 보유 현황 요약 테이블
+-- 목적: "기간 [a, b]에 종목 X 데이터가 있는가"를 price_candle 범위 조회 대신 기본 키 조회 한 번으로 확인
+-- 갱신: scripts/enhance-price-data.py가 적재 트랜잭션마다 함께 갱신 (다른 경로로 price_candle을 바꾼 뒤에는
+--       enhance-price-data.py --rebuild-summary로 재집계)
+
+CREATE TABLE IF NOT EXISTS price_candle_summary (
+    ticker VARCHAR(10) NOT NULL COMMENT '종목 코드',
+    timeframe ENUM('DAILY', 'WEEKLY', 'MONTHLY') NOT NULL COMMENT '봉 주기',
+    first_date DATE NOT NULL COMMENT '최초 거래일',
+    last_date DATE NOT NULL COMMENT '최종 거래일',
+    row_count INT NOT NULL COMMENT '캔들 수',
+    last_close DECIMAL(10,2) NOT NULL COMMENT '최종 거래일 종가',
+    min_close DECIMAL(10,2) NOT NULL COMMENT '최저 종가',
+    max_close DECIMAL(10,2) NOT NULL COMMENT '최고 종가',
+    checksum BIGINT UNSIGNED NOT NULL COMMENT '행 CRC32 합계 (내용 비교용)',
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '마지막 갱신 시각',
+    PRIMARY KEY (ticker, timeframe)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='종목별 가격 데이터 보유 현황 요약';
+
+-- 기존 데이터로 초기화
+-- enhance-price-data.py가 이 마이그레이션보다 먼저 실행되면 테이블을 직접 만들고 채워 두므로,
+-- 이미 있는 요약 행은 그대로 두고 없는 종목만 채운다 (스크립트가 적재마다 갱신한 값이 최신)
+INSERT IGNORE INTO price_candle_summary
+    (ticker, timeframe, first_date, last_date, row_count, last_close, min_close, max_close, checksum)
+SELECT s.ticker, s.timeframe, s.first_date, s.last_date, s.row_count,
+       c.close_price, s.min_close, s.max_close, s.checksum
+FROM (
+    SELECT ticker, timeframe, MIN(date) AS first_date, MAX(date) AS last_date, COUNT(*) AS row_count,
+           MIN(close_price) AS min_close, MAX(close_price) AS max_close,
+           SUM(CRC32(CONCAT_WS('|', date, open_price, high_price, low_price, close_price, volume))) AS checksum
+    FROM price_candle
+    GROUP BY ticker, timeframe
+) s
+JOIN price_candle c ON c.ticker = s.ticker AND c.date = s.last_date AND c.timeframe = s.timeframe;
@@ -9,19 +9,741 @@ DCA 시뮬레이션을 위한 한국 주요 종목 과거 데이터 생성
 """
 
 import mysql.connector
+from mysql.connector import pooling
 import pandas as pd
 import numpy as np
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-import random
+import argparse
+import asyncio
+import hashlib
+import json
 import math
 import logging
+import os
+import queue
+import threading
+import time
+import zlib
+
+try:
+    import aiomysql  # 비동기 적재(--async)에서만 사용
+except ImportError:
+    aiomysql = None
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 시나리오별 일별 수익률 분포 (평균, 표준편차, 전체 기간 누적 추세)
+MARKET_SCENARIOS = {
+    'bull': {'mean': 0.001, 'std': 0.02, 'trend': 0.8},       # 상승장: 80% 상승 추세
+    'bear': {'mean': -0.001, 'std': 0.025, 'trend': -0.4},    # 하락장: 40% 하락 추세
+    'sideways': {'mean': 0.0, 'std': 0.015, 'trend': 0.0}     # 횡보장: 변동성은 있지만 평평
+}
+
+# 혼합 시나리오 구간별 (평균, 표준편차): 상승, 하락, 횡보
+MIXED_SEGMENTS = np.array([
+    [0.002, 0.02],
+    [-0.003, 0.03],
+    [0.0, 0.015]
+])
+
+# 특별 이벤트 수익률 (±5%, ±8%)
+EVENT_MAGNITUDES = np.array([-0.08, -0.05, 0.05, 0.08])
+
+# 종목별 난수 하위 스트림 - 용도별로 독립된 SeedSequence 자식을 사용하므로
+# 한 용도의 난수 사용량이 바뀌어도 다른 용도의 난수열은 그대로 유지된다.
+# 용도마다 스트림이 따로 있으므로 청크 단위로 나눠 뽑아도 한 번에 뽑은 것과 같다
+NOISE_STREAMS = ('scenario', 'segments', 'returns', 'event', 'event_magnitude', 'high', 'low', 'gap', 'volume')
+
+# 카운터 모드: 거래일 하나당 Philox 블록(64비트 x 4) 3개 = 균등 난수 12개를 고정 배정
+COUNTER_SLOTS_PER_DAY = 12
+
+# 종목군별 기본 생성 기간 (카운터 모드에서는 거래일 번호의 기준이 된다)
+KOREAN_HISTORY = ('2019-01-02', '2024-12-31')
+GLOBAL_HISTORY = ('2018-01-01', '2024-12-31')
+
+# 스트리밍 생성 시 청크당 최대 행 수
+DEFAULT_CHUNK_ROWS = 50000
+
+# 누락 구간 보강용 난수 스트림 구분 키 (종목 spawn_key 뒤에 붙여 하위 스트림 번호와 구분)
+GAP_FILL_STREAM_KEY = 0x67617066
+
+# 파이프라인 내부 캔들 행 표현 (행당 48바이트)
+# 종목 코드/날짜/타임프레임 문자열 대신 정수 열로 보관하고, 딕셔너리나 튜플은
+# DB 드라이버에 넘기는 시점에만 만든다
+CANDLE_DTYPE = np.dtype([
+    ('ticker_id', np.int32),   # 함께 전달되는 종목 코드 리스트의 인덱스
+    ('day', np.int32),         # 1970-01-01 기준 일수
+    ('open', np.int64),        # 가격은 x100 고정소수점 (DECIMAL(10,2))
+    ('high', np.int64),
+    ('low', np.int64),
+    ('close', np.int64),
+    ('volume', np.int64)
+])
+PRICE_SCALE = 100
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+# 삽입 전 검증 범위: DECIMAL(10,2) 최댓값(x100), 거래량 상한 (BIGINT 이내의 비정상 값 차단용)
+MAX_PRICE_CENTS = 10 ** 10 - 1
+MAX_CANDLE_VOLUME = 10 ** 12
+
+# LOAD DATA LOCAL INFILE을 서버/클라이언트가 거부할 때의 오류 코드
+# 1148: ER_NOT_ALLOWED_COMMAND, 2068: CR_LOAD_DATA_LOCAL_INFILE_REJECTED,
+# 3948: ER_CLIENT_LOCAL_FILES_DISABLED, 3950: ER_LOAD_DATA_LOCAL_INFILE_DISABLED(서버)
+LOCAL_INFILE_REFUSED_ERRNOS = {1148, 2068, 3948, 3950}
+
+# upsert 모드 갱신절 - 값이 같은 행은 MySQL이 변경 없이 건너뛰므로
+# OHLCV가 실제로 달라진 행만 다시 쓰인다 (유니크 키 열은 그대로라 보조 인덱스도 유지)
+UPSERT_CLAUSE = """
+        ON DUPLICATE KEY UPDATE
+            open_price = VALUES(open_price),
+            high_price = VALUES(high_price),
+            low_price = VALUES(low_price),
+            close_price = VALUES(close_price),
+            volume = VALUES(volume)"""
+
+# 다중 행 INSERT 기본값: 문장당 행 수, 커밋 간격(행)
+DEFAULT_BATCH_ROWS = 1000
+DEFAULT_COMMIT_ROWS = 10000
+
+# max_allowed_packet 대비 문장 크기 계산용 행당 최대 바이트 추정치
+# (종목 코드 10자, 날짜, DECIMAL(10,2) 가격 4개, BIGINT 거래량, 따옴표/구분자 포함)
+INSERT_ROW_BYTES_ESTIMATE = 128
+
+# 분할 삭제: 청크당 삭제 행 수, 진행 로그 간격(청크)
+DEFAULT_DELETE_CHUNK_ROWS = 5000
+DELETE_PROGRESS_CHUNKS = 10
+
+# 내용 해시 동기화: 행 해시 (DB 쪽 식 - _candle_row_hashes와 같은 문자열의 CRC32)
+ROW_HASH_SQL = "CRC32(CONCAT_WS('|', date, open_price, high_price, low_price, close_price, volume))"
+
+# 행 해시 배열 계산용 CRC32 바이트 테이블 (zlib.crc32와 같은 다항식 0xEDB88320)
+CRC32_TABLE = np.arange(256, dtype=np.uint32)
+for _ in range(8):
+    CRC32_TABLE = np.where(CRC32_TABLE & 1, (CRC32_TABLE >> 1) ^ np.uint32(0xEDB88320), CRC32_TABLE >> 1)
+CRC32_TABLE = CRC32_TABLE.astype(np.uint32)
+
+# 부하 기반 쓰기 조절: 확인할 서버 상태 변수
+THROTTLE_STATUS_VARIABLES = ('Threads_running', 'Innodb_buffer_pool_pages_dirty',
+                             'Innodb_buffer_pool_pages_total', 'Innodb_buffer_pool_wait_free')
+
+# 무중단 전체 교체용 테이블 - 섀도 테이블에 적재 후 RENAME TABLE로 교체, 이전 테이블은 롤백용으로 보관
+LIVE_TABLE = 'price_candle'
+STAGING_TABLE = 'price_candle_staging'
+RETIRED_TABLE = 'price_candle_old'
+# 섀도 테이블 복사 청크 (id 범위 폭)와 교체 직전 따라잡기 때 다시 훑는 id 여유폭
+# (먼저 id를 받고 늦게 커밋된 행까지 잡도록 마지막으로 본 id보다 이만큼 앞에서부터 복사)
+STAGING_COPY_CHUNK_IDS = 20000
+STAGING_CATCHUP_OVERLAP_IDS = 10000
+
+# 일봉에서 함께 만드는 상위 봉 주기 - 봉 날짜는 기간 시작일(주봉: 월요일, 월봉: 1일)
+ROLLUP_TIMEFRAMES = ('WEEKLY', 'MONTHLY')
+
+# 종목별 보유 현황 요약 테이블 - (ticker, timeframe) 기본 키 조회 한 번으로 기간 내 데이터 유무 확인
+SUMMARY_TABLE = 'price_candle_summary'
+# 요약 재집계 시 문장당 요약 행 수와 한 번에 다시 집계하는 종목 수
+SUMMARY_WRITE_ROWS = 500
+
+# 인덱스별 삽입 비용 측정용 임시 테이블과 표본 행 수
+INDEX_PROBE_TABLE = 'price_candle_index_probe'
+INDEX_PROBE_ROWS = 20000
+
+# 적재 동안 내려 둔 보조 인덱스 정의 기록 - 프로세스가 죽어도 --restore-indexes로 재생성
+DEFERRED_INDEX_TABLE = 'price_candle_deferred_index'
+
+# 스트리밍 검증: 한 번에 가져올 행 수, 표본 검증 블록 크기(id 범위), 분위수 스케치 상대 오차
+VERIFY_FETCH_ROWS = 10000
+VERIFY_SAMPLE_BLOCK_ROWS = 1000
+QUANTILE_SKETCH_ACCURACY = 0.01
+
+
+class _CandleStats:
+    """
+    스트리밍 검증용 (종목, timeframe)별 누적 통계
+
+    배치 단위로 받아 갱신하며 메모리는 행 수와 무관하다.
+    - 종가 개수/최소/최대/평균/표준편차: 배치 모멘트 병합 (Chan 방식)
+    - 종가 분위수: 로그 버킷 스케치 (상대 오차 QUANTILE_SKETCH_ACCURACY)
+    - 거래일 누락/중복: 최초~최종일 일자 비트맵
+    - OHLC 관계 오류 행 수
+    """
+
+    def __init__(self, track_days=True):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets = {}
+        self.invalid = 0
+        self.duplicates = 0
+        self.track_days = track_days
+        self.day_base = None
+        self.day_seen = np.zeros(0, dtype=bool)
+
+    def update(self, days, open_prices, high_prices, low_prices, close_prices):
+        """배치 반영 (가격은 원 단위 float 배열, days는 epoch 일 정수 배열)"""
+        count = len(close_prices)
+        batch_mean = float(close_prices.mean())
+        batch_m2 = float(((close_prices - batch_mean) ** 2).sum())
+        total = self.count + count
+        delta = batch_mean - self.mean
+        self.m2 += batch_m2 + delta * delta * self.count * count / total
+        self.mean += delta * count / total
+        self.count = total
+        self.min = min(self.min, float(close_prices.min()))
+        self.max = max(self.max, float(close_prices.max()))
+
+        # 0 이하 가격은 버킷 None으로 모은다
+        gamma_log = math.log((1 + QUANTILE_SKETCH_ACCURACY) / (1 - QUANTILE_SKETCH_ACCURACY))
+        positive = close_prices > 0
+        indexes, counts = np.unique(np.ceil(np.log(close_prices[positive]) / gamma_log).astype(np.int64),
+                                    return_counts=True)
+        for index, bucket_count in zip(indexes.tolist(), counts.tolist()):
+            self.buckets[index] = self.buckets.get(index, 0) + bucket_count
+        if not positive.all():
+            self.buckets[None] = self.buckets.get(None, 0) + int((~positive).sum())
+
+        self.invalid += int(((low_prices > high_prices) | (close_prices > high_prices) | (close_prices < low_prices) |
+                             (open_prices > high_prices) | (open_prices < low_prices)).sum())
+        if self.track_days:
+            self._mark_days(days)
+
+    def _mark_days(self, days):
+        low, high = int(days.min()), int(days.max())
+        if self.day_base is None:
+            self.day_base = low
+        if low < self.day_base:
+            self.day_seen = np.concatenate([np.zeros(self.day_base - low, dtype=bool), self.day_seen])
+            self.day_base = low
+        if high - self.day_base >= len(self.day_seen):
+            self.day_seen = np.concatenate(
+                [self.day_seen, np.zeros(high - self.day_base + 1 - len(self.day_seen), dtype=bool)])
+
+        positions = days - self.day_base
+        unique_positions = np.unique(positions)
+        self.duplicates += len(positions) - len(unique_positions) + int(self.day_seen[unique_positions].sum())
+        self.day_seen[unique_positions] = True
+
+    @property
+    def std(self):
+        """표본 표준편차"""
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+    def quantile(self, q):
+        """종가 q 분위수 추정값"""
+        gamma = (1 + QUANTILE_SKETCH_ACCURACY) / (1 - QUANTILE_SKETCH_ACCURACY)
+        rank = q * (self.count - 1)
+        cumulative = self.buckets.get(None, 0)
+        if rank < cumulative:
+            return 0.0
+        for index in sorted(key for key in self.buckets if key is not None):
+            cumulative += self.buckets[index]
+            if rank < cumulative:
+                return 2 * gamma ** index / (gamma + 1)
+        return self.max
+
+    def date_range(self):
+        """(최초일, 최종일) datetime.date - 일자를 추적하지 않으면 (None, None)"""
+        if self.day_base is None:
+            return None, None
+        present = np.flatnonzero(self.day_seen)
+        first = np.datetime64(self.day_base + int(present[0]), 'D')
+        last = np.datetime64(self.day_base + int(present[-1]), 'D')
+        return first.item(), last.item()
+
+    def gaps(self):
+        """
+        최초~최종일 사이 빠진 거래일(평일)
+
+        Returns:
+            tuple: (빠진 거래일 수, 누락 구간 수, 가장 긴 누락 구간 일수)
+        """
+        if self.day_base is None:
+            return 0, 0, 0
+        present = np.flatnonzero(self.day_seen)
+        span = np.arange(self.day_base + present[0], self.day_base + present[-1] + 1).astype('datetime64[D]')
+        # 주말이 누락 구간을 끊지 않도록 평일만 남겨 연속 구간을 센다
+        missing = ~self.day_seen[present[0]:present[-1] + 1][np.is_busday(span)]
+        if not missing.any():
+            return 0, 0, 0
+        edges = np.diff(np.r_[0, missing.astype(np.int8), 0])
+        lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+        return int(missing.sum()), len(lengths), int(lengths.max())
+
+
+class _SegmentLabelStream:
+    """
+    혼합 시나리오 구간 라벨(상승/하락/횡보)을 순차적으로 생성
+
+    고정 크기 블록마다 남은 구간 개수에서 다변량 초기하분포로 블록 내 개수를 뽑고
+    블록 안에서 섞는다. 전체 라벨을 한 번에 섞은 것과 분포가 같으면서 메모리는
+    블록 크기만큼만 쓰고, 블록 크기가 고정이라 청크 크기와 관계없이 결과가 같다.
+    """
+
+    BLOCK_DAYS = 1024
+
+    def __init__(self, rng, days):
+        bull_period = days // 3
+        bear_period = days // 4
+        self.rng = rng
+        self.remaining = np.array([bull_period, bear_period, days - bull_period - bear_period], dtype=np.int64)
+        self.buffer = np.empty(0, dtype=np.int64)
+
+    def take(self, days):
+        while len(self.buffer) < days and self.remaining.sum() > 0:
+            block = int(min(self.BLOCK_DAYS, self.remaining.sum()))
+            counts = self.rng.multivariate_hypergeometric(self.remaining, block)
+            self.remaining -= counts
+            self.buffer = np.concatenate([self.buffer, self.rng.permutation(np.repeat([0, 1, 2], counts))])
+
+        labels, self.buffer = self.buffer[:days], self.buffer[days:]
+        return labels
+
+
+class _TickerNoiseStream:
+    """종목 하나의 순차 난수 스트림 - 청크마다 이어서 추출"""
+
+    def __init__(self, rngs, history_days):
+        self.rngs = rngs
+        self.scenario = rngs['scenario'].random()
+        self.segments = _SegmentLabelStream(rngs['segments'], history_days)
+
+    def draw(self, days):
+        rngs = self.rngs
+        return {
+            'scenario': self.scenario,                                # 시나리오 선택
+            'segments': self.segments.take(days),                     # 혼합 시나리오 구간 배치
+            'returns': rngs['returns'].standard_normal(days),         # 일별 수익률
+            'event': rngs['event'].random(days),                      # 특별 이벤트 발생 여부
+            'event_magnitude': (rngs['event_magnitude'].random(days) * len(EVENT_MAGNITUDES)).astype(np.int64),
+            'high': rngs['high'].standard_normal(days),               # 고가 변동폭
+            'low': rngs['low'].standard_normal(days),                 # 저가 변동폭
+            'gap': rngs['gap'].random(days),                          # 시가 갭
+            'volume': 100000 + (rngs['volume'].random(days) * 400001).astype(np.int64)  # 기본 거래량
+        }
+
+
+class _CounterNoiseStream:
+    """
+    카운터 기반(Philox) 난수 스트림 - 거래일 번호로 바로 접근
+
+    Philox 키는 (시드, 종목 코드)로, 카운터는 거래일 번호로 정해지고 거래일마다
+    균등 난수 COUNTER_SLOTS_PER_DAY개를 고정으로 쓴다. 정규 난수도 Box-Muller로
+    만들어 사용량이 일정하므로, 어느 거래일부터 뽑든 전체 경로의 같은 위치와 같은
+    값이 나온다. 혼합 시나리오 구간 라벨은 순열 대신 같은 비율(1/3, 1/4, 나머지)의
+    독립 추출로 정한다.
+    """
+
+    def __init__(self, key, scenario, day_offset=0):
+        self.key = key
+        self.scenario = scenario
+        self.day_offset = day_offset
+
+    def draw(self, days):
+        counter = [self.day_offset * (COUNTER_SLOTS_PER_DAY // 4), 0, 0, 0]
+        uniforms = np.random.Generator(np.random.Philox(key=self.key, counter=counter)).random(
+            (days, COUNTER_SLOTS_PER_DAY)).T
+        self.day_offset += days
+
+        # Box-Muller 변환 (균등 난수 2개 -> 정규 난수 2개)
+        radius_a = np.sqrt(-2.0 * np.log1p(-uniforms[0]))
+        radius_b = np.sqrt(-2.0 * np.log1p(-uniforms[2]))
+
+        return {
+            'scenario': self.scenario,
+            'segments': np.searchsorted([1 / 3, 1 / 3 + 1 / 4], uniforms[8], side='right'),
+            'returns': radius_a * np.cos(2 * np.pi * uniforms[1]),
+            'event': uniforms[4],
+            'event_magnitude': (uniforms[5] * len(EVENT_MAGNITUDES)).astype(np.int64),
+            'high': radius_a * np.sin(2 * np.pi * uniforms[1]),
+            'low': radius_b * np.cos(2 * np.pi * uniforms[3]),
+            'gap': uniforms[6],
+            'volume': 100000 + (uniforms[7] * 400001).astype(np.int64)
+        }
+
+
+def replica_lag_probe(connect):
+    """
+    SHOW REPLICA STATUS 기반 복제 지연 측정 함수 생성
+
+    Args:
+        connect: 복제 서버 연결을 돌려주는 함수
+
+    Returns:
+        callable: 호출할 때마다 지연(초)을 돌려주는 함수 - 복제 서버가 아니거나 측정 실패면 None
+    """
+    def probe():
+        try:
+            conn = connect()
+        except Exception as e:
+            logger.warning(f"복제 지연 측정 연결 실패: {e}")
+            return None
+
+        cursor = conn.cursor(dictionary=True)
+        try:
+            try:
+                cursor.execute("SHOW REPLICA STATUS")
+            except mysql.connector.Error:
+                # 8.0.22 이전 서버
+                cursor.execute("SHOW SLAVE STATUS")
+            lags = [row.get('Seconds_Behind_Source', row.get('Seconds_Behind_Master')) for row in cursor.fetchall()]
+            lags = [lag for lag in lags if lag is not None]
+            return max(lags) if lags else None
+        except Exception as e:
+            logger.warning(f"복제 지연 측정 실패: {e}")
+            return None
+        finally:
+            cursor.close()
+            conn.close()
+
+    return probe
+
+
+class ThrottleController:
+    """
+    DB 부하와 복제 지연에 맞춰 쓰기 속도를 조절하는 컨트롤러
+
+    커밋할 때마다 after_batch(행 수)를 부르면 sample_interval초마다 SHOW GLOBAL
+    STATUS(실행 중 스레드, 더티 페이지 비율, 버퍼 풀 빈 페이지 대기)와 lag_probe로 잰
+    복제 지연을 확인한다. 한도를 넘으면 배치 크기를 절반으로 줄이고 배치 사이 대기를
+    두 배로 늘리며, 여유가 있으면 조금씩 되돌린다. max_rows_per_sec가 있으면 초당 행
+    수도 그 이하로 맞춘다. 여러 삽입 스레드가 하나를 같이 써도 된다. 대기 중에 잠금을
+    쥐고 있지 않도록 트랜잭션 안(커밋 전)에서는 부르지 않는다.
+
+    connect는 상태 확인 전용 연결을 돌려주는 함수다. 삽입 스레드들이 커넥션 풀을 다 쓰고
+    있을 때도 확인이 막히지 않도록 풀과 별개의 연결을 넘기고, 컨트롤러가 한 번 열어
+    재사용한다 (실패하면 닫고 다음 확인 때 다시 연다). 확인은 잠금 밖에서 한 스레드만
+    하고, 그동안 다른 스레드는 직전 설정대로 계속 쓴다.
+
+    lag_probe는 지연(초) 또는 None을 돌려주는 인자 없는 함수면 무엇이든 된다
+    (기본 구현: replica_lag_probe).
+    """
+
+    def __init__(self, connect, max_rows_per_sec=None, max_lag_seconds=None, lag_probe=None,
+                 max_threads_running=32, max_dirty_ratio=0.5, batch_rows=DEFAULT_BATCH_ROWS,
+                 min_batch_rows=50, max_pause=5.0, sample_interval=1.0):
+        self.connect = connect
+        self.max_rows_per_sec = max_rows_per_sec
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_probe = lag_probe
+        self.max_threads_running = max_threads_running
+        self.max_dirty_ratio = max_dirty_ratio
+        self.max_batch_rows = batch_rows
+        self.min_batch_rows = min(min_batch_rows, batch_rows)
+        self.max_pause = max_pause
+        self.sample_interval = sample_interval
+
+        # 현재 배치 크기와 배치 사이 대기(초)
+        self.batch_rows = batch_rows
+        self.pause = 0.0
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._sampling = False
+        self._sampled_at = 0.0
+        self._next_slot = 0.0
+        self._wait_free = None
+        self._overloaded = False
+
+    def _sample(self):
+        """서버 상태와 복제 지연을 확인해 한도를 넘은 항목 설명 목록 반환"""
+        reasons = []
+        try:
+            if self._conn is None:
+                self._conn = self.connect()
+            cursor = self._conn.cursor()
+            try:
+                placeholders = ', '.join(['%s'] * len(THROTTLE_STATUS_VARIABLES))
+                cursor.execute(f"SHOW GLOBAL STATUS WHERE Variable_name IN ({placeholders})",
+                               THROTTLE_STATUS_VARIABLES)
+                status = {name: int(value) for name, value in cursor.fetchall()}
+            finally:
+                cursor.close()
+        except Exception as e:
+            logger.warning(f"서버 상태 확인 실패: {e}")
+            self.close()
+            status = {}
+
+        threads_running = status.get('Threads_running', 0)
+        if threads_running > self.max_threads_running:
+            reasons.append(f"실행 중 스레드 {threads_running}")
+
+        pages_total = status.get('Innodb_buffer_pool_pages_total', 0)
+        if pages_total:
+            dirty_ratio = status.get('Innodb_buffer_pool_pages_dirty', 0) / pages_total
+            if dirty_ratio > self.max_dirty_ratio:
+                reasons.append(f"더티 페이지 {dirty_ratio:.0%}")
+
+        # 빈 페이지를 기다린 횟수가 늘었다면 버퍼 풀이 쓰기를 못 따라가는 중
+        wait_free = status.get('Innodb_buffer_pool_wait_free')
+        if wait_free is not None:
+            if self._wait_free is not None and wait_free > self._wait_free:
+                reasons.append(f"버퍼 풀 빈 페이지 대기 +{wait_free - self._wait_free}")
+            self._wait_free = wait_free
+
+        if self.lag_probe is not None and self.max_lag_seconds is not None:
+            lag = self.lag_probe()
+            if lag is not None and lag > self.max_lag_seconds:
+                reasons.append(f"복제 지연 {lag}초")
+        return reasons
+
+    def _adjust(self, reasons):
+        """과부하면 배치 축소/대기 증가, 아니면 점진 복구"""
+        if reasons:
+            self.batch_rows = max(self.min_batch_rows, self.batch_rows // 2)
+            self.pause = min(self.max_pause, max(self.pause * 2, 0.1))
+            if not self._overloaded:
+                logger.warning(f"쓰기 속도 낮춤 ({', '.join(reasons)}) - 배치 {self.batch_rows}행, 대기 {self.pause:.2f}초")
+        else:
+            self.batch_rows = min(self.max_batch_rows, self.batch_rows + max(1, self.batch_rows // 4))
+            self.pause = self.pause / 2 if self.pause > 0.01 else 0.0
+            if self._overloaded:
+                logger.info(f"쓰기 속도 복구 중 - 배치 {self.batch_rows}행, 대기 {self.pause:.2f}초")
+        self._overloaded = bool(reasons)
+
+    def close(self):
+        """상태 확인 전용 연결 닫기"""
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def after_batch(self, rows):
+        """배치 하나를 쓴 뒤 호출 - 필요하면 상태를 다시 확인하고, 한도에 맞게 대기"""
+        with self._lock:
+            sample = not self._sampling and time.monotonic() - self._sampled_at >= self.sample_interval
+            self._sampling = self._sampling or sample
+
+        if sample:
+            reasons = []
+            try:
+                reasons = self._sample()
+            finally:
+                with self._lock:
+                    self._adjust(reasons)
+                    self._sampled_at = time.monotonic()
+                    self._sampling = False
+
+        with self._lock:
+            now = time.monotonic()
+            delay = self.pause
+            if self.max_rows_per_sec:
+                # 초당 행 수 제한 - 다음 배치를 시작해도 되는 시각을 행 수만큼 뒤로
+                self._next_slot = max(self._next_slot, now) + rows / self.max_rows_per_sec
+                delay = max(delay, self._next_slot - now)
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FileLoadJournal:
+    """
+    적재 진행 저널 - 로컬 JSON Lines 파일
+
+    항목 하나가 한 줄이며 추가만 한다. 여러 삽입 스레드가 같이 써도 된다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def entries(self, load_keys):
+        """load_key가 load_keys에 속하는 항목 목록 (기록 순)"""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding='utf-8') as journal_file:
+            rows = [json.loads(line) for line in journal_file if line.strip()]
+        return [row for row in rows if row['load_key'] in load_keys]
+
+    def record(self, entry):
+        """항목 추가"""
+        with self._lock, open(self.path, 'a', encoding='utf-8') as journal_file:
+            journal_file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            journal_file.flush()
+
+    def latest_seed(self):
+        """마지막으로 기록된 실행의 시드 (없으면 None)"""
+        if not os.path.exists(self.path):
+            return None
+        seed = None
+        with open(self.path, encoding='utf-8') as journal_file:
+            for line in journal_file:
+                if line.strip():
+                    seed = json.loads(line)['seed']
+        return None if seed is None else int(seed)
+
+
+class TableLoadJournal:
+    """적재 진행 저널 - price_candle_load_journal 테이블"""
+
+    def __init__(self, connect):
+        self.connect = connect
+        self._created = False
+
+    def _cursor_call(self, action):
+        conn = self.connect()
+        cursor = conn.cursor()
+        try:
+            if not self._created:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS price_candle_load_journal (
+                        id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                        load_key CHAR(16) NOT NULL,
+                        ticker VARCHAR(10) NOT NULL,
+                        entry ENUM('START', 'CHUNK', 'DONE') NOT NULL,
+                        start_date DATE NULL,
+                        end_date DATE NULL,
+                        row_count INT NOT NULL DEFAULT 0,
+                        seed VARCHAR(40) NOT NULL,
+                        params JSON NULL,
+                        created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        INDEX idx_price_candle_load_journal_key (load_key, ticker)
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                """)
+                self._created = True
+            result = action(cursor)
+            conn.commit()
+            return result
+        finally:
+            cursor.close()
+            conn.close()
+
+    def entries(self, load_keys):
+        """load_key가 load_keys에 속하는 항목 목록 (기록 순)"""
+        if not load_keys:
+            return []
+        columns = ('load_key', 'ticker', 'entry', 'start_date', 'end_date', 'row_count', 'seed')
+
+        def fetch(cursor):
+            placeholders = ', '.join(['%s'] * len(load_keys))
+            cursor.execute(f"""
+                SELECT {', '.join(columns)}
+                FROM price_candle_load_journal
+                WHERE load_key IN ({placeholders})
+                ORDER BY id
+            """, tuple(load_keys))
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        return self._cursor_call(fetch)
+
+    def record(self, entry):
+        """항목 추가"""
+        def insert(cursor):
+            cursor.execute("""
+                INSERT INTO price_candle_load_journal
+                    (load_key, ticker, entry, start_date, end_date, row_count, seed, params)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """, (entry['load_key'], entry['ticker'], entry['entry'], entry.get('start_date'),
+                  entry.get('end_date'), entry.get('row_count', 0), entry['seed'],
+                  json.dumps(entry['params']) if entry.get('params') else None))
+
+        self._cursor_call(insert)
+
+    def latest_seed(self):
+        """마지막으로 기록된 실행의 시드 (없으면 None)"""
+        def fetch(cursor):
+            cursor.execute("SELECT seed FROM price_candle_load_journal ORDER BY id DESC LIMIT 1")
+            row = cursor.fetchone()
+            return int(row[0]) if row else None
+
+        return self._cursor_call(fetch)
+
+
 class PriceDataEnhancer:
-    def __init__(self):
+    def __init__(self, seed=None, workers=1, writers=None, rng_mode='stream', chunk_rows=DEFAULT_CHUNK_ROWS,
+                 pool_size=None, pool_timeout=30, loader='insert',
+                 batch_rows=DEFAULT_BATCH_ROWS, commit_rows=DEFAULT_COMMIT_ROWS, write_mode='replace',
+                 incremental=False, dry_run=False, swap=False, defer_indexes=False,
+                 pipeline=False, queue_depth=None,
+                 delete_chunk_rows=DEFAULT_DELETE_CHUNK_ROWS, delete_pause=0.0, throttle=None, journal=None,
+                 verify_sample=None, validate='repair', summary=True, rollups=True):
+        # 실행 단위 난수 시드 - 종목별 난수 생성기는 (시드, 종목 코드)로 결정되므로
+        # 워커 수나 처리 순서와 관계없이 같은 시드면 같은 데이터가 생성된다
+        self.seed = seed if seed is not None else np.random.SeedSequence().entropy
+
+        # 난수 모드: 'stream'(종목별 순차 스트림), 'counter'(거래일 번호로 접근하는 Philox)
+        self.rng_mode = rng_mode
+
+        # 카운터 모드 구간 생성용 월초 앵커 종가 캐시 {종목 코드: {...}}
+        self.window_anchors = {}
+
+        # 스트리밍 생성 시 청크당 최대 행 수
+        self.chunk_rows = max(1, chunk_rows)
+
+        # 병렬 처리 설정: 생성 프로세스 수, 삽입용 DB 연결 수
+        self.workers = max(1, workers)
+        self.writers = max(1, writers if writers is not None else self.workers)
+
+        # 생성/삽입 파이프라인: 생성 결과를 크기 제한 큐로 삽입 스레드에 넘긴다 (workers가 2 이상이면 항상 사용)
+        self.pipeline = pipeline
+        self.queue_depth = max(1, queue_depth or self.writers * 2)
+
+        # 분할 삭제: 청크마다 커밋하고 delete_pause초 쉬어 잠금과 언두 로그, 복제 이벤트 크기를 제한
+        self.delete_chunk_rows = max(1, delete_chunk_rows)
+        self.delete_pause = max(0.0, delete_pause)
+
+        # 부하 기반 쓰기 조절 (ThrottleController) - None이면 조절 없이 최대 속도
+        self.throttle = throttle
+
+        # 적재 진행 저널 (FileLoadJournal, TableLoadJournal) - 재실행 시 끝난 종목/청크는 건너뜀
+        self.journal = journal
+        self._journal_progress = {}
+        self._journal_lock = threading.Lock()
+
+        # 품질 검증 표본 비율 (None이면 전체 스트리밍 검증, 0~1이면 id 블록 표본 검증)
+        self.verify_sample = verify_sample
+
+        # 삽입 전 캔들 검증: 'repair'(고칠 수 있는 행은 보정, 나머지 행 제외), 'reject'(위반 청크 거부), 'off'
+        self.validate = validate
+
+        # 요약 테이블(SUMMARY_TABLE) 유지 여부 - 쓰기 트랜잭션마다 변경분을 반영하고 계획 수립 시 조회
+        self.summary = summary
+        self._summary_ready = False
+        self._summary_lock = threading.Lock()
+        # 변경분만으로 요약을 정할 수 없어 적재 후 다시 집계할 종목 (flush_summary)
+        self._summary_stale = set()
+
+        # 일봉과 함께 적재할 주봉/월봉 (빈 튜플이면 일봉만)
+        self.rollups = ROLLUP_TIMEFRAMES if rollups else ()
+
+        # 커넥션 풀 설정 - 실행 전체에서 연결을 재사용 (삽입 연결 수 + 조회용 1개, 최대 32)
+        self.pool_size = min(pool_size or max(self.writers + 1, 5), pooling.CNX_POOL_MAXSIZE)
+        self.pool_timeout = pool_timeout
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+        # 삽입 방식: 'insert'(다중 행 INSERT), 'infile'(LOAD DATA LOCAL INFILE, 거부 시 INSERT로 대체)
+        self.loader = loader
+        self._local_infile_enabled = loader == 'infile'
+
+        # 다중 행 INSERT 설정: 문장당 행 수, 커밋 간격(행) - 커밋된 구간은 실패해도 유지
+        self.batch_rows = max(1, batch_rows)
+        self.commit_rows = max(1, commit_rows)
+        self._max_allowed_packet = None
+
+        # 쓰기 방식: 'replace'(종목 삭제 후 재삽입), 'upsert'(uk_price_candle_ticker_date 기준 갱신)
+        self.write_mode = write_mode
+
+        # 증분 모드: 기존 데이터를 유지하고 빠진 거래일만 저장된 종가에 이어서 생성
+        self.incremental = incremental
+
+        # 드라이런: 실행 계획만 출력하고 DB에는 쓰지 않음
+        self.dry_run = dry_run
+
+        # 교체 모드: 섀도 테이블에 전체 적재 후 원자적 RENAME TABLE로 교체
+        self.swap = swap
+        # 삽입 대상 테이블 (교체 모드 적재 중에는 섀도 테이블)
+        self.target_table = LIVE_TABLE
+
+        # 대량 적재 전 비고유 보조 인덱스를 삭제하고 적재 후 한 번에 재생성
+        self.defer_indexes = defer_indexes
+
         self.db_config = {
             'host': '127.0.0.1',
             'port': 3306,
@@ -54,317 +776,3157 @@ class PriceDataEnhancer:
             'KODEX200': {'name': 'KODEX 코스피200', 'base_price': 35000, 'volatility': 0.22}
         }
 
-    def connect_db(self):
-        """데이터베이스 연결"""
+    def select_tickers(self, tickers):
+        """지정한 종목만 처리하도록 대상 제한 (일부 종목 재생성용)"""
+        selected = set(tickers)
+        unknown = selected - set(self.korean_stocks) - set(self.global_etfs)
+        if unknown:
+            logger.warning(f"등록되지 않은 종목 무시: {', '.join(sorted(unknown))}")
+
+        self.korean_stocks = {t: info for t, info in self.korean_stocks.items() if t in selected}
+        self.global_etfs = {t: info for t, info in self.global_etfs.items() if t in selected}
+
+    def _get_pool(self):
+        """커넥션 풀 (처음 사용할 때 생성)"""
+        with self._pool_lock:
+            if self._pool is None:
+                pool_config = dict(self.db_config)
+                if self.loader == 'infile':
+                    pool_config['allow_local_infile'] = True
+                self._pool = pooling.MySQLConnectionPool(
+                    pool_name='price_data_enhancer',
+                    pool_size=self.pool_size,
+                    pool_reset_session=True,
+                    **pool_config
+                )
+                logger.info(f"데이터베이스 커넥션 풀 생성 (크기 {self.pool_size})")
+        return self._pool
+
+    def connect_db(self):
+        """
+        커넥션 풀에서 데이터베이스 연결 획득
+
+        반환된 연결의 close()는 연결을 끊지 않고 풀로 돌려보낸다. 풀이 모두 사용
+        중이면 pool_timeout초까지 기다리고, 넘겨받은 연결은 ping으로 상태를 확인해
+        끊어져 있으면 재연결한다.
+        """
+        deadline = time.monotonic() + self.pool_timeout
+        while True:
+            try:
+                conn = self._get_pool().get_connection()
+                break
+            except mysql.connector.errors.PoolError:
+                if time.monotonic() >= deadline:
+                    logger.error(f"데이터베이스 연결 실패: {self.pool_timeout}초 동안 커넥션 풀에 여유 연결 없음")
+                    raise
+                time.sleep(0.05)
+            except Exception as e:
+                logger.error(f"데이터베이스 연결 실패: {e}")
+                raise
+
+        # 헬스 체크 - 서버가 끊은 유휴 연결은 재연결
+        try:
+            conn.ping(reconnect=True, attempts=3, delay=1)
+        except Exception as e:
+            conn.close()
+            logger.error(f"데이터베이스 연결 상태 확인 실패: {e}")
+            raise
+        return conn
+
+    @contextmanager
+    def db_connection(self):
+        """
+        커넥션 풀 연결 컨텍스트 매니저 - 블록이 끝나면 연결을 풀로 반환
+
+        Usage:
+            with enhancer.db_connection() as conn:
+                cursor = conn.cursor()
+        """
+        conn = self.connect_db()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def ticker_seed_sequence(self, ticker, *extra_key):
+        """
+        종목 전용 SeedSequence
+
+        spawn_key를 실행 순서가 아닌 종목 코드 자체로 정하므로, 어떤 프로세스에서
+        어떤 순서로 생성하든 같은 시드와 종목이면 같은 난수열이 나온다.
+        extra_key를 주면 같은 종목 안에서 독립된 별도 스트림을 만든다.
+        """
+        encoded = ticker.encode('utf-8')
+        return np.random.SeedSequence(self.seed, spawn_key=(len(encoded),) + tuple(encoded) + extra_key)
+
+    def _ticker_rngs(self, ticker, *extra_key):
+        """종목 SeedSequence에서 용도별 하위 스트림 Generator 생성"""
+        children = self.ticker_seed_sequence(ticker, *extra_key).spawn(len(NOISE_STREAMS))
+        return {stream: np.random.default_rng(child) for stream, child in zip(NOISE_STREAMS, children)}
+
+    def _open_noise_streams(self, tickers, history_days, day_offset=0):
+        """
+        종목별 난수 스트림 준비 (rng_mode에 따라 순차 스트림 또는 카운터 스트림)
+
+        모든 난수를 종목별 스트림에서만 뽑기 때문에, 종목 하나를 따로 생성하든
+        여러 종목을 묶어서 생성하든 결과가 비트 단위로 같다.
+
+        Args:
+            tickers: 종목 코드 리스트
+            history_days: 전체 생성 기간 거래일 수
+            day_offset: 카운터 모드 시작 거래일 번호
+        """
+        if self.rng_mode == 'counter':
+            return [
+                _CounterNoiseStream(
+                    self.ticker_seed_sequence(ticker).generate_state(2, dtype=np.uint64),
+                    self._ticker_rngs(ticker)['scenario'].random(),
+                    day_offset
+                )
+                for ticker in tickers
+            ]
+        return [_TickerNoiseStream(self._ticker_rngs(ticker), history_days) for ticker in tickers]
+
+    def _draw_universe_noise(self, streams, days):
+        """종목별 스트림에서 다음 days일치 난수를 뽑아 (종목 수 x 일수) 행렬로 쌓기"""
+        per_ticker = [stream.draw(days) for stream in streams]
+        return {key: np.array([noise[key] for noise in per_ticker]) for key in per_ticker[0]}
+
+    def _choose_scenarios(self, uniforms, days):
+        """기간에 따라 종목별 시장 시나리오 결정"""
+        if days > 500:  # 2년 이상
+            return np.full(len(uniforms), 'mixed')
+        elif days > 250:  # 1년 이상
+            candidates = np.array(['bull', 'bear', 'mixed'])
+        else:  # 1년 미만
+            candidates = np.array(['bull', 'bear', 'sideways'])
+        return candidates[(uniforms * len(candidates)).astype(int)]
+
+    def _generate_scenario_matrix(self, scenarios, noise, day_offset=0, history_days=None):
+        """
+        종목별 시나리오에 맞는 (종목 수 x 일수) 수익률 행렬 생성
+
+        평균/표준편차를 날짜별 행렬로 먼저 만든 뒤 표준정규 난수에 적용한다.
+        혼합 시나리오는 상승/하락/횡보 구간 라벨을 행마다 섞어서 배치하므로
+        구간별로 뽑은 뒤 섞는 기존 방식과 분포가 같다.
+
+        Args:
+            scenarios: 종목별 시나리오 배열
+            noise: _draw_universe_noise 결과
+            day_offset: 첫 열의 거래일 번호 (구간 생성 시 추세 위치 계산용)
+            history_days: 전체 생성 기간 거래일 수 (기본값: 열 개수)
+        """
+        count, days = noise['returns'].shape
+        history_days = history_days or days
+        mean = np.zeros((count, days))
+        std = np.zeros((count, days))
+        trend = np.zeros((count, days))
+        ramp = (day_offset + np.arange(days)) / max(history_days - 1, 1) / history_days
+
+        for scenario_type, params in MARKET_SCENARIOS.items():
+            rows = scenarios == scenario_type
+            mean[rows] = params['mean']
+            std[rows] = params['std']
+            trend[rows] = params['trend'] * ramp
+
+        # 혼합: 상승 1/3, 하락 1/4, 나머지 횡보 구간을 무작위 순서로 배치
+        mixed_rows = scenarios == 'mixed'
+        if mixed_rows.any():
+            segments = noise['segments'][mixed_rows]
+            mean[mixed_rows] = MIXED_SEGMENTS[segments, 0]
+            std[mixed_rows] = MIXED_SEGMENTS[segments, 1]
+
+        return mean + std * noise['returns'] + trend
+
+    def _simulate_price_path(self, daily_returns, base_price, floor_ratio=0.1, start_price=None):
+        """
+        수익률 배열로부터 종가 경로를 한 번에 계산
+
+        prices[i] = max(prices[i-1] * (1 + r[i]), floor) 점화식을 로그 공간의
+        누적합과 누적 최솟값으로 풀어낸다. 바닥가에 닿은 뒤에는 그 지점부터 다시
+        누적되므로 루프 없이도 반복 계산과 같은 결과가 나온다.
+        마지막 축을 시간 축으로 보므로 (종목 수 x 일수) 행렬도 그대로 처리한다.
+
+        Args:
+            daily_returns: 일별 수익률 배열
+            base_price: 기준 가격 (행렬이면 (종목 수, 1) 벡터)
+            floor_ratio: 기준 가격 대비 최소 가격 비율
+            start_price: 첫 거래일 이전 종가 (기본값: 기준 가격, 앵커에서 이어서 생성할 때 사용)
+        """
+        floor_price = base_price * floor_ratio
+        start_price = base_price if start_price is None else start_price
+        # 1 + r <= 0 이면 원래 로직에서도 바닥가로 클램프되므로 아주 작은 양수로 대체
+        log_growth = np.log(np.maximum(1.0 + daily_returns, 1e-12))
+        cumulative = np.cumsum(log_growth, axis=-1)
+        headroom = np.log(start_price / floor_price)
+        clamp = np.minimum.accumulate(np.minimum(cumulative, -headroom), axis=-1)
+        return floor_price * np.exp(cumulative - clamp)
+
+    def _build_ohlcv_arrays(self, prices, daily_returns, noise, intraday_volatility=0.02, prev_close=None):
+        """
+        종가 배열로부터 시가/고가/저가/거래량 배열 생성
+
+        Args:
+            prices: 종가 배열 (마지막 축이 시간 축)
+            daily_returns: 일별 수익률 배열 (거래량 산정용)
+            noise: _draw_universe_noise 결과
+            intraday_volatility: 일중 변동성 (기본 2%)
+            prev_close: 행별 첫 열 직전 종가 (이어서 생성할 때, NaN이거나 없으면 생성 기간 첫날로 간주)
+        """
+        # 일중 변동성 시뮬레이션
+        high_factor = 1 + np.abs(noise['high'] * intraday_volatility)
+        low_factor = 1 - np.abs(noise['low'] * intraday_volatility)
+
+        # 이전 종가를 시가로 사용 (갭 상승/하락 시뮬레이션, 첫날은 ±1%)
+        open_prices = np.empty(prices.shape)
+        open_prices[..., 0] = prices[..., 0] * (0.99 + 0.02 * noise['gap'][..., 0])
+        if prev_close is not None:
+            continued = ~np.isnan(prev_close)
+            open_prices[continued, 0] = prev_close[continued] * (0.995 + 0.01 * noise['gap'][continued, 0])
+        open_prices[..., 1:] = prices[..., :-1] * (0.995 + 0.01 * noise['gap'][..., 1:])
+
+        high_prices = np.maximum(open_prices, prices) * high_factor
+        low_prices = np.minimum(open_prices, prices) * low_factor
+
+        # 거래량 시뮬레이션 (가격 변동성과 상관관계)
+        volume_multiplier = 1 + np.abs(daily_returns) * 10  # 변동성이 클수록 거래량 증가
+        volume = (noise['volume'] * volume_multiplier).astype(np.int64)
+
+        return {
+            'open': open_prices,
+            'high': high_prices,
+            'low': low_prices,
+            'close': prices,
+            'volume': volume
+        }
+
+    def _noise_to_returns(self, noise, volatilities, history_days, day_offset=0):
+        """종목별 난수 행렬을 시나리오, 변동성, 특별 이벤트가 반영된 일별 수익률로 변환"""
+        # 종목별 시장 시나리오에 따른 일별 수익률 생성 후 변동성 조정
+        scenarios = self._choose_scenarios(noise['scenario'], history_days)
+        daily_returns = self._generate_scenario_matrix(
+            scenarios, noise, day_offset=day_offset, history_days=history_days) * volatilities
+
+        # 특별 이벤트 시뮬레이션 (큰 상승/하락) - 5% 확률로 ±5%, ±8%
+        event_mask = noise['event'] < 0.05
+        daily_returns += np.where(event_mask, EVENT_MAGNITUDES[noise['event_magnitude']], 0.0)
+        return daily_returns
+
+    def _noise_to_ohlcv(self, noise, base_prices, volatilities, history_days,
+                        day_offset=0, start_prices=None, prev_close=None):
+        """
+        종목별 난수 행렬을 OHLCV 행렬로 변환
+
+        Args:
+            noise: _draw_universe_noise 결과
+            base_prices: 종목별 기준 가격 (종목 수, 1)
+            volatilities: 종목별 변동성 (종목 수, 1)
+            history_days: 전체 생성 기간 거래일 수 (시나리오, 추세 계산용)
+            day_offset: 첫 열의 거래일 번호
+            start_prices: 첫 열 직전 종가 (종목 수, 1) - 이어서 생성할 때
+            prev_close: 시가 계산용 첫 열 직전 종가 (종목 수,) - NaN이면 생성 기간 첫날
+        """
+        daily_returns = self._noise_to_returns(noise, volatilities, history_days, day_offset)
+
+        # 가격 시계열 생성 (최소 10% 가격 유지)
+        prices = self._simulate_price_path(daily_returns, base_prices, start_price=start_prices)
+
+        # OHLC 데이터 생성
+        return self._build_ohlcv_arrays(prices, daily_returns, noise, prev_close=prev_close)
+
+    def generate_price_matrix(self, universe, start_date, end_date):
+        """
+        여러 종목의 주가 데이터를 (종목 수 x 거래일 수) 행렬로 한 번에 생성
+
+        거래일 달력은 한 번만 만들고, 종목별 기준 가격과 변동성은 열 벡터로
+        브로드캐스트하므로 종목 수와 관계없이 몇 번의 배열 연산으로 끝난다.
+        난수는 종목별 생성기에서 뽑으므로 각 행은 종목 단독 생성 결과와 같다.
+
+        Args:
+            universe: {종목 코드: {'base_price': ..., 'volatility': ...}} 형태의 종목 정보
+                      (self.korean_stocks, self.global_etfs 그대로 사용 가능)
+            start_date: 시작일
+            end_date: 종료일
+
+        Returns:
+            dict: tickers(종목 코드 리스트), dates(거래일), open/high/low/close/volume 행렬
+        """
+        tickers = list(universe.keys())
+        logger.info(f"{len(tickers)}개 종목 일괄 데이터 생성 시작: {start_date} ~ {end_date}")
+
+        # 날짜 범위 생성 (주말 제외)
+        date_range = pd.bdate_range(start=start_date, end=end_date)
+        days = len(date_range)
+        count = len(tickers)
+
+        base_prices = np.array([universe[t]['base_price'] for t in tickers], dtype=float)[:, None]
+        volatilities = np.array([universe[t]['volatility'] for t in tickers], dtype=float)[:, None]
+
+        if days == 0 or count == 0:
+            return self._empty_matrix(tickers, date_range)
+
+        # 종목별 난수 추출
+        noise = self._draw_universe_noise(self._open_noise_streams(tickers, days), days)
+
+        ohlcv = self._noise_to_ohlcv(noise, base_prices, volatilities, days)
+        ohlcv['tickers'] = tickers
+        ohlcv['dates'] = date_range
+
+        logger.info(f"{len(tickers)}개 종목 일괄 데이터 생성 완료: 종목당 {days}개 레코드")
+        return ohlcv
+
+    def iter_price_chunks(self, universe, start_date, end_date, chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        주가 데이터를 청크 단위로 생성하는 제너레이터
+
+        기간이 짧으면 여러 종목을 묶어 (종목 수 x 거래일) 행렬 하나가 chunk_rows를
+        넘지 않게 하고, 기간이 길면 종목 하나를 거래일 구간으로 나눈다. 구간 사이에는
+        마지막 종가와 종목별 난수 스트림을 이어받으므로 결과는 한 번에 생성한 것과
+        같고, 메모리는 기간이나 종목 수와 관계없이 청크 하나 분량만 쓴다.
+
+        Args:
+            universe: {종목 코드: 종목 정보} 형태의 대상 종목
+            start_date: 시작일
+            end_date: 종료일
+            chunk_rows: 청크당 최대 행 수
+
+        Yields:
+            dict: generate_price_matrix와 같은 형식의 청크 (dates는 청크 구간의 거래일)
+        """
+        date_range = pd.bdate_range(start=start_date, end=end_date)
+        days = len(date_range)
+        tickers = list(universe.keys())
+        if days == 0 or not tickers:
+            return
+
+        # 짧은 기간: 여러 종목을 한 청크로
+        if days <= chunk_rows:
+            group_size = max(1, chunk_rows // days)
+            for i in range(0, len(tickers), group_size):
+                group = {ticker: universe[ticker] for ticker in tickers[i:i + group_size]}
+                yield self.generate_price_matrix(group, start_date, end_date)
+            return
+
+        # 긴 기간: 종목별로 거래일 구간을 나눠 마지막 종가와 난수 스트림을 이어서 생성
+        for ticker in tickers:
+            state = None
+            for offset in range(0, days, chunk_rows):
+                chunk, state = self._ticker_chunk(ticker, universe[ticker], date_range, offset, chunk_rows, state)
+                yield chunk
+
+    def _ticker_chunk(self, ticker, info, date_range, offset, chunk_rows, state=None):
+        """
+        긴 기간 종목 하나의 offset번째 거래일부터 한 청크 생성
+
+        state는 앞 청크가 돌려준 (난수 스트림, 마지막 종가)로, 첫 청크(None)면 새로 연다.
+        상태를 넘겨받아 이어 만들므로 청크를 다른 프로세스에서 만들어도 결과는 같다.
+
+        Returns:
+            tuple: (generate_price_matrix 형식의 청크, 다음 청크에 넘길 상태)
+        """
+        days = len(date_range)
+        streams, last_close = state or (self._open_noise_streams([ticker], days), None)
+        chunk_days = min(chunk_rows, days - offset)
+        noise = self._draw_universe_noise(streams, chunk_days)
+        chunk = self._noise_to_ohlcv(
+            noise, np.array([[float(info['base_price'])]]), np.array([[float(info['volatility'])]]), days,
+            day_offset=offset,
+            start_prices=last_close,
+            prev_close=None if last_close is None else last_close[:, 0]
+        )
+        chunk['tickers'] = [ticker]
+        chunk['dates'] = date_range[offset:offset + chunk_days]
+        return chunk, (streams, chunk['close'][:, -1:])
+
+    def _empty_matrix(self, tickers, dates):
+        """생성할 거래일이나 종목이 없을 때의 빈 행렬"""
+        empty_prices = np.empty((len(tickers), len(dates)))
+        return {
+            'tickers': tickers,
+            'dates': dates,
+            'open': empty_prices,
+            'high': empty_prices,
+            'low': empty_prices,
+            'close': empty_prices,
+            'volume': np.empty((len(tickers), len(dates)), dtype=np.int64)
+        }
+
+    def matrix_to_candles(self, matrix):
+        """
+        OHLCV 행렬을 CANDLE_DTYPE 구조화 배열로 변환 (종목 순, 날짜 순 정렬)
+
+        ticker_id는 matrix['tickers']의 인덱스다.
+        """
+        count, days = matrix['close'].shape
+        candles = np.empty(count * days, dtype=CANDLE_DTYPE)
+        candles['ticker_id'] = np.repeat(np.arange(count, dtype=np.int32), days)
+        candles['day'] = np.tile(matrix['dates'].values.astype('datetime64[D]').astype(np.int32), count)
+        for column in PRICE_COLUMNS:
+            candles[column] = np.rint(matrix[column] * PRICE_SCALE).ravel()
+        candles['volume'] = matrix['volume'].ravel()
+        return self.validate_candles(candles, matrix['tickers'])
+
+    def validate_candles(self, candles, tickers):
+        """
+        삽입 전 캔들 불변식 검증 - 청크 전체를 배열 연산 몇 번으로 확인
+
+        검사 항목:
+        - 가격이 양수이고 DECIMAL(10,2)에 들어가는지
+        - 저가 <= 시가/종가 <= 고가
+        - 거래량이 0 이상 MAX_CANDLE_VOLUME 이하인지
+        - 종목별 거래일이 순증가하는지 (정렬, (종목, 날짜) 중복 없음)
+
+        validate가 'reject'면 위반이 하나라도 있으면 ValueError로 청크를 거부한다.
+        'repair'면 고가/저가를 OHLC 최대/최소로, 거래량을 범위 안으로 보정하고 날짜를
+        정렬해 중복은 첫 행만 남기며, 가격이 0 이하이거나 범위를 넘는 행은 제외한다.
+
+        Returns:
+            np.ndarray: 검증(보정)된 구조화 배열 - 위반이 없으면 입력 그대로
+        """
+        if self.validate == 'off' or len(candles) == 0:
+            return candles
+
+        prices = np.stack([candles[column] for column in PRICE_COLUMNS])
+        bad_price = ((prices <= 0) | (prices > MAX_PRICE_CENTS)).any(axis=0)
+        bad_ohlc = ((candles['low'] > np.minimum(candles['open'], candles['close'])) |
+                    (candles['high'] < np.maximum(candles['open'], candles['close'])))
+        bad_volume = (candles['volume'] < 0) | (candles['volume'] > MAX_CANDLE_VOLUME)
+        same_ticker = candles['ticker_id'][1:] == candles['ticker_id'][:-1]
+        bad_order = (np.diff(candles['ticker_id']) < 0) | (same_ticker & (np.diff(candles['day']) <= 0))
+
+        violations = {
+            '가격 범위': int(bad_price.sum()),
+            'OHLC 순서': int(bad_ohlc.sum()),
+            '거래량 범위': int(bad_volume.sum()),
+            '날짜 순서/중복': int(bad_order.sum())
+        }
+        if not any(violations.values()):
+            return candles
+
+        failed_ids = np.unique(np.concatenate([
+            candles['ticker_id'][bad_price | bad_ohlc | bad_volume],
+            candles['ticker_id'][1:][bad_order]
+        ]))
+        failed = [tickers[i] for i in failed_ids]
+        label = failed[0] if len(failed) == 1 else f"{failed[0]} 외 {len(failed) - 1}개 종목"
+        summary = ', '.join(f"{name} {count}개" for name, count in violations.items() if count)
+        if self.validate == 'reject':
+            raise ValueError(f"{label} 캔들 검증 실패 - {summary}")
+
+        repaired = candles[~bad_price]
+        repaired['high'] = np.maximum.reduce([repaired[column] for column in PRICE_COLUMNS])
+        repaired['low'] = np.minimum.reduce([repaired[column] for column in PRICE_COLUMNS])
+        repaired['volume'] = np.clip(repaired['volume'], 0, MAX_CANDLE_VOLUME)
+        if violations['날짜 순서/중복']:
+            repaired = repaired[np.lexsort((repaired['day'], repaired['ticker_id']))]
+            keep = np.r_[True, (np.diff(repaired['ticker_id']) != 0) | (np.diff(repaired['day']) != 0)]
+            repaired = repaired[keep]
+        logger.warning(f"{label} 캔들 검증 위반 보정 - {summary} ({len(candles) - len(repaired)}개 행 제외)")
+        return repaired
+
+    def _candle_columns(self, candles, tickers):
+        """DB 드라이버 경계에서만 사용하는 파이썬 값 열 (종목 코드, 날짜, 가격, 거래량)"""
+        ticker_codes = np.asarray(tickers, dtype=object)[candles['ticker_id']].tolist()
+        dates = candles['day'].astype('datetime64[D]').astype(object).tolist()
+        prices = [(candles[column] / PRICE_SCALE).tolist() for column in PRICE_COLUMNS]
+        return ticker_codes, dates, prices, candles['volume'].tolist()
+
+    def candles_to_rows(self, candles, tickers):
+        """구조화 배열을 INSERT용 튜플 리스트로 변환"""
+        ticker_codes, dates, prices, volumes = self._candle_columns(candles, tickers)
+        return list(zip(ticker_codes, dates, *prices, volumes))
+
+    def candles_to_records(self, candles, tickers):
+        """구조화 배열을 기존 딕셔너리 레코드 리스트로 변환"""
+        ticker_codes, dates, (opens, highs, lows, closes), volumes = self._candle_columns(candles, tickers)
+        return [
+            {
+                'ticker': ticker,
+                'date': date,
+                'open_price': open_price,
+                'high_price': high_price,
+                'low_price': low_price,
+                'close_price': close_price,
+                'volume': volume,
+                'timeframe': 'DAILY'
+            }
+            for ticker, date, open_price, high_price, low_price, close_price, volume in zip(
+                ticker_codes, dates, opens, highs, lows, closes, volumes
+            )
+        ]
+
+    def _split_by_ticker(self, candles):
+        """종목 순으로 정렬된 구조화 배열을 종목별 구간으로 분할 [(ticker_id, 구간 배열)]"""
+        if len(candles) == 0:
+            return []
+        boundaries = np.flatnonzero(np.diff(candles['ticker_id'])) + 1
+        return [(int(part['ticker_id'][0]), part) for part in np.split(candles, boundaries)]
+
+    def _period_starts(self, days, timeframe):
+        """epoch 일 배열의 기간 시작일 (주봉: 월요일, 월봉: 1일)"""
+        if timeframe == 'WEEKLY':
+            # 1970-01-01은 목요일 - 3일 당겨 월요일 기준 주 번호를 만든다
+            return ((days.astype(np.int64) + 3) // 7 * 7 - 3).astype(np.int32)
+        return days.astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[D]').astype(np.int32)
+
+    def _period_bounds(self, day, timeframe):
+        """epoch 일 하나가 속한 기간의 (시작일, 마지막날)"""
+        start = int(self._period_starts(np.array([day]), timeframe)[0])
+        if timeframe == 'WEEKLY':
+            return start, start + 6
+        next_month = np.datetime64(start, 'D').astype('datetime64[M]') + 1
+        return start, int(next_month.astype('datetime64[D]').astype(np.int64)) - 1
+
+    def rollup_candles(self, candles, timeframe):
+        """
+        일봉 구조화 배열을 주봉/월봉으로 집계
+
+        (종목, 기간) 경계를 한 번에 찾아 reduceat으로 첫 시가, 최고 고가, 최저 저가,
+        마지막 종가, 거래량 합을 구한다. 일봉은 종목, 날짜 순 정렬을 가정한다.
+        봉 날짜는 기간 시작일이라 기간 일부만 있어도 같은 키로 갱신된다.
+        """
+        if len(candles) == 0:
+            return candles[:0]
+        periods = self._period_starts(candles['day'], timeframe)
+        starts = np.flatnonzero(np.r_[True, (candles['ticker_id'][1:] != candles['ticker_id'][:-1]) |
+                                      (periods[1:] != periods[:-1])])
+        ends = np.r_[starts[1:], len(candles)] - 1
+
+        bars = np.empty(len(starts), dtype=CANDLE_DTYPE)
+        bars['ticker_id'] = candles['ticker_id'][starts]
+        bars['day'] = periods[starts]
+        bars['open'] = candles['open'][starts]
+        bars['high'] = np.maximum.reduceat(candles['high'], starts)
+        bars['low'] = np.minimum.reduceat(candles['low'], starts)
+        bars['close'] = candles['close'][ends]
+        bars['volume'] = np.add.reduceat(candles['volume'], starts)
+        return bars
+
+    def _rollup_stream(self, carry, candles, tickers, last_day):
+        """
+        청크 단위로 들어오는 일봉에서 주봉/월봉을 이어서 만든다
+
+        청크가 기간 중간에서 끝나면 마지막 기간의 일봉은 carry에 남겨 다음 청크와 합치고,
+        생성 기간 마지막 거래일(last_day)까지 온 종목은 바로 내보낸다. 종목별 청크는
+        날짜 순으로 들어와야 한다.
+
+        Returns:
+            list: [(timeframe, 봉 구조화 배열)] - ticker_id는 tickers 기준
+        """
+        output = []
+        for timeframe in self.rollups:
+            parts = []
+            for ticker_id, part in self._split_by_ticker(candles):
+                held = carry.pop((tickers[ticker_id], timeframe), None)
+                if held is not None:
+                    held = held.copy()
+                    held['ticker_id'] = ticker_id
+                    part = np.concatenate([held, part])
+                if int(part['day'][-1]) != last_day:
+                    periods = self._period_starts(part['day'], timeframe)
+                    pending = periods == periods[-1]
+                    carry[(tickers[ticker_id], timeframe)] = part[pending]
+                    part = part[~pending]
+                parts.append(part)
+            if parts:
+                output.append((timeframe, self.rollup_candles(np.concatenate(parts), timeframe)))
+        return output
+
+    def _flush_rollups(self, carry):
+        """carry에 남은 기간(생성 기간 끝까지 오지 못한 종목)을 봉으로 [(timeframe, 봉, [종목 코드])]"""
+        flushed = [(timeframe, self.rollup_candles(part, timeframe), [ticker])
+                   for (ticker, timeframe), part in carry.items()]
+        carry.clear()
+        return flushed
+
+    def generate_realistic_price_series(self, ticker, start_date, end_date, base_price, volatility):
+        """
+        현실적인 주가 시계열 데이터 생성
+
+        Args:
+            ticker: 종목 코드
+            start_date: 시작일
+            end_date: 종료일
+            base_price: 기준 가격
+            volatility: 변동성 (연율)
+        """
+        logger.info(f"{ticker} 데이터 생성 시작: {start_date} ~ {end_date}")
+
+        universe = {ticker: {'base_price': base_price, 'volatility': volatility}}
+        matrix = self.generate_price_matrix(universe, start_date, end_date)
+        data = self.candles_to_records(self.matrix_to_candles(matrix), matrix['tickers'])
+        if not data:
+            logger.warning(f"{ticker} 생성할 거래일이 없습니다")
+
+        logger.info(f"{ticker} 데이터 생성 완료: {len(data)}개 레코드")
+        return data
+
+    def _history_range(self, ticker):
+        """종목이 속한 종목군의 기본 생성 기간"""
+        return GLOBAL_HISTORY if ticker in self.global_etfs else KOREAN_HISTORY
+
+    def _anchor_key(self, ticker, info):
+        """앵커를 만든 생성 조건(시드, 기준가, 변동성, 생성 기간) 식별자"""
+        history_start, history_end = self._history_range(ticker)
+        raw = f"{self.seed}:{info['base_price']}:{info['volatility']}:{history_start}:{history_end}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+    def build_window_anchors(self, universe):
+        """
+        카운터 모드 전체 경로를 한 번 생성해 월초마다 직전 종가를 앵커로 저장
+
+        Args:
+            universe: {종목 코드: 종목 정보} 형태의 대상 종목
+        """
+        for ticker, info in universe.items():
+            history_start, history_end = self._history_range(ticker)
+            matrix = self.generate_price_matrix({ticker: info}, history_start, history_end)
+            dates = matrix['dates']
+            if len(dates) == 0:
+                continue
+
+            # 월이 바뀌는 거래일 위치와 그 직전 종가 (첫 거래일은 기준 가격)
+            day_index = np.flatnonzero(np.r_[True, dates.month[1:] != dates.month[:-1]])
+            closes = np.r_[float(info['base_price']), matrix['close'][0]][day_index]
+
+            self.window_anchors[ticker] = {
+                'key': self._anchor_key(ticker, info),
+                'dates': dates[day_index].date,
+                'day_index': day_index,
+                'close': closes
+            }
+            logger.info(f"{ticker} 앵커 {len(day_index)}개 생성")
+
+    def save_window_anchors(self):
+        """앵커 종가를 price_candle_anchor 테이블에 저장"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS price_candle_anchor (
+                    ticker VARCHAR(10) NOT NULL,
+                    anchor_key CHAR(16) NOT NULL,
+                    anchor_date DATE NOT NULL,
+                    day_index INT NOT NULL,
+                    anchor_close DOUBLE NOT NULL,
+                    PRIMARY KEY (ticker, anchor_key, anchor_date)
+                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+            """)
+
+            rows = [
+                (ticker, anchors['key'], date, int(day), float(close))
+                for ticker, anchors in self.window_anchors.items()
+                for date, day, close in zip(anchors['dates'], anchors['day_index'], anchors['close'])
+            ]
+            cursor.executemany("""
+                REPLACE INTO price_candle_anchor (ticker, anchor_key, anchor_date, day_index, anchor_close)
+                VALUES (%s, %s, %s, %s, %s)
+            """, rows)
+            conn.commit()
+            logger.info(f"앵커 {len(rows)}개 저장 완료")
+        except Exception as e:
+            logger.error(f"앵커 저장 실패: {e}")
+            conn.rollback()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def load_window_anchors(self, universe):
+        """price_candle_anchor 테이블에서 현재 생성 조건에 맞는 앵커 로드"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+
+        try:
+            for ticker, info in universe.items():
+                key = self._anchor_key(ticker, info)
+                cursor.execute("""
+                    SELECT anchor_date, day_index, anchor_close
+                    FROM price_candle_anchor
+                    WHERE ticker = %s AND anchor_key = %s
+                    ORDER BY day_index
+                """, (ticker, key))
+                rows = cursor.fetchall()
+                if rows:
+                    self.window_anchors[ticker] = {
+                        'key': key,
+                        'dates': [row[0] for row in rows],
+                        'day_index': np.array([row[1] for row in rows]),
+                        'close': np.array([row[2] for row in rows], dtype=float)
+                    }
+        except Exception as e:
+            logger.warning(f"앵커 로드 실패 (새로 생성): {e}")
+        finally:
+            cursor.close()
+            conn.close()
+
+    def generate_price_window(self, ticker, info, window_start, window_end):
+        """
+        [window_start, window_end] 구간만 생성 (카운터 모드 전용)
+
+        구간 시작 이전의 가장 가까운 월초 앵커 종가에서 출발하므로 앞 구간 전체를
+        만들 필요 없이 O(구간 길이 + 한 달)로 끝난다. 결과는 전체 경로를 생성한 뒤
+        잘라낸 값과 같다 (누적 순서 차이로 인한 부동소수점 오차 수준).
+
+        Returns:
+            dict: generate_price_matrix와 같은 형식 (종목 1개)
+        """
+        if self.rng_mode != 'counter':
+            raise ValueError("구간 생성은 카운터 모드(rng_mode='counter')에서만 지원합니다")
+
+        anchor_info = self.window_anchors.get(ticker)
+        if anchor_info is None or anchor_info['key'] != self._anchor_key(ticker, info):
+            self.build_window_anchors({ticker: info})
+            anchor_info = self.window_anchors[ticker]
+
+        history_start, history_end = self._history_range(ticker)
+        history_days = int(np.busday_count(history_start, np.datetime64(history_end) + 1))
+        window_start = max(pd.Timestamp(window_start), pd.Timestamp(history_start))
+        window_end = min(pd.Timestamp(window_end), pd.Timestamp(history_end))
+        dates = pd.bdate_range(start=window_start, end=window_end)
+        if len(dates) == 0:
+            return self._empty_matrix([ticker], dates)
+
+        # 구간 첫 거래일 이전의 가장 가까운 앵커부터 생성
+        first_day = int(np.busday_count(history_start, dates[0].date()))
+        anchor = max(int(np.searchsorted(anchor_info['day_index'], first_day, side='right')) - 1, 0)
+        anchor_day = int(anchor_info['day_index'][anchor])
+        anchor_close = anchor_info['close'][anchor]
+        days = first_day - anchor_day + len(dates)
+
+        streams = self._open_noise_streams([ticker], history_days, day_offset=anchor_day)
+        noise = self._draw_universe_noise(streams, days)
+        ohlcv = self._noise_to_ohlcv(
+            noise,
+            np.array([[float(info['base_price'])]]),
+            np.array([[float(info['volatility'])]]),
+            history_days,
+            day_offset=anchor_day,
+            start_prices=np.array([[anchor_close]]),
+            prev_close=np.array([np.nan if anchor_day == 0 else anchor_close])
+        )
+
+        skip = first_day - anchor_day
+        window = {key: values[:, skip:] for key, values in ohlcv.items()}
+        window['tickers'] = [ticker]
+        window['dates'] = dates
+        return window
+
+    def materialize_windows(self, window_start, window_end):
+        """
+        요청된 구간만 생성해 DB에 반영 (카운터 모드)
+
+        앵커는 DB에 저장된 것을 먼저 쓰고, 없으면 한 번만 전체 경로로 만들어 저장한다.
+        드라이런이면 앵커를 읽기만 하고 종목별 계획(구간 삭제, 삽입 행 수)만 출력한다.
+        """
+        universe = {**self.korean_stocks, **self.global_etfs}
+        logger.info(f"구간 생성 시작: {window_start} ~ {window_end}, {len(universe)}개 종목")
+
+        self.load_window_anchors(universe)
+        missing = {t: info for t, info in universe.items() if t not in self.window_anchors}
+        if self.dry_run:
+            days = len(pd.bdate_range(start=window_start, end=window_end))
+            for ticker, info in universe.items():
+                action = '구간 삭제 후 생성' if self.write_mode == 'replace' else self.write_mode
+                logger.info(f"  {ticker} ({info.get('name', '')}): {action} - 삽입 {days}개")
+            logger.info(f"드라이런 - 앵커 생성/저장 {len(missing)}개 종목, 구간 삭제, 삽입 "
+                        f"{days * len(universe):,}행 생략")
+            return
+        if missing:
+            self.build_window_anchors(missing)
+            self.save_window_anchors()
+
+        for ticker, info in universe.items():
+            try:
+                window = self.generate_price_window(ticker, info, window_start, window_end)
+                if self.write_mode == 'replace':
+                    self.clear_date_range(ticker, window_start, window_end)
+                count = self.insert_candles(self.matrix_to_candles(window), window['tickers'])
+                self.refresh_rollups(ticker, window_start, window_end)
+                logger.info(f"{ticker} 구간 완료 - {count}개 레코드 생성")
+            except Exception as e:
+                logger.error(f"{ticker} 구간 생성 중 오류 발생: {e}")
+                continue
+        self.flush_summary()
+
+    def get_date_coverage(self, ticker, start_date, end_date):
+        """
+        기간 내 일봉 보유 현황
+
+        행 수가 최초~최종일 사이 거래일 수보다 적을 때만(중간에 빠진 날이 있을 때만)
+        보유 날짜 목록을 추가로 조회한다.
+
+        Returns:
+            dict: count, first, last (numpy.datetime64[D]), dates (구멍이 없으면 None)
+        """
+        conn = self.connect_db()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                SELECT COUNT(*), MIN(date), MAX(date)
+                FROM price_candle
+                WHERE ticker = %s AND timeframe = 'DAILY' AND date BETWEEN %s AND %s
+            """, (ticker, start_date, end_date))
+            count, first, last = cursor.fetchone()
+            coverage = {'count': count, 'first': None, 'last': None, 'dates': None}
+            if not count:
+                return coverage
+
+            coverage['first'] = np.datetime64(first, 'D')
+            coverage['last'] = np.datetime64(last, 'D')
+            expected = int(np.busday_count(coverage['first'], coverage['last'] + 1))
+            if count < expected:
+                cursor.execute("""
+                    SELECT date FROM price_candle
+                    WHERE ticker = %s AND timeframe = 'DAILY' AND date BETWEEN %s AND %s
+                """, (ticker, start_date, end_date))
+                coverage['dates'] = np.array([row[0] for row in cursor.fetchall()], dtype='datetime64[D]')
+            return coverage
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _stored_close(self, ticker, date, before=True):
+        """date 직전(before) 또는 직후의 저장된 일봉 종가 (없으면 None)"""
+        conn = self.connect_db()
+        cursor = conn.cursor()
+
+        operator, order = ('<', 'DESC') if before else ('>', 'ASC')
+        try:
+            cursor.execute(f"""
+                SELECT close_price FROM price_candle
+                WHERE ticker = %s AND timeframe = 'DAILY' AND date {operator} %s
+                ORDER BY date {order}
+                LIMIT 1
+            """, (ticker, date))
+            row = cursor.fetchone()
+            return float(row[0]) if row else None
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _missing_runs(self, calendar, coverage):
+        """거래일 달력 중 저장되지 않은 연속 구간 [(시작 위치, 끝 위치(미포함))]"""
+        if not coverage['count']:
+            present = np.zeros(len(calendar), dtype=bool)
+        elif coverage['dates'] is None:
+            present = (calendar >= coverage['first']) & (calendar <= coverage['last'])
+        else:
+            present = np.isin(calendar, coverage['dates'])
+
+        edges = np.diff(np.r_[0, (~present).astype(np.int8), 0])
+        return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+    def _gap_noise_stream(self, ticker, history_days, day_position):
+        """누락 구간 청크용 난수 스트림 - (종목, 청크 시작 거래일)로 결정"""
+        if self.rng_mode == 'counter':
+            return self._open_noise_streams([ticker], history_days, day_offset=day_position)[0]
+        return _TickerNoiseStream(self._ticker_rngs(ticker, GAP_FILL_STREAM_KEY, int(day_position)), history_days)
+
+    def _forward_gap_chunks(self, ticker, calendar, run_start, run_end, level, base_prices, volatilities):
+        """누락 구간을 level(없으면 기준 가격)에서 앞으로 이어 청크 단위로 생성"""
+        history_days = len(calendar)
+        for offset in range(run_start, run_end, self.chunk_rows):
+            chunk_days = min(self.chunk_rows, run_end - offset)
+            noise = self._draw_universe_noise([self._gap_noise_stream(ticker, history_days, offset)], chunk_days)
+            chunk = self._noise_to_ohlcv(
+                noise, base_prices, volatilities, history_days,
+                day_offset=offset,
+                start_prices=None if level is None else np.array([[level]]),
+                prev_close=np.array([np.nan if level is None else level])
+            )
+            level = float(chunk['close'][0, -1])
+            chunk['tickers'] = [ticker]
+            chunk['dates'] = calendar[offset:offset + chunk_days]
+            yield chunk
+
+    def iter_gap_chunks(self, ticker, info, calendar, run_start, run_end):
+        """
+        누락 구간 하나를 저장된 종가에 이어지도록 청크 단위로 생성
+
+        앞쪽에 저장된 종가가 있으면 그 종가에서 앞으로 이어가고, 구간이 기존 데이터보다
+        앞에 있으면(앞쪽 종가가 없으면) 뒤쪽 첫 저장 종가에서 거꾸로 거슬러 올라가며
+        만든다. 기존 데이터 사이의 구멍은 앞으로 만든 경로를 한 번 끝까지 생성해 끝 종가를
+        보고, 같은 난수로 다시 만들면서 로그 가격에 일정한 기울기를 더해(브라운 브리지)
+        뒤쪽 저장 종가로 이어지는 하루 수익률까지 고르게 맞춘다. 어느 경우든 기존 시계열과
+        끊김 없이 이어진다.
+
+        Args:
+            calendar: 생성 기간 전체 거래일 (pandas.DatetimeIndex)
+            run_start: 누락 구간 시작 위치
+            run_end: 누락 구간 끝 위치 (미포함)
+        """
+        history_days = len(calendar)
+        base_prices = np.array([[float(info['base_price'])]])
+        volatilities = np.array([[float(info['volatility'])]])
+        prev_close = self._stored_close(ticker, calendar[run_start].date(), before=True)
+        next_close = None
+        if run_end < history_days:
+            next_close = self._stored_close(ticker, calendar[run_end - 1].date(), before=False)
+
+        if prev_close is not None and next_close is not None:
+            # 사이 구간: 1차 생성으로 끝 종가를 구하고, 뒤쪽 저장 종가까지 (구간 거래일 수 + 1)걸음에
+            # 나눠 로그 가격을 보정 - 거래일 k의 OHLC에 exp(drift * k)를 곱해도 OHLC 관계는 유지된다
+            end_close = prev_close
+            for chunk in self._forward_gap_chunks(ticker, calendar, run_start, run_end, prev_close,
+                                                  base_prices, volatilities):
+                end_close = float(chunk['close'][0, -1])
+            drift = np.log(next_close / end_close) / (run_end - run_start + 1)
+            for offset, chunk in zip(range(run_start, run_end, self.chunk_rows),
+                                     self._forward_gap_chunks(ticker, calendar, run_start, run_end, prev_close,
+                                                              base_prices, volatilities)):
+                steps = np.arange(offset - run_start + 1, offset - run_start + 1 + len(chunk['dates']))
+                scale = np.exp(drift * steps)
+                for column in PRICE_COLUMNS:
+                    chunk[column] = chunk[column] * scale
+                yield chunk
+            return
+
+        if next_close is None:
+            # 앞쪽 종가(없으면 기준 가격)에서 앞으로 이어서 생성
+            yield from self._forward_gap_chunks(ticker, calendar, run_start, run_end, prev_close,
+                                                base_prices, volatilities)
+            return
+
+        # 뒤쪽 첫 저장 종가에서 거꾸로: close[t] = close[t + 1] / (1 + r[t + 1])
+        level = next_close
+        floor_price = base_prices * 0.1
+        for chunk_end in range(run_end, run_start, -self.chunk_rows):
+            offset = max(run_start, chunk_end - self.chunk_rows)
+            chunk_days = chunk_end - offset
+            noise = self._draw_universe_noise([self._gap_noise_stream(ticker, history_days, offset)], chunk_days)
+            daily_returns = self._noise_to_returns(noise, volatilities, history_days, day_offset=offset + 1)
+            log_growth = np.log(np.maximum(1.0 + daily_returns, 1e-12))
+            backward = np.cumsum(log_growth[:, ::-1], axis=-1)[:, ::-1]
+            prices = np.maximum(level * np.exp(-backward), floor_price)
+
+            chunk = self._build_ohlcv_arrays(prices, daily_returns, noise)
+            level = float(prices[0, 0])
+            chunk['tickers'] = [ticker]
+            chunk['dates'] = calendar[offset:chunk_end]
+            yield chunk
+
+    def gap_fill_universe(self, universe, start_date, end_date):
+        """
+        증분 보강 - 종목별로 빠진 거래일만 생성해 삽입
+
+        기존 데이터는 삭제하지 않고, 보유 현황(최초/최종일, 중간 구멍)을 조회해 빠진
+        구간만 저장된 종가에 이어서 만든다. 매일 갱신 비용은 새 거래일 수에 비례한다.
+        거래일 달력은 평일 기준이므로 휴장일도 빠진 날로 보고 채운다.
+        """
+        calendar = pd.bdate_range(start=start_date, end=end_date)
+        calendar_days = calendar.values.astype('datetime64[D]')
+        logger.info(f"증분 보강 시작: {start_date} ~ {end_date}, {len(universe)}개 종목")
+
+        for ticker, info in universe.items():
+            try:
+                coverage = self.get_date_coverage(ticker, start_date, end_date)
+                runs = self._missing_runs(calendar_days, coverage)
+                if not runs:
+                    logger.info(f"{ticker} 누락 거래일 없음 ({coverage['count']}개) - 스킵")
+                    continue
+
+                missing_days = sum(int(end - start) for start, end in runs)
+                logger.info(f"{ticker} 누락 구간 {len(runs)}개, {missing_days}개 거래일 보강 "
+                            f"(기존 {coverage['count']}개)")
+
+                inserted = 0
+                for run_start, run_end in runs:
+                    for chunk in self.iter_gap_chunks(ticker, info, calendar, run_start, run_end):
+                        inserted += self.insert_candles(self.matrix_to_candles(chunk), [ticker])
+                    # 보강한 거래일이 걸친 주/월 봉을 저장된 일봉으로 다시 집계
+                    self.refresh_rollups(ticker, calendar[run_start], calendar[run_end - 1])
+
+                logger.info(f"{ticker} 증분 보강 완료 - {inserted}개 레코드 생성")
+
+            except Exception as e:
+                logger.error(f"{ticker} 증분 보강 중 오류 발생: {e}")
+                continue
+
+    def _candle_row_hashes(self, candles):
+        """
+        캔들 행 해시 - ROW_HASH_SQL과 같은 값
+
+        DB에 저장되는 DECIMAL(10,2) 문자열('70000.00')과 같게 x100 고정소수점 정수로
+        포맷하므로 부동소수점 표현 차이 없이 DB 쪽 해시와 일치한다. 행 문자열을 만들지 않고
+        문자열의 바이트를 앞에서부터 한 자리씩 배열로 뽑아 CRC32 테이블을 적용하므로 행마다
+        도는 파이썬 루프가 없다 (자릿수가 모자란 행은 앞자리 0을 건너뛴다).
+        """
+        if len(candles) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        days = candles['day'].astype('datetime64[D]')
+        months = days.astype('datetime64[M]')
+        crc = np.full(len(candles), 0xFFFFFFFF, dtype=np.uint32)
+
+        def feed(values, skip=None):
+            nonlocal crc
+            updated = CRC32_TABLE[(crc ^ values) & 0xFF] ^ (crc >> 8)
+            crc = updated if skip is None else np.where(skip, crc, updated)
+
+        def feed_number(values, width=None):
+            # width를 주면 앞을 0으로 채운 고정 폭, 아니면 행마다 제 자릿수만
+            digits = None if width is not None else self._digit_counts(values)
+            for place in range((width or int(digits.max())) - 1, -1, -1):
+                feed(ord('0') + values // 10 ** place % 10, None if digits is None else digits <= place)
+
+        feed_number(days.astype('datetime64[Y]').astype(np.int64) + 1970, 4)
+        feed(ord('-'))
+        feed_number(months.astype(np.int64) % 12 + 1, 2)
+        feed(ord('-'))
+        feed_number((days - months.astype('datetime64[D]')).astype(np.int64) + 1, 2)
+        for column in PRICE_COLUMNS:
+            price = candles[column].astype(np.int64)
+            feed(ord('|'))
+            feed_number(price // 100)
+            feed(ord('.'))
+            feed(ord('0') + price // 10 % 10)
+            feed(ord('0') + price % 10)
+        feed(ord('|'))
+        feed_number(candles['volume'].astype(np.int64))
+        return (crc ^ np.uint32(0xFFFFFFFF)).astype(np.int64)
+
+    def _digit_counts(self, values):
+        """0 이상 정수 배열의 10진 자릿수 (0은 한 자리)"""
+        counts = np.ones(len(values), dtype=np.int64)
+        rest = values // 10
+        while rest.any():
+            counts += rest > 0
+            rest //= 10
+        return counts
+
+    def _month_keys(self, candles):
+        """캔들별 월 키 (YYYYMM 정수 - DB 쪽 YEAR(date) * 100 + MONTH(date))"""
+        months = candles['day'].astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+        return (months // 12 + 1970) * 100 + months % 12 + 1
+
+    def generated_month_hashes(self, candles, tickers):
+        """
+        생성 쪽 (종목, timeframe, 월) 해시
+
+        Returns:
+            dict: {(종목 코드, 'DAILY', YYYYMM): (행 수, 행 해시 합)}
+        """
+        if len(candles) == 0:
+            return {}
+        hashes = self._candle_row_hashes(candles)
+        groups, inverse = np.unique(
+            np.stack([candles['ticker_id'].astype(np.int64), self._month_keys(candles)]), axis=1, return_inverse=True)
+        counts = np.bincount(inverse.ravel(), minlength=groups.shape[1])
+        sums = np.bincount(inverse.ravel(), weights=hashes.astype(np.float64), minlength=groups.shape[1])
+        # 합은 2^53을 넘지 않으므로(월 23행 x 2^32) float64로도 정확하다
+        return {
+            (tickers[int(ticker_id)], 'DAILY', int(month)): (int(count), int(total))
+            for ticker_id, month, count, total in zip(groups[0], groups[1], counts, sums)
+        }
+
+    def fetch_content_hashes(self, tickers=None, start_date=None, end_date=None, by_month=True, connect=None):
+        """
+        DB 쪽 내용 해시를 집계 쿼리 한 번으로 조회
+
+        Args:
+            tickers: 대상 종목 (None이면 전체)
+            start_date, end_date: 대상 기간 (None이면 전체)
+            by_month: True면 (종목, timeframe, 월), False면 (종목, timeframe) 단위
+            connect: 연결 함수 (기본: connect_db) - 다른 DB와 비교할 때 사용
+
+        Returns:
+            dict: {(종목 코드, timeframe[, YYYYMM]): (행 수, 행 해시 합)}
+        """
+        conditions, params = [], []
+        if tickers is not None:
+            if not tickers:
+                return {}
+            conditions.append(f"ticker IN ({', '.join(['%s'] * len(tickers))})")
+            params.extend(tickers)
+        if start_date is not None:
+            conditions.append("date BETWEEN %s AND %s")
+            params.extend([start_date, end_date])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        month = ", YEAR(date) * 100 + MONTH(date)" if by_month else ""
+
+        conn = (connect or self.connect_db)()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT ticker, timeframe{month}, COUNT(*), SUM({ROW_HASH_SQL})
+                FROM price_candle
+                {where}
+                GROUP BY ticker, timeframe{month}
+            """, tuple(params))
+            return {tuple(row[:-2]): (int(row[-2]), int(row[-1])) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _month_range(self, month):
+        """YYYYMM 월 키의 첫날과 마지막날 (datetime.date)"""
+        first = np.datetime64(f"{month // 100:04d}-{month % 100:02d}", 'M')
+        return first.astype('datetime64[D]').item(), ((first + 1).astype('datetime64[D]') - 1).item()
+
+    def _rewrite_months(self, ticker, months, candles, tickers):
+        """
+        종목의 지정 월을 생성 데이터로 교체 - 이어진 월은 한 구간으로 묶어 삭제 후 삽입
+
+        Returns:
+            int: 삽입한 행 수
+        """
+        months = sorted(months)
+        runs = [[months[0], months[0]]]
+        for month in months[1:]:
+            previous = month - 89 if month % 100 == 1 else month - 1
+            if previous == runs[-1][1]:
+                runs[-1][1] = month
+            else:
+                runs.append([month, month])
+        for first_month, last_month in runs:
+            self.clear_date_range(ticker, self._month_range(first_month)[0], self._month_range(last_month)[1])
+
+        selected = candles[np.isin(self._month_keys(candles), months)]
+        inserted = self.insert_candles(selected, tickers) if len(selected) else 0
+        for first_month, last_month in runs:
+            self.refresh_rollups(ticker, self._month_range(first_month)[0], self._month_range(last_month)[1])
+        return inserted
+
+    def sync_universe(self, universe, start_date, end_date):
+        """
+        내용 해시 동기화 - 생성 데이터와 다른 월만 다시 쓴다
+
+        DB 쪽 (종목, timeframe, 월) 해시를 집계 쿼리 한 번으로 받고, 생성 쪽은 청크를
+        만들면서 배열에서 같은 해시를 계산해 종목 합계 -> 월 순으로 비교한다. 해시가
+        다른 월(행 수나 값이 바뀐 월, DB에만 있거나 생성 쪽에만 있는 월)만 삭제 후
+        다시 삽입하므로, 바뀐 것이 없으면 쓰기 없이 조회와 생성 시간만 든다.
+        청크가 월 중간에서 나뉘면 마지막 월은 다음 청크와 합쳐서 비교한다.
+        """
+        calendar = pd.bdate_range(start=start_date, end=end_date)
+        if len(calendar) == 0:
+            return
+        last_day = int(calendar.values.astype('datetime64[D]').astype(np.int64)[-1])
+
+        stored = self.fetch_content_hashes(list(universe.keys()), start_date, end_date)
+        stored_months = {}
+        for (ticker, timeframe, month), value in stored.items():
+            if timeframe == 'DAILY':
+                stored_months.setdefault(ticker, {})[month] = value
+
+        summary = {'tickers': 0, 'months': 0, 'rewritten': 0, 'rows': 0}
+        carry = {}
+        compared = {}
+
+        for chunk in self.iter_price_chunks(universe, start_date, end_date, self.chunk_rows):
+            tickers = chunk['tickers']
+            for ticker_id, candles in self._split_by_ticker(self.matrix_to_candles(chunk)):
+                ticker = tickers[ticker_id]
+                if ticker in carry:
+                    candles = np.concatenate([carry.pop(ticker), candles])
+                final = int(candles['day'][-1]) == last_day
+                db_months = stored_months.get(ticker, {})
+
+                # 한 번에 생성된 종목은 종목 합계(행 수, 해시 합)가 같으면 월 비교 생략
+                if final and ticker not in compared and self._hash_total(candles) == (
+                        sum(count for count, _ in db_months.values()), sum(total for _, total in db_months.values())):
+                    summary['tickers'] += 1
+                    continue
+
+                # 청크가 월 중간에서 끝나면 마지막 월은 다음 청크와 합쳐서 비교
+                months = self._month_keys(candles)
+                if not final:
+                    pending = months == months[-1]
+                    carry[ticker] = candles[pending]
+                    candles, months = candles[~pending], months[~pending]
+
+                generated = {month: value for (_, _, month), value in self.generated_month_hashes(candles, tickers).items()}
+                seen = compared.setdefault(ticker, set())
+                seen.update(generated)
+                changed = [month for month, value in generated.items() if db_months.get(month) != value]
+                if final:
+                    # 생성 쪽에 없는 월이 DB에만 있으면 그 월도 정리
+                    changed += [month for month in db_months if month not in seen]
+                    summary['tickers'] += 1
+                summary['months'] += len(generated)
+
+                if changed:
+                    summary['rewritten'] += len(changed)
+                    summary['rows'] += self._rewrite_months(ticker, changed, candles, tickers)
+                    logger.info(f"{ticker} 해시가 다른 월 {len(changed)}개 다시 씀: "
+                                f"{', '.join(str(month) for month in sorted(changed)[:6])}"
+                                f"{' ...' if len(changed) > 6 else ''}")
+
+        logger.info(f"해시 동기화 완료: {summary['tickers']}개 종목, {summary['months']}개 월 비교, "
+                    f"{summary['rewritten']}개 월 다시 씀 ({summary['rows']}행)")
+
+    def _hash_total(self, candles):
+        """캔들 전체 (행 수, 행 해시 합) - 종목 단위 비교용"""
+        return len(candles), int(self._candle_row_hashes(candles).sum())
+
+    def diff_databases(self, other_config, tickers=None):
+        """
+        다른 DB와 price_candle 내용 비교 (예: 개발 DB vs e2e 테스트 DB)
+
+        양쪽 (종목, timeframe) 해시를 먼저 비교하고, 다른 종목만 월 단위 해시를 받아
+        다른 월을 보고한다. 데이터는 바꾸지 않는다.
+
+        Returns:
+            dict: {(종목 코드, timeframe): [다른 월 YYYYMM]}
+        """
+        def connect_other():
+            return mysql.connector.connect(**other_config)
+
+        local = self.fetch_content_hashes(tickers, by_month=False)
+        remote = self.fetch_content_hashes(tickers, by_month=False, connect=connect_other)
+        differing = sorted(key for key in set(local) | set(remote) if local.get(key) != remote.get(key))
+        logger.info(f"종목 단위 비교: {len(set(local) | set(remote))}개 중 {len(differing)}개 다름")
+        if not differing:
+            return {}
+
+        differing_tickers = sorted({ticker for ticker, _ in differing})
+        local_months = self.fetch_content_hashes(differing_tickers)
+        remote_months = self.fetch_content_hashes(differing_tickers, connect=connect_other)
+        result = {}
+        for key in set(local_months) | set(remote_months):
+            if local_months.get(key) != remote_months.get(key):
+                result.setdefault(key[:2], []).append(key[2])
+
+        for (ticker, timeframe), months in sorted(result.items()):
+            months.sort()
+            local_rows = local.get((ticker, timeframe), (0, 0))[0]
+            remote_rows = remote.get((ticker, timeframe), (0, 0))[0]
+            logger.info(f"  {ticker} {timeframe}: {len(months)}개 월 다름 (행 수 {local_rows} / {remote_rows}) - "
+                        f"{', '.join(str(month) for month in months[:6])}{' ...' if len(months) > 6 else ''}")
+        return result
+
+    def _load_key(self, ticker, info, start_date, end_date):
+        """종목 적재 결과를 결정하는 생성 조건(시드, 난수 모드, 기준가, 변동성, 기간) 식별자"""
+        raw = f"{self.seed}:{self.rng_mode}:{info['base_price']}:{info['volatility']}:{start_date}:{end_date}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+    def load_journal_progress(self, universe, start_date, end_date):
+        """
+        저널에서 종목별 진행 상황 로드
+
+        종목마다 started(첫 쓰기 시작), done(전체 완료), covered(완료된 청크를 이어 붙인
+        거래일 구간 [(시작, 끝)] - epoch 일 기준)를 만든다. 청크 경계는 워커 수나 청크
+        크기에 따라 달라지므로 청크 자체가 아니라 덮인 거래일 구간으로 비교한다.
+        """
+        keys = {self._load_key(ticker, info, start_date, end_date): ticker for ticker, info in universe.items()}
+        progress = {ticker: {'key': key, 'started': False, 'done': False, 'covered': []}
+                    for key, ticker in keys.items()}
+
+        ranges = {}
+        for entry in self.journal.entries(set(keys)):
+            state = progress[keys[entry['load_key']]]
+            if entry['entry'] == 'START':
+                state['started'] = True
+            elif entry['entry'] == 'DONE':
+                state['done'] = True
+            else:
+                first = np.datetime64(str(entry['start_date']), 'D')
+                last = np.datetime64(str(entry['end_date']), 'D')
+                ranges.setdefault(keys[entry['load_key']], []).append((first, last))
+
+        # 인접한(다음 거래일로 이어지는) 구간 병합
+        for ticker, intervals in ranges.items():
+            merged = []
+            for first, last in sorted(intervals):
+                if merged and first <= np.busday_offset(merged[-1][1], 1, roll='forward'):
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+                else:
+                    merged.append((first, last))
+            progress[ticker]['covered'] = [(int(first.astype(np.int64)), int(last.astype(np.int64)))
+                                           for first, last in merged]
+
+        self._journal_progress = {ticker: dict(state, start_date=start_date, end_date=end_date,
+                                               info=universe[ticker])
+                                  for ticker, state in progress.items()}
+        return self._journal_progress
+
+    def _journal_record(self, ticker, entry, first_day=None, last_day=None, row_count=0):
+        """저널에 항목 기록 (저널을 쓰지 않거나 진행 상황을 로드하지 않은 종목이면 무시)"""
+        state = self._journal_progress.get(ticker)
+        if self.journal is None or state is None:
+            return
+
+        record = {'load_key': state['key'], 'ticker': ticker, 'entry': entry, 'seed': str(self.seed),
+                  'row_count': row_count}
+        if first_day is not None:
+            record['start_date'] = str(np.datetime64(int(first_day), 'D'))
+            record['end_date'] = str(np.datetime64(int(last_day), 'D'))
+        if entry == 'START':
+            record['params'] = {'rng_mode': self.rng_mode, 'start_date': str(state['start_date']),
+                                'end_date': str(state['end_date']),
+                                'base_price': state['info']['base_price'], 'volatility': state['info']['volatility']}
+        try:
+            self.journal.record(record)
+        except Exception as e:
+            logger.warning(f"{ticker} 저널 기록 실패: {e}")
+
+    def _begin_ticker(self, ticker, clear=False):
+        """종목 첫 쓰기 전 처리 - 저널에 시작 기록 후 필요하면 기존 데이터 삭제"""
+        state = self._journal_progress.get(ticker)
+        with self._journal_lock:
+            first_write = state is not None and not state.get('begun')
+            if first_write:
+                state['begun'] = True
+        if first_write and not state['started']:
+            self._journal_record(ticker, 'START')
+            state['started'] = True
+        if clear:
+            self.clear_existing_data(ticker)
+
+    def _resume_action(self, ticker, candles):
+        """
+        종목 청크를 쓸지 결정
+
+        Returns:
+            str: 'skip'(저널상 완료된 구간), 'rewrite'(이전 실행에서 일부만 썼을 수 있는 구간 - 지우고 다시 씀),
+                 'write'(새 구간)
+        """
+        state = self._journal_progress.get(ticker)
+        if not state or not state['covered']:
+            return 'write'
+
+        first_day, last_day = int(candles['day'][0]), int(candles['day'][-1])
+        if any(first <= first_day and last_day <= last for first, last in state['covered']):
+            return 'skip'
+        return 'rewrite'
+
+    def _journal_finish(self, universe):
+        """이번 적재에서 모든 청크를 끝낸 종목에 완료 기록"""
+        for ticker in universe:
+            state = self._journal_progress.get(ticker)
+            if state is not None and state.get('begun') and not state.get('failed') and not state['done']:
+                self._journal_record(ticker, 'DONE')
+                state['done'] = True
+
+    def ensure_summary_table(self):
+        """요약 테이블이 없으면 만들고 price_candle 전체로 채운다 (실행당 한 번 확인)"""
+        if self._summary_ready:
+            return
+        with self._summary_lock:
+            if self._summary_ready:
+                return
+            with self.db_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("""
+                        SELECT COUNT(*) FROM information_schema.tables
+                        WHERE table_schema = DATABASE() AND table_name = %s
+                    """, (SUMMARY_TABLE,))
+                    if not cursor.fetchone()[0]:
+                        cursor.execute(self._summary_table_ddl())
+                        cursor.execute(*self._summary_aggregate_query())
+                        for statement in self._summary_replace_statements(cursor.fetchall()):
+                            cursor.execute(*statement)
+                        conn.commit()
+                        logger.info(f"{SUMMARY_TABLE} 생성 - 기존 price_candle로 초기화")
+                finally:
+                    cursor.close()
+            self._summary_ready = True
+
+    def _summary_table_ddl(self):
+        """
+        요약 테이블 CREATE TABLE 문 (V27 마이그레이션과 같은 구조)
+
+        백엔드가 V27을 적용하기 전에 스크립트가 먼저 실행되는 배포를 위한 것으로, 구조를 바꿀 때는
+        새 마이그레이션과 함께 고친다. V27의 초기화 INSERT는 INSERT IGNORE라 여기서 먼저 채운
+        요약 행과 충돌하지 않는다.
+        """
+        return f"""
+            CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+                ticker VARCHAR(10) NOT NULL COMMENT '종목 코드',
+                timeframe ENUM('DAILY', 'WEEKLY', 'MONTHLY') NOT NULL COMMENT '봉 주기',
+                first_date DATE NOT NULL COMMENT '최초 거래일',
+                last_date DATE NOT NULL COMMENT '최종 거래일',
+                row_count INT NOT NULL COMMENT '캔들 수',
+                last_close DECIMAL(10,2) NOT NULL COMMENT '최종 거래일 종가',
+                min_close DECIMAL(10,2) NOT NULL COMMENT '최저 종가',
+                max_close DECIMAL(10,2) NOT NULL COMMENT '최고 종가',
+                checksum BIGINT UNSIGNED NOT NULL COMMENT '행 CRC32 합계 (내용 비교용)',
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                    COMMENT '마지막 갱신 시각',
+                PRIMARY KEY (ticker, timeframe)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+              COMMENT='종목별 가격 데이터 보유 현황 요약'
+        """
+
+    def _summary_aggregate_query(self, tickers=None):
+        """
+        price_candle에서 요약 행을 집계하는 SELECT와 파라미터
+
+        잠금 없는 일관된 읽기(consistent read)로만 읽는다. INSERT ... SELECT로 바로 넣으면
+        REPEATABLE READ에서 읽는 범위 전체에 공유 next-key 잠금이 걸려 동시 적재와 교착된다.
+        최종 종가는 (ticker, date, timeframe) 유니크 키로 최종일 행만 찾아 붙인다.
+        """
+        where, params = "", ()
+        if tickers is not None:
+            where = f"WHERE ticker IN ({', '.join(['%s'] * len(tickers))})"
+            params = tuple(tickers)
+        return f"""
+            SELECT s.ticker, s.timeframe, s.first_date, s.last_date, s.row_count,
+                   c.close_price, s.min_close, s.max_close, s.checksum
+            FROM (
+                SELECT ticker, timeframe, MIN(date) AS first_date, MAX(date) AS last_date, COUNT(*) AS row_count,
+                       MIN(close_price) AS min_close, MAX(close_price) AS max_close,
+                       SUM({ROW_HASH_SQL}) AS checksum
+                FROM price_candle
+                {where}
+                GROUP BY ticker, timeframe
+            ) s
+            JOIN price_candle c ON c.ticker = s.ticker AND c.date = s.last_date AND c.timeframe = s.timeframe
+        """, params
+
+    def _summary_replace_statements(self, rows, tickers=None):
+        """집계한 요약 행으로 종목 요약을 통째로 바꾸는 문장 [(쿼리, 파라미터)] - tickers가 None이면 전체"""
+        where, params = "", ()
+        if tickers is not None:
+            where = f"WHERE ticker IN ({', '.join(['%s'] * len(tickers))})"
+            params = tuple(tickers)
+        statements = [(f"DELETE FROM {SUMMARY_TABLE} {where}", params)]
+        for start in range(0, len(rows), SUMMARY_WRITE_ROWS):
+            batch = rows[start:start + SUMMARY_WRITE_ROWS]
+            statements.append((f"""
+                INSERT INTO {SUMMARY_TABLE}
+                    (ticker, timeframe, first_date, last_date, row_count, last_close, min_close, max_close, checksum)
+                VALUES """ + ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * len(batch)),
+                [value for row in batch for value in row]))
+        return statements
+
+    def _summary_delta_statement(self, candles, tickers, timeframe='DAILY'):
+        """
+        새로 삽입한 캔들만큼 요약 행을 더하는 upsert 문과 파라미터
+
+        행 수와 체크섬은 더하고, 최초/최종일과 최저/최고 종가는 비교해 넓히며, 최종 종가는
+        더 늦은 날짜 쪽을 남긴다 (최종일을 바꾸기 전에 비교하도록 last_close를 먼저 갱신).
+        """
+        values = []
+        for ticker_id, part in self._split_by_ticker(candles):
+            last = int(np.argmax(part['day']))
+            values.extend([
+                tickers[ticker_id], timeframe,
+                np.datetime64(int(part['day'].min()), 'D').item(), np.datetime64(int(part['day'][last]), 'D').item(),
+                len(part), int(part['close'][last]) / PRICE_SCALE,
+                int(part['close'].min()) / PRICE_SCALE, int(part['close'].max()) / PRICE_SCALE,
+                int(self._candle_row_hashes(part).sum())
+            ])
+        row_count = len(values) // 9
+        return f"""
+            INSERT INTO {SUMMARY_TABLE}
+                (ticker, timeframe, first_date, last_date, row_count, last_close, min_close, max_close, checksum)
+            VALUES """ + ', '.join(['(%s, %s, %s, %s, %s, %s, %s, %s, %s)'] * row_count) + """
+            ON DUPLICATE KEY UPDATE
+                last_close = IF(VALUES(last_date) >= last_date, VALUES(last_close), last_close),
+                first_date = LEAST(first_date, VALUES(first_date)),
+                last_date = GREATEST(last_date, VALUES(last_date)),
+                row_count = row_count + VALUES(row_count),
+                min_close = LEAST(min_close, VALUES(min_close)),
+                max_close = GREATEST(max_close, VALUES(max_close)),
+                checksum = checksum + VALUES(checksum)
+        """, values
+
+    def _summary_stored_queries(self, candles, tickers, timeframe='DAILY', replace_range=None):
+        """
+        덮어쓰거나 지울 기존 행과 현재 요약 행을 읽는 SELECT [(쿼리, 파라미터)]
+
+        upsert는 종목별로 쓰는 캔들의 첫날 ~ 마지막날, replace_range는 그 범위만 읽는다.
+        같은 쓰기 트랜잭션 안에서 쓰기 전에 실행하는 잠금 없는 읽기다.
+        """
+        spans = {tickers[ticker_id]: (int(part['day'][0]), int(part['day'][-1]))
+                 for ticker_id, part in self._split_by_ticker(candles)}
+        if replace_range is not None:
+            ticker, first_day, last_day = replace_range
+            first, last = spans.get(ticker, (first_day, last_day))
+            spans[ticker] = (min(first, first_day), max(last, last_day))
+        conditions = ' OR '.join(['(ticker = %s AND date BETWEEN %s AND %s)'] * len(spans))
+        span_params = [value for ticker, (first, last) in spans.items()
+                       for value in (ticker, np.datetime64(first, 'D').item(), np.datetime64(last, 'D').item())]
+        return [
+            (f"""
+                SELECT ticker, TO_DAYS(date) - TO_DAYS('1970-01-01'),
+                       CAST(open_price * 100 AS SIGNED), CAST(high_price * 100 AS SIGNED),
+                       CAST(low_price * 100 AS SIGNED), CAST(close_price * 100 AS SIGNED), volume
+                FROM {self.target_table}
+                WHERE timeframe = %s AND ({conditions})
+                ORDER BY ticker, date
+            """, (timeframe, *span_params)),
+            (f"""
+                SELECT ticker, TO_DAYS(first_date) - TO_DAYS('1970-01-01'), TO_DAYS(last_date) - TO_DAYS('1970-01-01'),
+                       CAST(min_close * 100 AS SIGNED), CAST(max_close * 100 AS SIGNED)
+                FROM {SUMMARY_TABLE}
+                WHERE timeframe = %s AND ticker IN ({', '.join(['%s'] * len(spans))})
+            """, (timeframe, *spans))
+        ]
+
+    def _summary_change_statements(self, candles, tickers, timeframe, stored_rows, summary_rows,
+                                   replace_range=None):
+        """
+        기존 행을 바꾸는 쓰기(upsert, 범위 교체)의 요약 변경분 문장 [(쿼리, 파라미터)]
+
+        읽어 둔 기존 행과 메모리의 새 행을 비교해, 행 수와 체크섬은 (새 행 - 덮어쓴/지운 행)
+        만큼 더하고 최초/최종일과 최저/최고 종가는 새 행 쪽으로 넓힌다. 덮어쓰거나 지운 행이
+        기존 최저/최고 종가나 최초/최종일이었으면 변경분만으로 정할 수 없으므로 종목을
+        _summary_stale에 모아 두고 적재가 끝난 뒤 쓰기 트랜잭션 밖에서 다시 집계한다.
+        """
+        index = {ticker: ticker_id for ticker_id, ticker in enumerate(tickers)}
+        stored = np.zeros(len(stored_rows), dtype=CANDLE_DTYPE)
+        if stored_rows:
+            stored['ticker_id'] = [index[row[0]] for row in stored_rows]
+            values = np.array([row[1:] for row in stored_rows], dtype=np.int64)
+            stored['day'] = values[:, 0]
+            for position, column in enumerate(PRICE_COLUMNS + ('volume',), start=1):
+                stored[column] = values[:, position]
+        current = {ticker: tuple(int(value) for value in row) for ticker, *row in summary_rows}
+
+        written = {ticker_id: part for ticker_id, part in self._split_by_ticker(candles)}
+        if replace_range is not None:
+            written.setdefault(index[replace_range[0]], candles[:0])
+
+        statements = []
+        for ticker_id, new in written.items():
+            ticker = tickers[ticker_id]
+            old = stored[stored['ticker_id'] == ticker_id]
+            if replace_range is not None and ticker == replace_range[0]:
+                first_day, last_day = replace_range[1], replace_range[2]
+                removed = old[(old['day'] >= first_day) & (old['day'] <= last_day)]
+            else:
+                removed = old[np.isin(old['day'], new['day'])]
+
+            if len(removed):
+                summary = current.get(ticker)
+                replaced = dict(zip(new['day'].tolist(), new['close'].tolist()))
+                if summary is None:
+                    stale = True
+                else:
+                    first, last, low, high = summary
+                    stale = False
+                    for day, close in zip(removed['day'].tolist(), removed['close'].tolist()):
+                        new_close = replaced.get(day)
+                        if new_close is None:
+                            stale |= day in (first, last) or close in (low, high)
+                        else:
+                            stale |= (close == low and new_close > close) or (close == high and new_close < close)
+                if stale:
+                    with self._summary_lock:
+                        self._summary_stale.add(ticker)
+
+            count_delta = len(new) - len(removed)
+            new_checksum = int(self._candle_row_hashes(new).sum())
+            checksum_delta = new_checksum - int(self._candle_row_hashes(removed).sum())
+            if len(new) == 0:
+                if len(removed) == 0:
+                    continue
+                statements.append((f"""
+                    UPDATE {SUMMARY_TABLE}
+                    SET row_count = GREATEST(row_count + %s, 0),
+                        checksum = GREATEST(CAST(checksum AS SIGNED) + %s, 0)
+                    WHERE ticker = %s AND timeframe = %s
+                """, (count_delta, checksum_delta, ticker, timeframe)))
+                continue
+
+            last = int(np.argmax(new['day']))
+            first_date = np.datetime64(int(new['day'].min()), 'D').item()
+            last_date = np.datetime64(int(new['day'][last]), 'D').item()
+            last_close = int(new['close'][last]) / PRICE_SCALE
+            min_close = int(new['close'].min()) / PRICE_SCALE
+            max_close = int(new['close'].max()) / PRICE_SCALE
+            statements.append((f"""
+                INSERT INTO {SUMMARY_TABLE}
+                    (ticker, timeframe, first_date, last_date, row_count, last_close, min_close, max_close, checksum)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    last_close = IF(VALUES(last_date) >= last_date, VALUES(last_close), last_close),
+                    first_date = LEAST(first_date, VALUES(first_date)),
+                    last_date = GREATEST(last_date, VALUES(last_date)),
+                    row_count = GREATEST(row_count + %s, 0),
+                    min_close = LEAST(min_close, VALUES(min_close)),
+                    max_close = GREATEST(max_close, VALUES(max_close)),
+                    checksum = GREATEST(CAST(checksum AS SIGNED) + %s, 0)
+            """, (ticker, timeframe, first_date, last_date, len(new), last_close, min_close, max_close,
+                  new_checksum, count_delta, checksum_delta)))
+        return statements
+
+    def _summary_tracked(self):
+        """요약 테이블을 함께 갱신하는 쓰기인지 - 운영 테이블이 아닌 곳(섀도, 측정용 테이블)은 갱신하지 않는다"""
+        return self.summary and self.target_table == LIVE_TABLE
+
+    def _summary_statements(self, candles, tickers, stored=None, timeframe='DAILY', replace_range=None):
+        """
+        쓴 캔들을 요약 테이블에 반영하는 문장 - 쓰기와 같은 트랜잭션에서 커밋 직전에 실행
+
+        새 행만 더하는 쓰기는 메모리의 캔들로 증분 갱신한다. 기존 행을 바꿀 수 있는
+        쓰기(upsert, replace_range)는 쓰기 전에 _summary_stored_queries로 읽어 둔
+        (기존 행, 요약 행)을 stored로 넘겨 변경분만 반영한다. 어느 쪽도 price_candle을
+        다시 집계하지 않는다.
+        """
+        if not self._summary_tracked() or (len(candles) == 0 and replace_range is None):
+            return []
+        if stored is None:
+            return [self._summary_delta_statement(candles, tickers, timeframe)]
+        return self._summary_change_statements(candles, tickers, timeframe, *stored, replace_range=replace_range)
+
+    def _read_summary_stored(self, cursor, candles, tickers, timeframe='DAILY', replace_range=None):
+        """_summary_stored_queries를 실행해 (기존 행, 요약 행) 반환 - 요약을 갱신하지 않는 쓰기면 None"""
+        if not self._summary_tracked() or (len(candles) == 0 and replace_range is None):
+            return None
+        results = []
+        for statement in self._summary_stored_queries(candles, tickers, timeframe, replace_range):
+            cursor.execute(*statement)
+            results.append(cursor.fetchall())
+        return tuple(results)
+
+    def refresh_summary(self, tickers=None):
+        """
+        종목 요약을 price_candle에서 다시 집계해 교체 - tickers가 None이면 전체 재구축
+
+        집계는 잠금 없는 읽기로 먼저 끝내고, 요약 테이블만 짧은 트랜잭션으로 바꾼다.
+        """
+        if not self.summary:
+            return
+        if self.dry_run:
+            target = '전체' if tickers is None else f"{len(tickers)}개 종목"
+            logger.info(f"드라이런 - {SUMMARY_TABLE} {target} 재집계 생략")
+            return
+        self.ensure_summary_table()
+        try:
+            with self.db_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(*self._summary_aggregate_query(tickers))
+                    rows = cursor.fetchall()
+                    conn.commit()
+                    for statement in self._summary_replace_statements(rows, tickers):
+                        cursor.execute(*statement)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+                finally:
+                    cursor.close()
+            if tickers is None:
+                logger.info(f"{SUMMARY_TABLE} 전체 재구축 완료")
+        except Exception as e:
+            logger.error(f"{SUMMARY_TABLE} 갱신 실패 (--rebuild-summary로 재구축 필요): {e}")
+
+    def flush_summary(self):
+        """
+        변경분만으로 요약을 정할 수 없었던 종목을 종목당 한 번 다시 집계
+
+        적재가 모두 끝난 뒤 쓰기 트랜잭션 밖에서 호출한다.
+        """
+        with self._summary_lock:
+            stale, self._summary_stale = sorted(self._summary_stale), set()
+        if not stale:
+            return
+        for start in range(0, len(stale), SUMMARY_WRITE_ROWS):
+            self.refresh_summary(stale[start:start + SUMMARY_WRITE_ROWS])
+        logger.info(f"{SUMMARY_TABLE} {len(stale)}개 종목 재집계")
+
+    def _summary_inventory(self, cursor, tickers, start_date, end_date):
+        """
+        요약 테이블로 보유 현황 계산
+
+        요청 기간이 종목 데이터 전체를 포함하거나 겹치지 않으면 기간 내 행 수가 요약만으로
+        정해진다. 일부만 겹치는 종목과 요약 행이 없는 종목은 따로 돌려줘 집계 쿼리로 센다.
+        요약 행이 없다고 데이터가 없는 것은 아니다 - 백엔드(MarketDataService.save/saveAll)처럼
+        요약을 갱신하지 않는 경로로 price_candle에 쓴 종목일 수 있다.
+
+        Returns:
+            tuple: (현황 dict, 집계가 필요한 종목 리스트, 그중 요약 행이 없는 종목 set)
+                   - 요약 테이블이 없으면 None
+        """
+        placeholders = ', '.join(['%s'] * len(tickers))
+        try:
+            cursor.execute(f"""
+                SELECT ticker, timeframe, row_count, first_date, last_date
+                FROM {SUMMARY_TABLE}
+                WHERE ticker IN ({placeholders})
+            """, tuple(tickers))
+        except mysql.connector.Error as e:
+            # 1146: ER_NO_SUCH_TABLE - 요약 테이블이 아직 없음
+            if e.errno == 1146:
+                return None
+            raise
+
+        start, end = pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date()
+        # 주봉/월봉 날짜는 기간 시작일이라 요청 시작일보다 앞설 수 있다 - 시작일이 속한 기간 시작일과 비교
+        first_day = np.array([np.datetime64(start, 'D').astype(np.int32)])
+        starts = {'DAILY': start}
+        starts.update({timeframe: np.datetime64(int(self._period_starts(first_day, timeframe)[0]), 'D').item()
+                       for timeframe in ROLLUP_TIMEFRAMES})
+        inventory, partial, summarized = {}, set(), set()
+        for ticker, timeframe, count, first, last in cursor.fetchall():
+            summarized.add(ticker)
+            if starts.get(timeframe, start) <= first and last <= end:
+                in_range = count
+            elif last < start or first > end:
+                in_range = 0
+            else:
+                partial.add(ticker)
+                continue
+            inventory[(ticker, timeframe)] = {'count': count, 'first': first, 'last': last, 'in_range': in_range}
+
+        for key in [key for key in inventory if key[0] in partial]:
+            del inventory[key]
+        missing = set(tickers) - summarized
+        return inventory, [ticker for ticker in tickers if ticker in partial or ticker in missing], missing
+
+    def fetch_inventory(self, tickers, start_date, end_date):
+        """
+        대상 종목 전체의 보유 현황을 한 번의 집계 쿼리로 조회
+
+        요약 테이블이 있으면 기본 키 조회로 대신하고, 요청 기간과 일부만 겹치는 종목과
+        요약 행이 없는 종목만 price_candle에서 집계한다. 요약 행 없이 데이터가 있던 종목은
+        이후 쓰기가 변경분을 더할 기준이 맞도록 쓰기 전에 요약을 다시 집계해 둔다.
+
+        Returns:
+            dict: {(종목 코드, timeframe): {'count', 'first', 'last', 'in_range'}}
+                  in_range는 start_date ~ end_date 사이 행 수
+        """
+        if not tickers:
+            return {}
+
+        conn = self.connect_db()
+        cursor = conn.cursor()
+
+        try:
+            inventory, remaining, missing = {}, list(tickers), set()
+            if self.summary:
+                summary = self._summary_inventory(cursor, tickers, start_date, end_date)
+                if summary is not None:
+                    inventory, remaining, missing = summary
+            if remaining:
+                cursor.execute(*self._inventory_query(remaining, start_date, end_date))
+                inventory.update(self._inventory_from_rows(cursor.fetchall()))
+        except Exception as e:
+            logger.error(f"보유 현황 조회 실패: {e}")
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+        unsummarized = sorted({ticker for ticker, _ in inventory if ticker in missing})
+        if unsummarized and not self.dry_run:
+            logger.info(f"{SUMMARY_TABLE}에 없는 기존 데이터 {len(unsummarized)}개 종목 - 요약 재집계")
+            self.refresh_summary(unsummarized)
+        return inventory
+
+    def _inventory_query(self, tickers, start_date, end_date):
+        """fetch_inventory 집계 쿼리와 파라미터"""
+        placeholders = ', '.join(['%s'] * len(tickers))
+        return f"""
+            SELECT ticker, timeframe, COUNT(*), MIN(date), MAX(date),
+                   SUM(date BETWEEN %s AND %s)
+            FROM price_candle
+            WHERE ticker IN ({placeholders})
+            GROUP BY ticker, timeframe
+        """, (start_date, end_date, *tickers)
+
+    def _inventory_from_rows(self, rows):
+        """집계 쿼리 결과를 {(종목 코드, timeframe): 현황} 형태로 변환"""
+        return {
+            (ticker, timeframe): {'count': count, 'first': first, 'last': last, 'in_range': int(in_range or 0)}
+            for ticker, timeframe, count, first, last, in_range in rows
+        }
+
+    def plan_universe(self, universe, start_date, end_date, skip_threshold=None, inventory=None):
+        """
+        쓰기 전에 종목별 실행 계획 수립
+
+        종목마다 COUNT(*)를 따로 조회하지 않고 fetch_inventory 한 번으로 전체 현황을
+        받아 종목별 동작을 정한다.
+            skip: 처리 불필요
+            gap_fill: 빠진 거래일만 보강 (증분 모드)
+            upsert: 전 기간 생성 후 유니크 키 기준 갱신
+            sync: 월 단위 내용 해시가 다른 월만 다시 씀
+            generate: 기존 데이터 없음 - 생성 후 삽입
+            regenerate: 기존 데이터 삭제 후 생성, 삽입
+            resume: 저널상 중간에 멈춘 종목 - 완료된 청크는 건너뛰고 이어서 적재
+            rollup: 일봉은 충분하지만 주봉/월봉이 없음 - 저장된 일봉으로 봉만 채움
+
+        저널을 쓰면 행 수 대신 저널로 판단한다: 완료 기록이 있으면 skip, 완료된 청크가
+        있으면 resume, 시작만 기록됐으면(첫 청크 전 중단) regenerate.
+
+        Args:
+            skip_threshold: replace 모드에서 기존 행 수가 이 값 이상이면 스킵 (None이면 항상 재생성)
+            inventory: 이미 조회한 fetch_inventory 결과 (None이면 조회)
+
+        Returns:
+            list: [{'ticker', 'action', 'existing', 'delete_rows', 'insert_rows'}] - universe 순서
+        """
+        if inventory is None:
+            inventory = self.fetch_inventory(list(universe.keys()), start_date, end_date)
+        progress = {}
+        if self.journal is not None and not self.incremental:
+            progress = self.load_journal_progress(universe, start_date, end_date)
+        trading_days = len(pd.bdate_range(start=start_date, end=end_date))
+
+        # 기존 스킵 기준과 같게 timeframe 구분 없이 종목별 전체 행 수 합산
+        totals = {}
+        for (ticker, _), value in inventory.items():
+            totals[ticker] = totals.get(ticker, 0) + value['count']
+
+        plan = []
+        for ticker in universe:
+            existing = totals.get(ticker, 0)
+            daily = inventory.get((ticker, 'DAILY'), {'in_range': 0})
+            entry = {'ticker': ticker, 'existing': existing, 'delete_rows': 0, 'insert_rows': 0}
+
+            state = progress.get(ticker)
+            if state and state['done']:
+                entry['action'] = 'skip'
+            elif state and state['covered']:
+                covered = sum(int(np.busday_count(np.datetime64(first, 'D'), np.datetime64(last, 'D') + 1))
+                              for first, last in state['covered'])
+                entry['action'] = 'resume'
+                entry['insert_rows'] = max(0, trading_days - covered)
+            elif state and state['started']:
+                entry['action'] = 'regenerate'
+                entry['delete_rows'] = existing
+                entry['insert_rows'] = trading_days
+            elif self.incremental:
+                missing = max(0, trading_days - daily['in_range'])
+                entry['action'] = 'gap_fill' if missing else 'skip'
+                entry['insert_rows'] = missing
+            elif self.write_mode == 'upsert':
+                entry['action'] = 'upsert'
+                entry['insert_rows'] = trading_days
+            elif self.write_mode == 'sync':
+                # 실제 쓰기는 해시가 다른 월만 - 예상 행 수는 상한
+                entry['action'] = 'sync'
+                entry['insert_rows'] = trading_days
+            elif skip_threshold is not None and existing >= skip_threshold:
+                entry['action'] = 'skip'
+            else:
+                entry['action'] = 'regenerate' if existing else 'generate'
+                entry['delete_rows'] = existing
+                entry['insert_rows'] = trading_days
+
+            # 일봉 때문에 건너뛰는 종목도 봉 주기가 빠졌으면 봉만 채운다
+            if (entry['action'] == 'skip' and not state and daily['in_range'] and
+                    any((ticker, timeframe) not in inventory for timeframe in self.rollups)):
+                entry['action'] = 'rollup'
+            plan.append(entry)
+        return plan
+
+    def log_plan(self, plan, universe):
+        """실행 계획과 예상 삭제/삽입 행 수 출력"""
+        for entry in plan:
+            name = universe.get(entry['ticker'], {}).get('name', '')
+            logger.info(f"  {entry['ticker']} ({name}): {entry['action']} - 기존 {entry['existing']}개, "
+                        f"삭제 {entry['delete_rows']}개, 삽입 {entry['insert_rows']}개")
+
+        actions = {}
+        for entry in plan:
+            actions[entry['action']] = actions.get(entry['action'], 0) + 1
+        summary = ', '.join(f"{action} {count}" for action, count in sorted(actions.items()))
+        logger.info(f"실행 계획: {len(plan)}개 종목 ({summary}) - "
+                    f"예상 삭제 {sum(e['delete_rows'] for e in plan):,}행, "
+                    f"예상 삽입 {sum(e['insert_rows'] for e in plan):,}행")
+
+    def execute_plan(self, plan, universe, start_date, end_date):
+        """plan_universe 결과대로 삭제, 보강, 생성 실행 (드라이런이면 계획만 출력)"""
+        self.log_plan(plan, universe)
+        if self.dry_run:
+            logger.info("드라이런 - DB 쓰기 생략")
+            return
+
+        def targets(*actions):
+            return {e['ticker']: universe[e['ticker']] for e in plan if e['action'] in actions}
+
+        gap_targets = targets('gap_fill')
+        if gap_targets:
+            self.gap_fill_universe(gap_targets, start_date, end_date)
+
+        sync_targets = targets('sync')
+        if sync_targets:
+            self.sync_universe(sync_targets, start_date, end_date)
+
+        for ticker in targets('rollup'):
+            self.refresh_rollups(ticker, start_date, end_date)
+
+        load_targets = targets('upsert', 'generate', 'regenerate', 'resume')
+        if load_targets:
+            # 재생성 종목은 종목별 첫 쓰기 직전에 기존 데이터 삭제
+            clear_existing = set(targets('regenerate'))
+            if self.defer_indexes:
+                with self.deferred_indexes():
+                    self.load_universe(load_targets, start_date, end_date, clear_existing=clear_existing)
+            else:
+                self.load_universe(load_targets, start_date, end_date, clear_existing=clear_existing)
+
+        # 변경분만으로 정할 수 없던 종목 요약은 모든 쓰기가 끝난 뒤 종목당 한 번 다시 집계
+        self.flush_summary()
+
+    def _delete_boundary_query(self, where, params, lower, chunk_rows):
+        """
+        다음 삭제 청크의 끝 날짜 조회 - lower 이후 chunk_rows번째 다음 행의 날짜
+
+        (ticker, date, timeframe) 유니크 키를 lower부터 범위 탐색하므로 앞 청크에서 지워
+        삭제 표시만 남은 인덱스 항목은 다시 훑지 않는다.
+        """
+        bound_sql, bound_params = ("", ()) if lower is None else (" AND date >= %s", (lower,))
+        return f"""
+            SELECT date FROM price_candle
+            WHERE {where}{bound_sql}
+            ORDER BY date
+            LIMIT 1 OFFSET %s
+        """, (*params, *bound_params, chunk_rows)
+
+    def _delete_range_statement(self, where, params, lower, upper):
+        """
+        [lower, upper) 날짜 범위 삭제 문과 파라미터, 다음 청크 시작 날짜 (마지막 청크면 None)
+
+        upper가 None이면 lower 이후 전부를 지운다. 한 날짜의 행이 청크 크기보다 많아
+        upper가 lower와 같으면 그 날짜만 지우고 다음 날로 넘어간다.
+        """
+        bound_sql, bound_params = ("", ()) if lower is None else (" AND date >= %s", (lower,))
+        if upper is None:
+            range_sql, range_params, next_lower = bound_sql, bound_params, None
+        elif lower is not None and upper <= lower:
+            range_sql, range_params, next_lower = " AND date = %s", (lower,), lower + timedelta(days=1)
+        else:
+            range_sql, range_params, next_lower = bound_sql + " AND date < %s", (*bound_params, upper), upper
+        return f"DELETE FROM price_candle WHERE {where}{range_sql}", (*params, *range_params), next_lower
+
+    def _delete_in_chunks(self, ticker, where, params, reset_summary=False):
+        """
+        종목의 price_candle 행을 delete_chunk_rows개씩 나눠 삭제
+
+        청크마다 커밋하므로 한 트랜잭션이 잡는 잠금, 언두 로그, 복제 이벤트가 청크
+        크기로 제한된다. 청크 경계는 마지막으로 지운 날짜 다음부터 유니크 키 (ticker, date,
+        timeframe)를 범위 탐색해 정하고 date >= %s AND date < %s 범위로 지우므로, 앞 청크의
+        삭제 표시 항목을 다시 훑지 않아 전체 작업량이 지우는 행 수에 비례한다.
+        청크 사이에 delete_pause초 쉬어 다른 쿼리에 여유를 준다.
+        종목 전체를 지우면(reset_summary) 마지막 청크와 같은 트랜잭션에서 종목 요약도 지우고,
+        일부 기간만 지우면 어떤 행이 지워졌는지 알 수 없으므로 적재 후 다시 집계하도록 표시한다.
+
+        Returns:
+            int: 삭제한 행 수 (실패 시 그 전까지 커밋된 행 수)
+        """
+        if self.summary:
+            self.ensure_summary_table()
+        conn = self.connect_db()
+        cursor = conn.cursor()
+
+        deleted = 0
+        chunks = 0
+        complete = False
+        lower = None
+        started = time.perf_counter()
+        try:
+            while True:
+                chunk_rows = min(self.delete_chunk_rows, self.throttle.batch_rows) if self.throttle else self.delete_chunk_rows
+                cursor.execute(*self._delete_boundary_query(where, params, lower, chunk_rows))
+                boundary = cursor.fetchall()
+                query, query_params, lower = self._delete_range_statement(
+                    where, params, lower, boundary[0][0] if boundary else None)
+                cursor.execute(query, query_params)
+                chunk_deleted = cursor.rowcount
+                last_chunk = lower is None
+                if last_chunk and reset_summary and self.summary:
+                    cursor.execute(f"DELETE FROM {SUMMARY_TABLE} WHERE ticker = %s", (ticker,))
+                conn.commit()
+                complete = last_chunk and reset_summary
+                deleted += chunk_deleted
+                chunks += 1
+                if last_chunk:
+                    break
+                if self.throttle:
+                    self.throttle.after_batch(chunk_deleted)
+
+                if chunks % DELETE_PROGRESS_CHUNKS == 0:
+                    elapsed = max(time.perf_counter() - started, 1e-9)
+                    logger.info(f"  {ticker} 삭제 진행 {deleted}개 ({deleted / elapsed:,.0f}행/초)")
+                if self.delete_pause:
+                    time.sleep(self.delete_pause)
+        except Exception as e:
+            logger.error(f"{ticker} 데이터 삭제 실패 ({deleted}개까지 삭제됨): {e}")
+            conn.rollback()
+        finally:
+            cursor.close()
+            conn.close()
+        if deleted and self.summary and not complete:
+            with self._summary_lock:
+                self._summary_stale.add(ticker)
+        return deleted
+
+    def clear_existing_data(self, ticker):
+        """기존 데이터 삭제 - 청크 단위로 나눠 커밋"""
+        deleted_count = self._delete_in_chunks(ticker, "ticker = %s", (ticker,), reset_summary=True)
+        logger.info(f"{ticker} 기존 데이터 {deleted_count}개 삭제")
+
+    def clear_date_range(self, ticker, start_date, end_date):
+        """기간 내 기존 일봉 데이터 삭제 - 청크 단위로 나눠 커밋"""
+        deleted_count = self._delete_in_chunks(
+            ticker, "ticker = %s AND timeframe = 'DAILY' AND date BETWEEN %s AND %s",
+            (ticker, start_date, end_date))
+        logger.info(f"{ticker} {start_date} ~ {end_date} 기존 데이터 {deleted_count}개 삭제")
+
+    def insert_candles(self, candles, tickers):
+        """
+        구조화 배열 캔들 삽입 - 드라이버에 넘기기 직전에만 튜플로 변환
+
+        Args:
+            candles: CANDLE_DTYPE 구조화 배열
+            tickers: ticker_id에 대응하는 종목 코드 리스트
+
+        Returns:
+            int: 커밋된 행 수 (다중 행 INSERT 도중 실패하면 그 전까지 커밋된 행 수, 앞에서부터;
+                 LOAD DATA가 일부 행을 건너뛰면 롤백하고 0)
+        """
+        if len(candles) == 0:
+            logger.warning("삽입할 데이터가 없습니다")
+            return 0
+
+        if self._summary_tracked():
+            self.ensure_summary_table()
+
+        conn = self.connect_db()
+        cursor = conn.cursor()
+
+        try:
+            inserted = None
+            # upsert는 덮어쓸 기존 행을 쓰기 전에 읽어 두고 요약에 변경분만 반영
+            stored = self._read_summary_stored(cursor, candles, tickers) if self.write_mode == 'upsert' else None
+            if self._local_infile_enabled:
+                try:
+                    if self.write_mode == 'upsert':
+                        loaded = self._upsert_candles_infile(cursor, candles, tickers)
+                        statements = self._summary_statements(candles, tickers, stored)
+                    else:
+                        loaded = self._load_candles_infile(cursor, candles, tickers, table=self.target_table)
+                        statements = self._summary_statements(candles, tickers)
+                    if loaded != len(candles):
+                        # LOCAL 적재는 중복 키 행을 경고로 건너뛰므로, 서버가 보고한 행 수가 모자라면 청크 전체를 실패 처리
+                        conn.rollback()
+                        logger.error(f"LOAD DATA 적재 행 수 불일치: {loaded}/{len(candles)}행 "
+                                     f"({len(candles) - loaded}행이 중복 키 등으로 건너뜀) - 청크 롤백")
+                        return 0
+                    for statement in statements:
+                        cursor.execute(*statement)
+                    conn.commit()
+                    inserted = len(candles)
+                    if self.throttle:
+                        self.throttle.after_batch(inserted)
+                except (mysql.connector.Error, OSError) as e:
+                    if isinstance(e, mysql.connector.Error) and e.errno not in LOCAL_INFILE_REFUSED_ERRNOS:
+                        raise
+                    logger.warning(f"LOAD DATA LOCAL INFILE 사용 불가 - 다중 행 INSERT로 대체: {e}")
+                    self._local_infile_enabled = False
+
+            if inserted is None:
+                inserted = self._insert_candles_batched(conn, cursor, candles, tickers, stored)
+
+            if inserted == len(candles):
+                inserted_tickers = [tickers[i] for i in np.unique(candles['ticker_id'])]
+                label = inserted_tickers[0] if len(inserted_tickers) == 1 else f"{len(inserted_tickers)}개 종목"
+                logger.info(f"{label} 데이터 {len(candles)}개 삽입 완료")
+            return inserted
+        except Exception as e:
+            logger.error(f"데이터 삽입 실패: {e}")
+            conn.rollback()
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _statement_rows(self, cursor):
+        """max_allowed_packet을 넘지 않는 INSERT 문장당 행 수"""
+        if self._max_allowed_packet is None:
+            cursor.execute("SELECT @@max_allowed_packet")
+            self._max_allowed_packet = int(cursor.fetchone()[0])
+
+        # 문장 앞부분과 여유분을 빼고 행당 추정 크기로 나눈다
+        budget = int(self._max_allowed_packet * 0.9) - 1024
+        return max(1, min(self.batch_rows, budget // INSERT_ROW_BYTES_ESTIMATE))
+
+    def _insert_statement(self, row_count, timeframe='DAILY', upsert=None):
+        """row_count행짜리 다중 행 INSERT 문 (upsert면 ON DUPLICATE KEY UPDATE 포함, 기본은 upsert 모드 여부)"""
+        row_placeholder = f"(%s, %s, %s, %s, %s, %s, %s, '{timeframe}')"
+        if upsert is None:
+            upsert = self.write_mode == 'upsert'
+        upsert_suffix = UPSERT_CLAUSE if upsert else ""
+        return f"""
+        INSERT INTO {self.target_table} (ticker, date, open_price, high_price, low_price, close_price, volume, timeframe)
+        VALUES """ + ', '.join([row_placeholder] * row_count) + upsert_suffix
+
+    def _insert_candles_batched(self, conn, cursor, candles, tickers, stored=None):
+        """
+        다중 행 VALUES (...), (...) INSERT로 나눠 삽입하고 commit_rows마다 커밋
+
+        트랜잭션과 언두 로그 크기가 커밋 간격으로 제한되고, 중간에 실패해도 이미
+        커밋된 구간은 남는다. 커밋 구간마다 소요 시간과 처리량을 기록한다.
+        stored는 upsert 전에 읽어 둔 (기존 행, 요약 행)으로, 커밋 구간마다 요약 변경분 계산에 쓴다.
+
+        Returns:
+            int: 커밋된 행 수
+        """
+        rows = self.candles_to_rows(candles, tickers)
+        statement_rows = self._statement_rows(cursor)
+
+        committed = 0
+        pending = 0
+        affected = 0
+        start = 0
+        started = time.perf_counter()
+        try:
+            while start < len(rows):
+                batch_rows = min(statement_rows, self.throttle.batch_rows) if self.throttle else statement_rows
+                batch = rows[start:start + batch_rows]
+                cursor.execute(self._insert_statement(len(batch)), [value for row in batch for value in row])
+                pending += len(batch)
+                affected += max(cursor.rowcount, 0)
+                start += len(batch)
+
+                if pending >= self.commit_rows or start >= len(rows):
+                    for statement in self._summary_statements(candles[committed:start], tickers, stored):
+                        cursor.execute(*statement)
+                    conn.commit()
+                    committed += pending
+                    elapsed = max(time.perf_counter() - started, 1e-9)
+                    logger.info(f"  커밋 {pending}행 ({elapsed:.2f}초, {pending / elapsed:,.0f}행/초) "
+                                f"- 누적 {committed}/{len(rows)}")
+                    if self.throttle:
+                        # 대기는 커밋 뒤에만 - 열린 트랜잭션이 잠금을 쥔 채 쉬지 않도록
+                        self.throttle.after_batch(pending)
+                    pending = 0
+                    started = time.perf_counter()
+
+            if self.write_mode == 'upsert':
+                # ON DUPLICATE KEY UPDATE 영향 행 수: 신규 1, 변경 2, 동일 0
+                logger.info(f"  upsert 영향 행 수 {affected} (신규 1, 변경 2, 값이 같은 행 0으로 집계)")
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"데이터 삽입 실패 ({committed}/{len(rows)}행까지 커밋됨): {e}")
+
+        return committed
+
+    def _candles_to_tsv(self, candles, tickers):
+        """구조화 배열을 LOAD DATA용 TSV 바이트로 직렬화 (메모리 내)"""
+        frame = pd.DataFrame({
+            'ticker': np.asarray(tickers, dtype=object)[candles['ticker_id']],
+            'date': candles['day'].astype('datetime64[D]'),
+            **{column: candles[column] / PRICE_SCALE for column in PRICE_COLUMNS},
+            'volume': candles['volume']
+        })
+        return frame.to_csv(sep='\t', header=False, index=False, float_format='%.2f').encode('utf-8')
+
+    def _load_candles_infile(self, cursor, candles, tickers, table='price_candle'):
+        """
+        LOAD DATA LOCAL INFILE로 캔들 적재
+
+        직렬화한 TSV를 임시 파일 대신 파이프에 쓰고, 드라이버에는 파이프의 읽기 쪽을
+        /dev/fd 경로로 넘긴다. 데이터는 디스크를 거치지 않는다.
+        LOCAL 적재에서 중복 키 행은 오류 대신 경고로 건너뛰므로, 호출 쪽은 반환값을
+        넘긴 행 수와 비교해야 한다.
+
+        Returns:
+            int: 서버가 보고한 적재 행 수 (cursor.rowcount)
+        """
+        payload = self._candles_to_tsv(candles, tickers)
+        read_fd, write_fd = os.pipe()
+
+        def feed():
+            try:
+                with os.fdopen(write_fd, 'wb') as pipe:
+                    pipe.write(payload)
+            except OSError:
+                # 드라이버가 읽기를 중단하면 파이프가 닫히므로 무시
+                pass
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        try:
+            cursor.execute(f"""
+                LOAD DATA LOCAL INFILE '/dev/fd/{read_fd}'
+                INTO TABLE {table}
+                CHARACTER SET utf8mb4
+                FIELDS TERMINATED BY '\\t'
+                LINES TERMINATED BY '\\n'
+                (ticker, date, open_price, high_price, low_price, close_price, volume)
+                SET timeframe = 'DAILY'
+            """)
+            return cursor.rowcount
+        finally:
+            os.close(read_fd)
+            feeder.join()
+
+    def _upsert_candles_infile(self, cursor, candles, tickers):
+        """
+        upsert 모드 LOAD DATA - 세션 임시 테이블에 적재한 뒤 INSERT ... SELECT로 갱신
+
+        LOAD DATA의 REPLACE 옵션은 삭제 후 재삽입이라 쓰기 증폭이 그대로이므로,
+        임시 테이블을 거쳐 ON DUPLICATE KEY UPDATE로 반영한다.
+
+        Returns:
+            int: 임시 테이블에 적재된 행 수 (INSERT ... SELECT의 영향 행 수는 변경 행을 2로 세므로 쓰지 않음)
+        """
+        cursor.execute("CREATE TEMPORARY TABLE IF NOT EXISTS price_candle_incoming LIKE price_candle")
+        cursor.execute("TRUNCATE TABLE price_candle_incoming")
+        loaded = self._load_candles_infile(cursor, candles, tickers, table='price_candle_incoming')
+        cursor.execute(f"""
+            INSERT INTO {self.target_table} (ticker, date, open_price, high_price, low_price, close_price, volume, timeframe)
+            SELECT ticker, date, open_price, high_price, low_price, close_price, volume, timeframe
+            FROM price_candle_incoming
+        """ + UPSERT_CLAUSE)
+        logger.info(f"  upsert 영향 행 수 {cursor.rowcount} (신규 1, 변경 2, 값이 같은 행 0으로 집계)")
+        return loaded
+
+    def _rollup_statements(self, bars, tickers, timeframe, statement_rows, replace_range=None, stored=None):
+        """
+        주봉/월봉 쓰기 문장 [(쿼리, 파라미터)] - 한 트랜잭션으로 실행
+
+        기간 시작일 키로 upsert하므로 같은 기간을 다시 써도 덮어쓴다. replace_range
+        (종목 코드, 첫 봉 날짜, 마지막 봉 날짜)를 주면 그 범위의 기존 봉을 먼저 지운다.
+        운영 테이블이면 쓰기 전에 읽어 둔 기존 봉(stored)과 비교한 변경분을 봉 주기 요약에 더한다.
+        """
+        statements = []
+        if replace_range is not None:
+            ticker, first_day, last_day = replace_range
+            statements.append((f"""
+                DELETE FROM {self.target_table}
+                WHERE ticker = %s AND timeframe = %s AND date BETWEEN %s AND %s
+            """, (ticker, timeframe, np.datetime64(first_day, 'D').item(), np.datetime64(last_day, 'D').item())))
+        rows = self.candles_to_rows(bars, tickers)
+        for start in range(0, len(rows), statement_rows):
+            batch = rows[start:start + statement_rows]
+            statements.append((self._insert_statement(len(batch), timeframe, upsert=True),
+                               [value for row in batch for value in row]))
+        statements += self._summary_statements(bars, tickers, stored, timeframe, replace_range)
+        return statements
+
+    def write_rollups(self, bars, tickers, timeframe, replace_range=None):
+        """
+        주봉/월봉을 한 트랜잭션으로 쓰기
+
+        실패하면 봉에 포함된 종목을 실패로 표시해, 저널에 완료가 기록되지 않고 다음
+        실행에서 다시 적재되게 한다.
+
+        Returns:
+            int: 쓴 봉 수 (실패 시 0)
+        """
+        if len(bars) == 0 and replace_range is None:
+            return 0
+
+        try:
+            if self._summary_tracked():
+                self.ensure_summary_table()
+            conn = self.connect_db()
+        except Exception as e:
+            self._rollups_failed(bars, tickers, timeframe, replace_range, e)
+            return 0
+        cursor = conn.cursor()
+        try:
+            stored = self._read_summary_stored(cursor, bars, tickers, timeframe, replace_range)
+            for statement in self._rollup_statements(bars, tickers, timeframe, self._statement_rows(cursor),
+                                                     replace_range, stored):
+                cursor.execute(*statement)
+            conn.commit()
+            if self.throttle:
+                self.throttle.after_batch(len(bars))
+            return len(bars)
+        except Exception as e:
+            conn.rollback()
+            self._rollups_failed(bars, tickers, timeframe, replace_range, e)
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _rollups_failed(self, bars, tickers, timeframe, replace_range, error):
+        """봉 쓰기 실패 기록 - 오류를 남기고 해당 종목을 실패로 표시"""
+        logger.error(f"{timeframe} 봉 {len(bars)}개 쓰기 실패: {error}")
+        failed = {tickers[ticker_id] for ticker_id in np.unique(bars['ticker_id'])}
+        if replace_range is not None:
+            failed.add(replace_range[0])
+        for ticker in failed:
+            self._mark_failed(ticker)
+
+    def _rollup_refresh_plan(self, ticker, start_date, end_date):
+        """
+        refresh_rollups가 다시 만들 봉 기간과 읽을 일봉 조회
+
+        Returns:
+            tuple: ({timeframe: (첫 기간 시작일, (마지막 기간 시작일, 마지막 기간 끝날))}, (쿼리, 파라미터))
+        """
+        first = int(np.datetime64(pd.Timestamp(start_date).date(), 'D').astype(np.int64))
+        last = int(np.datetime64(pd.Timestamp(end_date).date(), 'D').astype(np.int64))
+        bounds = {timeframe: (self._period_bounds(first, timeframe)[0], self._period_bounds(last, timeframe))
+                  for timeframe in self.rollups}
+        span_start = min(start for start, _ in bounds.values())
+        span_end = max(end for _, (_, end) in bounds.values())
+        return bounds, (f"""
+            SELECT TO_DAYS(date) - TO_DAYS('1970-01-01'),
+                   CAST(open_price * 100 AS SIGNED), CAST(high_price * 100 AS SIGNED),
+                   CAST(low_price * 100 AS SIGNED), CAST(close_price * 100 AS SIGNED), volume
+            FROM {self.target_table}
+            WHERE ticker = %s AND timeframe = 'DAILY' AND date BETWEEN %s AND %s
+            ORDER BY date
+        """, (ticker, np.datetime64(span_start, 'D').item(), np.datetime64(span_end, 'D').item()))
+
+    def _refreshed_rollups(self, ticker, bounds, rows):
+        """읽은 일봉 행으로 봉 주기별 (timeframe, 봉, 교체 범위) 생성"""
+        daily = np.zeros(len(rows), dtype=CANDLE_DTYPE)
+        if rows:
+            values = np.array(rows, dtype=np.int64)
+            daily['day'] = values[:, 0]
+            for position, column in enumerate(PRICE_COLUMNS + ('volume',), start=1):
+                daily[column] = values[:, position]
+
+        for timeframe, (first_start, (last_start, last_end)) in bounds.items():
+            selected = daily[(daily['day'] >= first_start) & (daily['day'] <= last_end)]
+            yield timeframe, self.rollup_candles(selected, timeframe), (ticker, first_start, last_start)
+
+    def refresh_rollups(self, ticker, start_date, end_date):
+        """
+        저장된 일봉으로 기간에 걸친 주봉/월봉을 다시 만든다
+
+        일봉 일부만 바뀌는 경로(증분 보강, 구간 생성, 해시 동기화, 기존 종목 봉 채우기)에서
+        쓴다. start_date ~ end_date가 걸친 주, 월 전체의 일봉만 읽어 rollup_candles로 봉을
+        만들고, 그 범위의 기존 봉을 지운 뒤 다시 쓴다. 읽는 양은 바뀐 구간과 앞뒤 한 달 이내다.
+        """
+        if not self.rollups:
+            return
+        bounds, query = self._rollup_refresh_plan(ticker, start_date, end_date)
+
+        conn = self.connect_db()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(*query)
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+
+        for timeframe, bars, replace_range in self._refreshed_rollups(ticker, bounds, rows):
+            self.write_rollups(bars, [ticker], timeframe, replace_range=replace_range)
+
+    def enhance_korean_stocks(self, start_date=KOREAN_HISTORY[0], end_date=KOREAN_HISTORY[1]):
+        """한국 주요 종목 데이터 보강 - 우선순위에 따른 단계별 처리"""
+        logger.info("한국 주요 종목 데이터 보강 시작")
+
+        # 우선순위에 따라 정렬
+        sorted_stocks = sorted(self.korean_stocks.items(), key=lambda x: x[1]['priority'])
+
+        # 전 종목 현황을 한 번에 조회해 계획 수립 - 기존 데이터가 충분한 종목은 스킵
+        universe = dict(sorted_stocks)
+        plan = self.plan_universe(universe, start_date, end_date, skip_threshold=100)
+        self.execute_plan(plan, universe, start_date, end_date)
+
+    def enhance_global_etfs(self, start_date=GLOBAL_HISTORY[0], end_date=GLOBAL_HISTORY[1]):
+        """글로벌 ETF 데이터 보강"""
+        logger.info("글로벌 ETF 데이터 보강 시작")
+
+        # 기존 데이터 삭제(upsert 모드는 생략) 후 새 데이터 생성 및 삽입 - ETF 전체를 한 번에
+        plan = self.plan_universe(self.global_etfs, start_date, end_date)
+        self.execute_plan(plan, self.global_etfs, start_date, end_date)
+
+    def load_universe(self, universe, start_date, end_date, clear_existing=False):
+        """
+        종목 묶음의 데이터 생성 및 삽입
+
+        기본적으로 iter_price_chunks로 청크를 만들면서 바로 삽입하므로 메모리 사용량이
+        청크 하나 분량으로 유지된다. workers가 2 이상이면 생성은 프로세스 풀로, 삽입은
+        writers개의 DB 연결로 나누어 처리한다. 종목별 난수 스트림을 쓰므로 워커 수나
+        청크 크기와 관계없이 결과는 같다.
+
+        Args:
+            universe: {종목 코드: 종목 정보} 형태의 대상 종목
+            start_date: 시작일
+            end_date: 종료일
+            clear_existing: 삽입 전 기존 데이터를 삭제할지 - True면 전 종목, 종목 코드 집합이면 그 종목만
+        """
+        clear_tickers = set(universe) if clear_existing is True else set(clear_existing or ())
+        if self.pipeline or (self.workers > 1 and len(universe) > 1):
+            self._load_universe_pipelined(universe, start_date, end_date, clear_tickers)
+        else:
+            self._load_universe_sequential(universe, start_date, end_date, clear_tickers)
+        self._journal_finish(universe)
+
+    def _last_trading_day(self, start_date, end_date):
+        """생성 기간 마지막 거래일 (epoch 일, 거래일이 없으면 None)"""
+        calendar = pd.bdate_range(start=start_date, end=end_date)
+        return int(calendar.values.astype('datetime64[D]').astype(np.int64)[-1]) if len(calendar) else None
+
+    def _load_universe_sequential(self, universe, start_date, end_date, clear_tickers):
+        """현재 스레드에서 청크 생성과 삽입을 번갈아 실행"""
+        inserted = {}
+        started = set()
+        rollup_carry = {}
+        last_day = self._last_trading_day(start_date, end_date)
+        for chunk in self.iter_price_chunks(universe, start_date, end_date, self.chunk_rows):
+            tickers = chunk['tickers']
+            try:
+                # 종목의 첫 청크에서만 기존 데이터 삭제
+                for ticker in tickers:
+                    if ticker not in started:
+                        self._begin_ticker(ticker, clear=ticker in clear_tickers)
+                        started.add(ticker)
+                candles = self.matrix_to_candles(chunk)
+                counts = self._write_candles(candles, tickers)
+                for ticker, count in counts.items():
+                    inserted[ticker] = inserted.get(ticker, 0) + count
+                for timeframe, bars in self._rollup_stream(rollup_carry, candles, tickers, last_day):
+                    self.write_rollups(bars, tickers, timeframe)
+
+            except Exception as e:
+                logger.error(f"{', '.join(tickers)} 처리 중 오류 발생: {e}")
+                for ticker in tickers:
+                    self._mark_failed(ticker)
+                continue
+
+        for timeframe, bars, tickers in self._flush_rollups(rollup_carry):
+            self.write_rollups(bars, tickers, timeframe)
+        for ticker, count in inserted.items():
+            logger.info(f"{ticker} 완료 - {count}개 레코드 생성")
+
+    def _iter_generated_batches(self, universe, start_date, end_date):
+        """
+        파이프라인 생산자 - (캔들, 종목 리스트)를 생성되는 대로 내보낸다
+
+        workers가 1이면 현재 프로세스에서 청크 단위로, 2 이상이면 프로세스 풀에서 만든다.
+        기간이 chunk_rows 이하면 (종목 수 x 거래일)이 chunk_rows를 넘지 않는 종목 묶음을
+        작업 하나로, 더 길면 (종목, 거래일 구간) 청크 하나를 작업 하나로 내고, 같은 종목의
+        다음 청크는 앞 청크가 돌려준 난수 스트림과 마지막 종가로 이어서 제출한다. 프로세스
+        풀에는 workers * 2개까지만 작업을 걸어 두므로 대기 중인 결과도 청크 workers * 2개
+        분량을 넘지 않고, 소비 쪽이 멈추면 생성도 그만큼만 앞서 나가고 멈춘다.
+        검증(--validate reject)이나 생성에 실패한 청크는 건너뛰고 그 종목을 실패로 표시한다
+        (긴 기간 종목은 이어 만들 상태가 없으므로 남은 청크도 건너뛴다).
+        """
+        if self.workers == 1:
+            for chunk in self.iter_price_chunks(universe, start_date, end_date, self.chunk_rows):
+                try:
+                    candles = self.matrix_to_candles(chunk)
+                except Exception as e:
+                    logger.error(f"{', '.join(chunk['tickers'])} 처리 중 오류 발생: {e}")
+                    for ticker in chunk['tickers']:
+                        self._mark_failed(ticker)
+                    continue
+                yield candles, chunk['tickers']
+            return
+
+        tickers = list(universe.keys())
+        days = len(pd.bdate_range(start=start_date, end=end_date))
+        options = (start_date, end_date, self.seed, self.rng_mode, self.validate)
+        if days > self.chunk_rows:
+            groups = iter([])
+            pending_tickers = iter(tickers)
+        else:
+            # 워커당 여러 묶음을 배정해 종목별 처리 시간 편차를 흡수하되, 묶음 하나가 청크 크기를 넘지 않게
+            group_size = max(1, min(math.ceil(len(tickers) / (self.workers * 4)), self.chunk_rows // max(days, 1)))
+            groups = iter([
+                {ticker: universe[ticker] for ticker in tickers[i:i + group_size]}
+                for i in range(0, len(tickers), group_size)
+            ])
+            pending_tickers = iter([])
+
+        with ProcessPoolExecutor(max_workers=self.workers) as generator_pool:
+            def submit_chunk(ticker, offset, state=None):
+                future = generator_pool.submit(_generate_ticker_chunk, ticker, universe[ticker], *options,
+                                               self.chunk_rows, offset, state)
+                in_flight[future] = ([ticker], offset)
+
+            def submit_next():
+                group = next(groups, None)
+                if group is not None:
+                    future = generator_pool.submit(_generate_universe_chunk, group, *options)
+                    in_flight[future] = (list(group), None)
+                    return
+                ticker = next(pending_tickers, None)
+                if ticker is not None:
+                    submit_chunk(ticker, 0)
+
+            in_flight = {}
+            for _ in range(self.workers * 2):
+                submit_next()
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    task_tickers, offset = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"데이터 생성 작업 실패 ({', '.join(task_tickers)}): {e}")
+                        for ticker in task_tickers:
+                            self._mark_failed(ticker)
+                        submit_next()
+                        continue
+
+                    if offset is None:
+                        submit_next()
+                        yield result
+                        continue
+                    candles, chunk_tickers, state = result
+                    if offset + self.chunk_rows < days:
+                        submit_chunk(chunk_tickers[0], offset + self.chunk_rows, state)
+                    else:
+                        submit_next()
+                    yield candles, chunk_tickers
+
+    def _load_universe_pipelined(self, universe, start_date, end_date, clear_tickers):
+        """
+        생성과 삽입을 겹쳐 실행하는 생산자/소비자 파이프라인
+
+        생산자(현재 스레드)가 만든 캔들을 종목별로 나눠 queue_depth 크기의 큐에 넣고,
+        writers개의 삽입 스레드가 꺼내 DB에 쓴다. 큐가 차면 생산자가 기다리므로
+        (backpressure) 메모리는 큐 크기만큼만 쓰고, 전체 시간은 생성과 삽입 중 느린
+        쪽에 가까워진다. 종목별 기존 데이터 삭제는 큐에 넣기 전에 생산자가 처리해
+        같은 종목의 다른 청크보다 늦게 실행되는 일이 없다.
+        """
+        work = queue.Queue(maxsize=self.queue_depth)
+        inserted = {}
+        stats = {'producer_wait': 0.0, 'writer_wait': 0.0}
+        stats_lock = threading.Lock()
+
+        def writer():
+            while True:
+                started = time.perf_counter()
+                item = work.get()
+                with stats_lock:
+                    stats['writer_wait'] += time.perf_counter() - started
+                if item is None:
+                    return
+                ticker, candles, tickers, timeframe = item
+                try:
+                    if timeframe != 'DAILY':
+                        self.write_rollups(candles, tickers, timeframe)
+                        continue
+                    count = self._write_candles(candles, tickers).get(ticker, 0)
+                    with stats_lock:
+                        inserted[ticker] = inserted.get(ticker, 0) + count
+                except Exception as e:
+                    logger.error(f"{ticker or timeframe} 처리 중 오류 발생: {e}")
+                    if ticker is not None:
+                        self._mark_failed(ticker)
+
+        logger.info(f"파이프라인 처리 시작: 생성 프로세스 {self.workers}개, 삽입 스레드 {self.writers}개, "
+                    f"큐 크기 {self.queue_depth}")
+        started = time.perf_counter()
+        threads = [threading.Thread(target=writer, name=f'price-writer-{i}', daemon=True)
+                   for i in range(self.writers)]
+        for thread in threads:
+            thread.start()
+
+        begun = set()
+        rollup_carry = {}
+        last_day = self._last_trading_day(start_date, end_date)
+        try:
+            for candles, tickers in self._iter_generated_batches(universe, start_date, end_date):
+                for ticker_id, ticker_candles in self._split_by_ticker(candles):
+                    ticker = tickers[ticker_id]
+                    if ticker not in begun:
+                        self._begin_ticker(ticker, clear=ticker in clear_tickers)
+                        begun.add(ticker)
+
+                    # 큐가 가득 차면 삽입 스레드가 따라올 때까지 대기
+                    put_started = time.perf_counter()
+                    work.put((ticker, ticker_candles, tickers, 'DAILY'))
+                    stats['producer_wait'] += time.perf_counter() - put_started
+
+                # 봉 집계는 청크 순서가 보장되는 생산자에서
+                for timeframe, bars in self._rollup_stream(rollup_carry, candles, tickers, last_day):
+                    work.put((None, bars, tickers, timeframe))
+            for timeframe, bars, tickers in self._flush_rollups(rollup_carry):
+                work.put((None, bars, tickers, timeframe))
+        finally:
+            for _ in threads:
+                work.put(None)
+            for thread in threads:
+                thread.join()
+
+        for ticker, count in inserted.items():
+            logger.info(f"{ticker} 완료 - {count}개 레코드 생성")
+
+        # 생성 대기가 길면 삽입이, 삽입 스레드 대기가 길면 생성이 병목
+        elapsed = time.perf_counter() - started
+        logger.info(f"파이프라인 완료 ({elapsed:.2f}초) - 생성 대기 {stats['producer_wait']:.2f}초, "
+                    f"삽입 스레드 평균 대기 {stats['writer_wait'] / len(threads):.2f}초")
+
+    def _write_candles(self, candles, tickers):
+        """
+        구조화 배열 캔들을 DB에 저장
+
+        저널을 쓰면 종목별로 나눠, 이전 실행에서 끝난 구간은 건너뛰고 일부만 썼을 수 있는
+        구간은 지운 뒤 다시 쓰며, 끝까지 커밋된 구간을 저널에 기록한다.
+
+        Returns:
+            dict: {종목 코드: 삽입한 행 수}
+        """
+        if not self._journal_progress:
+            # 데이터 삽입 - 실패 시 앞에서부터 커밋된 행만 집계
+            inserted = self.insert_candles(candles, tickers)
+            counts = np.bincount(candles['ticker_id'][:inserted], minlength=len(tickers))
+            return {tickers[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+        counts = {}
+        for ticker_id, ticker_candles in self._split_by_ticker(candles):
+            ticker = tickers[ticker_id]
+            first_day, last_day = ticker_candles['day'][0], ticker_candles['day'][-1]
+            action = self._resume_action(ticker, ticker_candles)
+            if action == 'skip':
+                continue
+            if action == 'rewrite':
+                self.clear_date_range(ticker, np.datetime64(int(first_day), 'D').item(),
+                                      np.datetime64(int(last_day), 'D').item())
+
+            inserted = self.insert_candles(ticker_candles, tickers)
+            counts[ticker] = inserted
+            if inserted == len(ticker_candles):
+                self._journal_record(ticker, 'CHUNK', first_day, last_day, inserted)
+            else:
+                self._mark_failed(ticker)
+        return counts
+
+    def _mark_failed(self, ticker):
+        """이번 적재에서 일부 청크가 실패한 종목 - 완료 기록을 남기지 않는다"""
+        state = self._journal_progress.get(ticker)
+        if state is not None:
+            state['failed'] = True
+
+    def _secondary_indexes(self, cursor, table):
+        """
+        테이블의 비고유 보조 인덱스 정의
+
+        Returns:
+            dict: {인덱스 이름: 'ADD INDEX' 뒤에 붙일 컬럼 정의 문자열} - 인덱스 이름 순
+        """
+        cursor.execute("""
+            SELECT INDEX_NAME, COLUMN_NAME, COLLATION, SUB_PART
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND NON_UNIQUE = 1
+            ORDER BY INDEX_NAME, SEQ_IN_INDEX
+        """, (table,))
+
+        indexes = {}
+        for name, column, collation, sub_part in cursor.fetchall():
+            part = f"`{column}`" + (f"({sub_part})" if sub_part else "") + (" DESC" if collation == 'D' else "")
+            indexes.setdefault(name, []).append(part)
+        return {name: ', '.join(parts) for name, parts in indexes.items()}
+
+    def _drop_indexes(self, cursor, table, names):
+        """보조 인덱스를 ALTER TABLE 한 번으로 삭제"""
+        if names:
+            cursor.execute(f"ALTER TABLE {table} " + ', '.join(f"DROP INDEX `{name}`" for name in names))
+
+    def _build_indexes(self, cursor, table, indexes):
+        """보조 인덱스를 ALTER TABLE 한 번으로 생성 - 테이블을 한 번 읽어 인덱스별로 정렬 빌드"""
+        if indexes:
+            # INPLACE + LOCK=NONE: 빌드 중에도 읽기/쓰기 허용
+            cursor.execute(f"ALTER TABLE {table} " + ', '.join(
+                f"ADD INDEX `{name}` ({columns})" for name, columns in indexes.items()) +
+                ", ALGORITHM=INPLACE, LOCK=NONE")
+
+    def _alter_indexes(self, action, *args):
+        """
+        별도 연결에서 인덱스 DDL 실행 (_drop_indexes, _build_indexes)
+
+        DDL은 암묵적으로 커밋되고, DEFERRED_INDEX_TABLE 기록 쓰기는 action이 끝나면 여기서 커밋한다.
+        """
+        with self.db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                result = action(cursor, *args)
+                conn.commit()
+                return result
+            finally:
+                cursor.close()
+
+    def _record_deferred_indexes(self, cursor, table, indexes):
+        """내리기 전에 보조 인덱스 정의를 DEFERRED_INDEX_TABLE에 기록하고, 이전에 남은 기록과 합쳐 반환"""
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {DEFERRED_INDEX_TABLE} (
+                table_name VARCHAR(64) NOT NULL COMMENT '대상 테이블',
+                index_name VARCHAR(64) NOT NULL COMMENT '인덱스 이름',
+                columns_sql VARCHAR(1000) NOT NULL COMMENT 'ADD INDEX 컬럼 정의',
+                dropped_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '삭제 시각',
+                PRIMARY KEY (table_name, index_name)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='적재 동안 내려 둔 보조 인덱스 정의'
+        """)
+        if indexes:
+            cursor.execute(f"""
+                REPLACE INTO {DEFERRED_INDEX_TABLE} (table_name, index_name, columns_sql)
+                VALUES """ + ', '.join(['(%s, %s, %s)'] * len(indexes)),
+                [value for name, columns in indexes.items() for value in (table, name, columns)])
+        return self._pending_deferred_indexes(cursor, table)
+
+    def _pending_deferred_indexes(self, cursor, table):
+        """DEFERRED_INDEX_TABLE에 남은 (아직 재생성하지 않은) 보조 인덱스 정의"""
         try:
-            conn = mysql.connector.connect(**self.db_config)
-            logger.info("데이터베이스 연결 성공")
-            return conn
-        except Exception as e:
-            logger.error(f"데이터베이스 연결 실패: {e}")
+            cursor.execute(f"""
+                SELECT index_name, columns_sql FROM {DEFERRED_INDEX_TABLE}
+                WHERE table_name = %s
+                ORDER BY index_name
+            """, (table,))
+        except mysql.connector.Error as e:
+            # 1146: ER_NO_SUCH_TABLE - 내려 둔 인덱스가 없었음
+            if e.errno == 1146:
+                return {}
             raise
+        return dict(cursor.fetchall())
 
-    def generate_market_scenario(self, days, scenario_type='mixed'):
-        """
-        시장 시나리오별 수익률 패턴 생성
+    def _restore_indexes(self, cursor, table, indexes):
+        """기록된 보조 인덱스 중 테이블에 없는 것만 재생성하고 기록 삭제"""
+        existing = self._secondary_indexes(cursor, table)
+        self._build_indexes(cursor, table, {name: columns for name, columns in indexes.items()
+                                            if name not in existing})
+        if indexes:
+            cursor.execute(f"DELETE FROM {DEFERRED_INDEX_TABLE} WHERE table_name = %s", (table,))
 
-        Args:
-            days: 생성할 일수
-            scenario_type: 'bull'(상승), 'bear'(하락), 'sideways'(횡보), 'mixed'(혼합)
+    @contextmanager
+    def deferred_indexes(self, table=LIVE_TABLE):
         """
-        if scenario_type == 'bull':
-            # 상승장: 전체적으로 상승 추세
-            trend = np.linspace(0, 0.8, days)  # 80% 상승
-            daily_returns = np.random.normal(0.001, 0.02, days) + trend / days
+        블록 동안 비고유 보조 인덱스를 내려 두고, 끝나면(실패해도) 한 번에 재생성
 
-        elif scenario_type == 'bear':
-            # 하락장: 전체적으로 하락 추세
-            trend = np.linspace(0, -0.4, days)  # 40% 하락
-            daily_returns = np.random.normal(-0.001, 0.025, days) + trend / days
-
-        elif scenario_type == 'sideways':
-            # 횡보장: 변동성은 있지만 전체적으로 평평
-            daily_returns = np.random.normal(0, 0.015, days)
+        행마다 인덱스별 임의 페이지 쓰기를 하는 대신 적재 후 정렬 빌드 한 번으로
+        끝낸다. 그동안 운영 조회는 유니크 키만 쓸 수 있으므로 서비스 중인 테이블에는
+        --swap 적재를 권장한다. 내리기 전에 정의를 DEFERRED_INDEX_TABLE에 커밋해 두므로
+        프로세스가 강제 종료돼도 --restore-indexes로 되살릴 수 있고, 다음 실행도 남은
+        기록을 함께 재생성한다.
+        """
+        current = self._alter_indexes(self._secondary_indexes, table)
+        indexes = self._alter_indexes(self._record_deferred_indexes, table, current)
+        self._alter_indexes(self._drop_indexes, table, list(current))
+        logger.info(f"보조 인덱스 {len(indexes)}개 삭제 후 적재: {', '.join(indexes)} "
+                    f"(정의는 {DEFERRED_INDEX_TABLE}에 기록)")
 
-        else:  # mixed
-            # 혼합: 다양한 시장 사이클 포함
-            bull_period = days // 3
-            bear_period = days // 4
-            sideways_period = days - bull_period - bear_period
+        try:
+            yield indexes
+        finally:
+            started = time.perf_counter()
+            self._alter_indexes(self._restore_indexes, table, indexes)
+            logger.info(f"보조 인덱스 {len(indexes)}개 재생성 ({time.perf_counter() - started:.2f}초)")
 
-            bull_returns = np.random.normal(0.002, 0.02, bull_period)
-            bear_returns = np.random.normal(-0.003, 0.03, bear_period)
-            sideways_returns = np.random.normal(0, 0.015, sideways_period)
+    def restore_deferred_indexes(self, table=LIVE_TABLE):
+        """중단된 --defer-indexes 적재가 내려 둔 보조 인덱스를 기록대로 재생성"""
+        indexes = self._alter_indexes(self._pending_deferred_indexes, table)
+        if not indexes:
+            logger.info(f"{table}에 재생성할 보조 인덱스 기록이 없습니다")
+            return
+        if self.dry_run:
+            for name, columns in indexes.items():
+                logger.info(f"  {name} ({columns})")
+            logger.info(f"드라이런 - 보조 인덱스 {len(indexes)}개 재생성 생략")
+            return
+        started = time.perf_counter()
+        self._alter_indexes(self._restore_indexes, table, indexes)
+        logger.info(f"보조 인덱스 {len(indexes)}개 복구: {', '.join(indexes)} ({time.perf_counter() - started:.2f}초)")
 
-            daily_returns = np.concatenate([bull_returns, bear_returns, sideways_returns])
-            np.random.shuffle(daily_returns)
+    def _time_probe_insert(self, candles, tickers):
+        """측정용 테이블을 비우고 캔들을 삽입한 소요 시간(초)"""
+        with self.db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"TRUNCATE TABLE {INDEX_PROBE_TABLE}")
+            finally:
+                cursor.close()
 
-        return daily_returns
+        started = time.perf_counter()
+        self.insert_candles(candles, tickers)
+        return max(time.perf_counter() - started, 1e-9)
 
-    def generate_realistic_price_series(self, ticker, start_date, end_date, base_price, volatility):
+    def report_index_costs(self, sample_rows=INDEX_PROBE_ROWS):
         """
-        현실적인 주가 시계열 데이터 생성
+        price_candle 보조 인덱스별 크기와 삽입 비용 보고
 
-        Args:
-            ticker: 종목 코드
-            start_date: 시작일
-            end_date: 종료일
-            base_price: 기준 가격
-            volatility: 변동성 (연율)
+        운영 테이블과 같은 구조의 측정용 테이블에 보조 인덱스 없이 표본을 넣은 시간을
+        기준으로, 인덱스를 하나씩만 붙여 같은 표본을 넣었을 때의 처리량 저하를 잰다.
+        다른 인덱스(유니크 키 포함)의 앞부분 컬럼과 같은 인덱스는 중복으로 표시한다.
         """
-        logger.info(f"{ticker} 데이터 생성 시작: {start_date} ~ {end_date}")
+        universe = {**self.korean_stocks, **self.global_etfs}
+        matrix = self.generate_price_matrix(universe, *KOREAN_HISTORY)
+        candles = self.matrix_to_candles(matrix)[:sample_rows]
+        tickers = matrix['tickers']
 
-        # 날짜 범위 생성 (주말 제외)
-        date_range = pd.bdate_range(start=start_date, end=end_date)
-        days = len(date_range)
+        with self.db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                indexes = self._secondary_indexes(cursor, LIVE_TABLE)
+                cursor.execute("""
+                    SELECT INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX)
+                    FROM information_schema.STATISTICS
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME <> 'PRIMARY'
+                    GROUP BY INDEX_NAME
+                """, (LIVE_TABLE,))
+                columns = {name: column_list.split(',') for name, column_list in cursor.fetchall()}
+                cursor.execute("""
+                    SELECT index_name, stat_value * @@innodb_page_size
+                    FROM mysql.innodb_index_stats
+                    WHERE database_name = DATABASE() AND table_name = %s AND stat_name = 'size'
+                """, (LIVE_TABLE,))
+                sizes = {name: int(size) for name, size in cursor.fetchall()}
 
-        # 시장 시나리오 결정 (기간에 따라)
-        if days > 500:  # 2년 이상
-            scenario = 'mixed'
-        elif days > 250:  # 1년 이상
-            scenario = random.choice(['bull', 'bear', 'mixed'])
-        else:  # 1년 미만
-            scenario = random.choice(['bull', 'bear', 'sideways'])
+                cursor.execute(f"DROP TABLE IF EXISTS {INDEX_PROBE_TABLE}")
+                cursor.execute(f"CREATE TABLE {INDEX_PROBE_TABLE} LIKE {LIVE_TABLE}")
+                self._drop_indexes(cursor, INDEX_PROBE_TABLE, list(indexes))
+            finally:
+                cursor.close()
 
-        # 일별 수익률 생성
-        daily_returns = self.generate_market_scenario(days, scenario)
+        self.target_table = INDEX_PROBE_TABLE
+        try:
+            baseline = self._time_probe_insert(candles, tickers)
+            logger.info(f"=== 보조 인덱스별 삽입 비용 (표본 {len(candles)}행) ===")
+            logger.info(f"보조 인덱스 없음: {len(candles) / baseline:,.0f}행/초")
 
-        # 변동성 조정
-        daily_returns *= volatility
+            for name, definition in indexes.items():
+                self._alter_indexes(self._build_indexes, INDEX_PROBE_TABLE, {name: definition})
+                elapsed = self._time_probe_insert(candles, tickers)
+                self._alter_indexes(self._drop_indexes, INDEX_PROBE_TABLE, [name])
 
-        # 특별 이벤트 시뮬레이션 (큰 상승/하락)
-        event_probability = 0.05  # 5% 확률로 특별 이벤트
-        for i in range(days):
-            if random.random() < event_probability:
-                event_magnitude = random.choice([-0.08, -0.05, 0.05, 0.08])  # ±5%, ±8%
-                daily_returns[i] += event_magnitude
+                overlaps = [other for other, other_columns in columns.items()
+                            if other != name and other_columns[:len(columns[name])] == columns[name]]
+                note = f", 중복({' / '.join(overlaps)}의 앞부분)" if overlaps else ""
+                logger.info(f"{name} ({definition}): 크기 {sizes.get(name, 0) / 1024 / 1024:,.1f}MB, "
+                            f"{len(candles) / elapsed:,.0f}행/초, 삽입 시간 {(elapsed / baseline - 1) * 100:+.0f}%{note}")
+        finally:
+            self.target_table = LIVE_TABLE
+            with self.db_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(f"DROP TABLE IF EXISTS {INDEX_PROBE_TABLE}")
+                finally:
+                    cursor.close()
 
-        # 가격 시계열 생성
-        prices = [base_price]
-        for return_rate in daily_returns:
-            new_price = prices[-1] * (1 + return_rate)
-            prices.append(max(new_price, base_price * 0.1))  # 최소 10% 가격 유지
+    def _staging_keep_filter(self, tickers):
+        """섀도 테이블로 옮길 유지 행(다른 종목, 대상 종목의 일봉 외 캔들) 조건과 파라미터"""
+        # 봉 주기도 함께 만들면 대상 종목은 주봉/월봉까지 새로 적재
+        placeholders = ', '.join(['%s'] * len(tickers))
+        timeframe_filter = "" if self.rollups else " AND timeframe = 'DAILY'"
+        return f"NOT (ticker IN ({placeholders}){timeframe_filter})", tuple(tickers)
 
-        prices = prices[1:]  # 첫 번째 중복 제거
+    def prepare_staging_table(self, tickers):
+        """
+        섀도 테이블 준비
 
-        # OHLC 데이터 생성
-        data = []
-        for i, (date, close_price) in enumerate(zip(date_range, prices)):
-            # 일중 변동성 시뮬레이션
-            intraday_volatility = 0.02  # 2% 일중 변동성
-            high_factor = 1 + abs(np.random.normal(0, intraday_volatility))
-            low_factor = 1 - abs(np.random.normal(0, intraday_volatility))
-
-            # 이전 종가를 시가로 사용 (갭 상승/하락 시뮬레이션)
-            if i == 0:
-                open_price = close_price * random.uniform(0.99, 1.01)
-            else:
-                gap_factor = random.uniform(0.995, 1.005)  # ±0.5% 갭
-                open_price = prices[i-1] * gap_factor
+        운영 테이블과 같은 구조로 만들되 비고유 보조 인덱스는 빼고(유니크 키만 유지),
+        이번에 재생성하지 않는 행(다른 종목, 대상 종목의 일봉 외 캔들)은 복사해 둔다.
+        복사는 id 범위 청크마다 READ COMMITTED 트랜잭션으로 커밋하므로 원본 행에 공유
+        잠금을 오래 잡지 않아 적재 중에도 백엔드 쓰기가 막히지 않는다. 복사 시작 시점의
+        최대 id를 돌려줘 교체 직전에 그 뒤로 쓰인 행을 따라잡는다 (swap_staging_table).
 
-            high_price = max(open_price, close_price) * high_factor
-            low_price = min(open_price, close_price) * low_factor
+        Returns:
+            tuple: (적재 후 다시 만들 보조 인덱스 정의, 복사한 최대 id)
+        """
+        keep, params = self._staging_keep_filter(tickers)
+        with self.db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+                cursor.execute(f"CREATE TABLE {STAGING_TABLE} LIKE {LIVE_TABLE}")
+                indexes = self._secondary_indexes(cursor, STAGING_TABLE)
+                self._drop_indexes(cursor, STAGING_TABLE, list(indexes))
 
-            # 거래량 시뮬레이션 (가격 변동성과 상관관계)
-            price_change = abs(daily_returns[i])
-            base_volume = random.randint(100000, 500000)
-            volume_multiplier = 1 + price_change * 10  # 변동성이 클수록 거래량 증가
-            volume = int(base_volume * volume_multiplier)
+                cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {LIVE_TABLE}")
+                high_water = int(cursor.fetchone()[0])
+                conn.commit()
 
-            data.append({
-                'ticker': ticker,
-                'date': date.date(),
-                'open_price': round(open_price, 2),
-                'high_price': round(high_price, 2),
-                'low_price': round(low_price, 2),
-                'close_price': round(close_price, 2),
-                'volume': volume,
-                'timeframe': 'DAILY'
-            })
+                copied = 0
+                last_id = 0
+                while last_id < high_water:
+                    upper = min(last_id + STAGING_COPY_CHUNK_IDS, high_water)
+                    cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+                    cursor.execute(f"""
+                        INSERT INTO {STAGING_TABLE}
+                        SELECT * FROM {LIVE_TABLE}
+                        WHERE id > %s AND id <= %s AND {keep}
+                    """, (last_id, upper, *params))
+                    chunk_copied = max(cursor.rowcount, 0)
+                    conn.commit()
+                    copied += chunk_copied
+                    last_id = upper
+                    if self.throttle:
+                        self.throttle.after_batch(chunk_copied)
+                logger.info(f"섀도 테이블 {STAGING_TABLE} 준비 - 유지 행 {copied}개 복사 (id {high_water}까지), "
+                            f"보조 인덱스 {len(indexes)}개 적재 후 생성")
+                return indexes, high_water
+            finally:
+                cursor.close()
 
-        logger.info(f"{ticker} 데이터 생성 완료: {len(data)}개 레코드")
-        return data
+    def _catch_up_staging(self, cursor, tickers, after_id):
+        """
+        운영 테이블에서 after_id 뒤로 쓰인 유지 행을 섀도 테이블로 복사
 
-    def check_existing_data_count(self, ticker):
-        """기존 데이터 개수 확인"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
+        id는 섀도 테이블에서 새로 받고(적재한 행과 겹치지 않도록), 이미 복사된 행은
+        유니크 키로 걸러지므로 같은 범위를 다시 훑어도 된다.
 
-        try:
-            cursor.execute("SELECT COUNT(*) FROM price_candle WHERE ticker = %s", (ticker,))
-            count = cursor.fetchone()[0]
-            return count
-        except Exception as e:
-            logger.error(f"{ticker} 데이터 개수 확인 실패: {e}")
-            return 0
-        finally:
-            cursor.close()
-            conn.close()
+        Returns:
+            int: 새로 복사한 행 수
+        """
+        keep, params = self._staging_keep_filter(tickers)
+        cursor.execute(f"""
+            INSERT INTO {STAGING_TABLE} (ticker, date, open_price, high_price, low_price, close_price, volume, timeframe)
+            SELECT ticker, date, open_price, high_price, low_price, close_price, volume, timeframe
+            FROM {LIVE_TABLE}
+            WHERE id > %s AND {keep}
+            ON DUPLICATE KEY UPDATE id = id
+        """, (after_id, *params))
+        # ON DUPLICATE KEY UPDATE로 값이 그대로인 행은 0, 새 행은 1로 집계된다
+        return max(cursor.rowcount, 0)
 
-    def clear_existing_data(self, ticker):
-        """기존 데이터 삭제"""
-        conn = self.connect_db()
-        cursor = conn.cursor()
+    def validate_staging_table(self, batches):
+        """
+        교체 전 섀도 테이블 검증
 
-        try:
-            cursor.execute("DELETE FROM price_candle WHERE ticker = %s", (ticker,))
-            deleted_count = cursor.rowcount
-            conn.commit()
-            logger.info(f"{ticker} 기존 데이터 {deleted_count}개 삭제")
-        except Exception as e:
-            logger.error(f"{ticker} 데이터 삭제 실패: {e}")
-            conn.rollback()
-        finally:
-            cursor.close()
-            conn.close()
+        종목별 일봉 수가 생성 기간 거래일 수와 같은지, OHLC 관계가 맞는지 확인한다.
 
-    def insert_price_data(self, data):
-        """주가 데이터 삽입"""
-        if not data:
-            logger.warning("삽입할 데이터가 없습니다")
+        Returns:
+            list: 문제 설명 목록 (비어 있으면 통과)
+        """
+        problems = []
+        with self.db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                for universe, start_date, end_date in batches:
+                    tickers = list(universe.keys())
+                    expected = len(pd.bdate_range(start=start_date, end=end_date))
+                    placeholders = ', '.join(['%s'] * len(tickers))
+                    cursor.execute(f"""
+                        SELECT ticker, COUNT(*)
+                        FROM {STAGING_TABLE}
+                        WHERE ticker IN ({placeholders}) AND timeframe = 'DAILY' AND date BETWEEN %s AND %s
+                        GROUP BY ticker
+                    """, (*tickers, start_date, end_date))
+                    counts = dict(cursor.fetchall())
+                    for ticker in tickers:
+                        if counts.get(ticker, 0) != expected:
+                            problems.append(f"{ticker} 일봉 {counts.get(ticker, 0)}개 (예상 {expected}개)")
+
+                cursor.execute(f"""
+                    SELECT COUNT(*) FROM {STAGING_TABLE}
+                    WHERE low_price > high_price
+                       OR close_price > high_price OR close_price < low_price
+                       OR open_price > high_price OR open_price < low_price
+                """)
+                invalid = cursor.fetchone()[0]
+                if invalid:
+                    problems.append(f"OHLC 관계 오류 {invalid}개")
+            finally:
+                cursor.close()
+        return problems
+
+    def swap_staging_table(self, tickers, high_water):
+        """
+        섀도 테이블을 운영 테이블로 원자적 교체 - 이전 운영 테이블은 RETIRED_TABLE로 보관
+
+        적재하는 동안 운영 테이블에 새로 쓰인 유지 행(백엔드 MarketDataService 저장 등)을
+        먼저 잠금 없이 따라잡고, 운영/섀도 테이블 쓰기를 LOCK TABLES로 막은 짧은 구간에서
+        남은 행만 한 번 더 복사한 뒤 같은 잠금 안에서 RENAME TABLE로 바꾼다.
+        """
+        with self.db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"DROP TABLE IF EXISTS {RETIRED_TABLE}")
+                cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {LIVE_TABLE}")
+                latest = int(cursor.fetchone()[0])
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+                caught_up = self._catch_up_staging(cursor, tickers, high_water - STAGING_CATCHUP_OVERLAP_IDS)
+                conn.commit()
+
+                started = time.perf_counter()
+                cursor.execute(f"LOCK TABLES {LIVE_TABLE} WRITE, {STAGING_TABLE} WRITE")
+                try:
+                    caught_up += self._catch_up_staging(cursor, tickers, latest - STAGING_CATCHUP_OVERLAP_IDS)
+                    conn.commit()
+                    cursor.execute(f"RENAME TABLE {LIVE_TABLE} TO {RETIRED_TABLE}, {STAGING_TABLE} TO {LIVE_TABLE}")
+                finally:
+                    cursor.execute("UNLOCK TABLES")
+                logger.info(f"적재 중 운영 테이블에 쓰인 행 {caught_up}개 반영 "
+                            f"(쓰기 차단 {time.perf_counter() - started:.2f}초)")
+                logger.info(f"테이블 교체 완료 - 이전 데이터는 {RETIRED_TABLE}에 보관 (되돌리려면 --rollback-swap)")
+            finally:
+                cursor.close()
+        self.refresh_summary()
+
+    def rollback_swap(self):
+        """직전 교체 되돌리기 - 보관 테이블을 운영 테이블로, 현재 운영 테이블은 섀도 테이블로"""
+        if self.dry_run:
+            logger.info(f"  DROP TABLE IF EXISTS {STAGING_TABLE}")
+            logger.info(f"  RENAME TABLE {LIVE_TABLE} TO {STAGING_TABLE}, {RETIRED_TABLE} TO {LIVE_TABLE}")
+            logger.info(f"드라이런 - 교체 되돌리기와 {SUMMARY_TABLE} 재구축 생략")
             return
+        with self.db_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+                cursor.execute(f"RENAME TABLE {LIVE_TABLE} TO {STAGING_TABLE}, {RETIRED_TABLE} TO {LIVE_TABLE}")
+                logger.info(f"교체 되돌리기 완료 - 교체됐던 데이터는 {STAGING_TABLE}에 보관")
+            finally:
+                cursor.close()
+        self.refresh_summary()
 
-        conn = self.connect_db()
-        cursor = conn.cursor()
+    def refresh_with_swap(self, batches):
+        """
+        무중단 전체 교체
 
-        insert_query = """
-        INSERT INTO price_candle (ticker, date, open_price, high_price, low_price, close_price, volume, timeframe)
-        VALUES (%(ticker)s, %(date)s, %(open_price)s, %(high_price)s, %(low_price)s, %(close_price)s, %(volume)s, %(timeframe)s)
+        운영 테이블은 그대로 서비스하면서 섀도 테이블에 보조 인덱스 없이 적재하고,
+        적재가 끝나면 인덱스를 한 번에 만든 뒤 검증을 통과했을 때만 RENAME TABLE로
+        교체한다. 읽기 쪽은 교체 전후의 완전한 테이블만 보게 된다. 적재 중 운영 테이블에
+        새로 쓰인 다른 종목 행은 교체 직전에 따라잡는다. 대상 종목 행과 기존 행의 수정,
+        삭제는 반영되지 않는다.
+
+        Args:
+            batches: [(종목 묶음, 시작일, 종료일)]
         """
+        if self.dry_run:
+            for universe, start_date, end_date in batches:
+                self.log_plan(self.plan_universe(universe, start_date, end_date), universe)
+            logger.info(f"드라이런 - {STAGING_TABLE} 적재 및 교체 생략")
+            return
+
+        batches = [batch for batch in batches if batch[0]]
+        tickers = [ticker for universe, _, _ in batches for ticker in universe]
+        if not tickers:
+            logger.warning("교체할 종목이 없습니다")
+            return
+        indexes, high_water = self.prepare_staging_table(tickers)
 
+        # 섀도 테이블은 매번 새로 만들므로 이전 실행의 저널 진행 상황은 쓰지 않는다
+        self._journal_progress = {}
+        self.target_table = STAGING_TABLE
         try:
-            cursor.executemany(insert_query, data)
-            conn.commit()
-            logger.info(f"{data[0]['ticker']} 데이터 {len(data)}개 삽입 완료")
-        except Exception as e:
-            logger.error(f"데이터 삽입 실패: {e}")
-            conn.rollback()
+            for universe, start_date, end_date in batches:
+                self.load_universe(universe, start_date, end_date)
         finally:
-            cursor.close()
-            conn.close()
+            self.target_table = LIVE_TABLE
 
-    def enhance_korean_stocks(self, start_date='2019-01-02', end_date='2024-12-31'):
-        """한국 주요 종목 데이터 보강 - 우선순위에 따른 단계별 처리"""
-        logger.info("한국 주요 종목 데이터 보강 시작")
+        started = time.perf_counter()
+        self._alter_indexes(self._build_indexes, STAGING_TABLE, indexes)
+        logger.info(f"보조 인덱스 {len(indexes)}개 생성 ({time.perf_counter() - started:.2f}초)")
 
-        # 우선순위에 따라 정렬
-        sorted_stocks = sorted(self.korean_stocks.items(), key=lambda x: x[1]['priority'])
+        problems = self.validate_staging_table(batches)
+        if problems:
+            for problem in problems:
+                logger.error(f"  {problem}")
+            raise RuntimeError(f"섀도 테이블 검증 실패 ({len(problems)}건) - 운영 테이블은 변경되지 않음")
 
-        for ticker, info in sorted_stocks:
-            logger.info(f"종목 처리 중 (우선순위 {info['priority']}): {ticker} - {info['name']}")
+        self.swap_staging_table(tickers, high_water)
 
-            try:
-                # 기존 데이터가 충분한지 확인
-                existing_count = self.check_existing_data_count(ticker)
-                if existing_count >= 100:  # 충분한 데이터가 있으면 스킵
-                    logger.info(f"{ticker} 기존 데이터 충분 ({existing_count}개) - 스킵")
-                    continue
+    def _verify_sample_ranges(self, low, high, sample_fraction):
+        """id 범위 [low, high]에서 표본 비율만큼 고른 VERIFY_SAMPLE_BLOCK_ROWS 크기 블록 [(시작 id, 끝 id)]"""
+        blocks = (high - low) // VERIFY_SAMPLE_BLOCK_ROWS + 1
+        chosen = np.random.default_rng().choice(
+            blocks, size=max(1, math.ceil(blocks * sample_fraction)), replace=False)
+        return [(low + int(block) * VERIFY_SAMPLE_BLOCK_ROWS,
+                 low + (int(block) + 1) * VERIFY_SAMPLE_BLOCK_ROWS - 1) for block in sorted(chosen)]
 
-                # 기존 데이터 삭제 (부족한 경우만)
-                if existing_count > 0:
-                    self.clear_existing_data(ticker)
-
-                # 새 데이터 생성 - 더 넓은 기간으로
-                price_data = self.generate_realistic_price_series(
-                    ticker=ticker,
-                    start_date=start_date,
-                    end_date=end_date,
-                    base_price=info['base_price'],
-                    volatility=info['volatility']
-                )
+    def _verify_query(self, tickers=None, id_range=None):
+        """stream_verify 스트리밍 조회와 파라미터 (id 범위를 주면 그 블록만)"""
+        where, params = [], []
+        if tickers is not None:
+            where.append(f"ticker IN ({', '.join(['%s'] * len(tickers))})")
+            params.extend(tickers)
+        if id_range is not None:
+            where.append("id BETWEEN %s AND %s")
+            params.extend(id_range)
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+        # 가격은 x100 정수, 날짜는 epoch 일로 받아 변환 비용을 줄인다
+        return f"""
+            SELECT ticker, timeframe, TO_DAYS(date) - TO_DAYS('1970-01-01'),
+                   CAST(open_price * 100 AS SIGNED), CAST(high_price * 100 AS SIGNED),
+                   CAST(low_price * 100 AS SIGNED), CAST(close_price * 100 AS SIGNED)
+            FROM price_candle
+            {where_sql}
+            ORDER BY id
+        """, tuple(params)
 
-                # 데이터 삽입
-                self.insert_price_data(price_data)
+    def stream_verify(self, tickers=None, sample_fraction=None):
+        """
+        단일 패스 스트리밍 검증
 
-                logger.info(f"{ticker} 완료 - {len(price_data)}개 레코드 생성")
+        서버 측(비버퍼) 커서로 price_candle을 클러스터 키(id) 순으로 한 번만 읽으면서
+        (종목, timeframe)별 통계, 분위수 스케치, 거래일 누락/중복, OHLC 관계 오류를 함께
+        계산한다. 메모리는 종목 수와 기간에만 비례한다.
 
-            except Exception as e:
-                logger.error(f"{ticker} 처리 중 오류 발생: {e}")
-                continue
+        sample_fraction을 주면 id 범위를 VERIFY_SAMPLE_BLOCK_ROWS 크기 블록으로 나눠 그
+        비율만큼의 블록만 읽는다. 읽는 양이 비율에 비례하는 빠른 점검용이며, 행 수와
+        오류 수는 비율로 나눈 추정값이고 거래일 누락 검사는 하지 않는다.
 
-    def enhance_global_etfs(self, start_date='2018-01-01', end_date='2024-12-31'):
-        """글로벌 ETF 데이터 보강"""
-        logger.info("글로벌 ETF 데이터 보강 시작")
+        Returns:
+            dict: {(종목 코드, timeframe): _CandleStats}
+        """
+        if tickers is not None and not tickers:
+            return {}
 
-        for ticker, info in self.global_etfs.items():
-            logger.info(f"ETF 처리 중: {ticker} - {info['name']}")
+        stats = {}
+        with self.db_connection() as conn:
+            ranges = [None]
+            if sample_fraction:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("SELECT MIN(id), MAX(id) FROM price_candle")
+                    low, high = cursor.fetchone()
+                finally:
+                    cursor.close()
+                if low is None:
+                    return {}
+                ranges = self._verify_sample_ranges(low, high, sample_fraction)
 
-            # 기존 데이터 삭제
-            self.clear_existing_data(ticker)
+            for id_range in ranges:
+                cursor = conn.cursor(buffered=False)
+                try:
+                    cursor.execute(*self._verify_query(tickers, id_range))
+                    while True:
+                        rows = cursor.fetchmany(VERIFY_FETCH_ROWS)
+                        if not rows:
+                            break
+                        self._update_candle_stats(stats, rows, track_days=not sample_fraction)
+                finally:
+                    cursor.close()
+        return stats
 
-            # 새 데이터 생성
-            price_data = self.generate_realistic_price_series(
-                ticker=ticker,
-                start_date=start_date,
-                end_date=end_date,
-                base_price=info['base_price'],
-                volatility=info['volatility']
-            )
+    def _update_candle_stats(self, stats, rows, track_days=True):
+        """가져온 행 배치를 (종목, timeframe)별 통계에 반영"""
+        frame = pd.DataFrame(rows, columns=['ticker', 'timeframe', 'day', 'open', 'high', 'low', 'close'])
+        for key, group in frame.groupby(['ticker', 'timeframe'], sort=False):
+            entry = stats.get(key)
+            if entry is None:
+                entry = stats[key] = _CandleStats(track_days=track_days and key[1] == 'DAILY')
+            prices = [group[column].to_numpy(dtype=np.float64) / PRICE_SCALE for column in PRICE_COLUMNS]
+            entry.update(group['day'].to_numpy(dtype=np.int64), *prices)
 
-            # 데이터 삽입
-            self.insert_price_data(price_data)
+    def _log_verification(self, stats, names=None, min_records=None):
+        """스트리밍 검증 결과 출력 - 무결성 오류 종목 수 반환"""
+        scale = 1 / self.verify_sample if self.verify_sample else 1
+        invalid = []
+        for (ticker, timeframe), entry in sorted(stats.items()):
+            label = f"{ticker} ({names.get(ticker, 'Unknown')})" if names is not None else ticker
+            count = round(entry.count * scale)
+            status = ""
+            if min_records is not None and timeframe == 'DAILY':
+                status = ("✅ 충분" if count >= min_records else "❌ 부족") + " - "
+            first, last = entry.date_range()
+            period = f", {first}~{last}" if first else ""
+            logger.info(f"{label} {timeframe}: {status}{count}개 레코드{' (추정)' if self.verify_sample else ''}{period}")
+            logger.info(f"  평균가: {entry.mean:,.0f}, 표준편차: {entry.std:,.0f}")
+            logger.info(f"  최저가: {entry.min:,.0f}, 최고가: {entry.max:,.0f}, "
+                        f"분위수(5/50/95%): {entry.quantile(0.05):,.0f} / {entry.quantile(0.5):,.0f} / "
+                        f"{entry.quantile(0.95):,.0f}")
+            if entry.track_days:
+                missing, runs, longest = entry.gaps()
+                if missing or entry.duplicates:
+                    logger.warning(f"  빠진 거래일 {missing}개 ({runs}개 구간, 최장 {longest}일), 중복 {entry.duplicates}개")
+            if entry.invalid:
+                invalid.append((label, timeframe, round(entry.invalid * scale)))
+            logger.info("")
 
-            logger.info(f"{ticker} 완료")
+        if invalid:
+            logger.error("데이터 무결성 오류 발견:")
+            for label, timeframe, count in invalid:
+                logger.error(f"  {label} {timeframe}: {count}개 잘못된 레코드")
+        return len(invalid)
 
     def verify_data_quality(self):
-        """데이터 품질 검증"""
-        logger.info("데이터 품질 검증 시작")
-
-        conn = self.connect_db()
-        cursor = conn.cursor()
+        """데이터 품질 검증 - 단일 패스 스트리밍"""
+        logger.info("데이터 품질 검증 시작" + (f" (표본 {self.verify_sample:.1%})" if self.verify_sample else ""))
 
         try:
-            # 각 종목별 데이터 통계
-            cursor.execute("""
-                SELECT
-                    ticker,
-                    COUNT(*) as record_count,
-                    MIN(date) as start_date,
-                    MAX(date) as end_date,
-                    AVG(close_price) as avg_price,
-                    STDDEV(close_price) as price_std,
-                    MIN(close_price) as min_price,
-                    MAX(close_price) as max_price
-                FROM price_candle
-                GROUP BY ticker
-                ORDER BY ticker
-            """)
-
-            results = cursor.fetchall()
-
+            stats = self.stream_verify(sample_fraction=self.verify_sample)
             logger.info("=== 데이터 품질 검증 결과 ===")
-            for row in results:
-                ticker, count, start, end, avg_price, std, min_price, max_price = row
-                logger.info(f"{ticker}: {count}개 레코드, {start}~{end}")
-                logger.info(f"  평균가: {avg_price:,.0f}, 표준편차: {std:,.0f}")
-                logger.info(f"  최저가: {min_price:,.0f}, 최고가: {max_price:,.0f}")
-                logger.info("")
-
-            # 데이터 무결성 검증
-            cursor.execute("""
-                SELECT ticker, COUNT(*) as invalid_count
-                FROM price_candle
-                WHERE low_price > high_price
-                   OR close_price > high_price
-                   OR close_price < low_price
-                   OR open_price > high_price
-                   OR open_price < low_price
-                GROUP BY ticker
-            """)
-
-            invalid_data = cursor.fetchall()
-            if invalid_data:
-                logger.error("데이터 무결성 오류 발견:")
-                for ticker, count in invalid_data:
-                    logger.error(f"  {ticker}: {count}개 잘못된 레코드")
-            else:
+            if not self._log_verification(stats):
                 logger.info("✅ 모든 데이터 무결성 검증 통과")
 
         except Exception as e:
             logger.error(f"데이터 품질 검증 실패: {e}")
-        finally:
-            cursor.close()
-            conn.close()
 
     def run_korean_stocks_only(self):
         """한국 종목만 우선 보강 실행"""
@@ -372,10 +3934,14 @@ class PriceDataEnhancer:
 
         try:
             # 한국 주요 종목 보강 (우선순위 기반)
-            self.enhance_korean_stocks()
+            if self.swap:
+                self.refresh_with_swap([(self.korean_stocks, *KOREAN_HISTORY)])
+            else:
+                self.enhance_korean_stocks()
 
             # 한국 종목 데이터 품질 검증
-            self.verify_korean_data_quality()
+            if not self.dry_run:
+                self.verify_korean_data_quality()
 
             logger.info("=== 한국 주요 종목 데이터 보강 완료 ===")
 
@@ -384,96 +3950,718 @@ class PriceDataEnhancer:
             raise
 
     def verify_korean_data_quality(self):
-        """한국 종목 데이터 품질 검증"""
-        logger.info("한국 종목 데이터 품질 검증 시작")
-
-        conn = self.connect_db()
-        cursor = conn.cursor()
+        """한국 종목 데이터 품질 검증 - 단일 패스 스트리밍"""
+        logger.info("한국 종목 데이터 품질 검증 시작" + (f" (표본 {self.verify_sample:.1%})" if self.verify_sample else ""))
 
         try:
-            # 한국 종목별 데이터 통계
-            korean_tickers = "', '".join(self.korean_stocks.keys())
-            cursor.execute(f"""
-                SELECT
-                    ticker,
-                    COUNT(*) as record_count,
-                    MIN(date) as start_date,
-                    MAX(date) as end_date,
-                    AVG(close_price) as avg_price,
-                    MIN(close_price) as min_price,
-                    MAX(close_price) as max_price
-                FROM price_candle
-                WHERE ticker IN ('{korean_tickers}')
-                GROUP BY ticker
-                ORDER BY ticker
-            """)
-
-            results = cursor.fetchall()
-
+            stats = self.stream_verify(list(self.korean_stocks.keys()), sample_fraction=self.verify_sample)
             logger.info("=== 한국 종목 데이터 검증 결과 ===")
-            for row in results:
-                ticker, count, start, end, avg_price, min_price, max_price = row
-                stock_name = self.korean_stocks.get(ticker, {}).get('name', 'Unknown')
-                status = "✅ 충분" if count >= 100 else "❌ 부족"
-                logger.info(f"{ticker} ({stock_name}): {status} - {count}개, {start}~{end}")
-                logger.info(f"  가격범위: {min_price:,.0f} ~ {max_price:,.0f} (평균: {avg_price:,.0f})")
-
-            # 데이터 무결성 검증
-            cursor.execute(f"""
-                SELECT ticker, COUNT(*) as invalid_count
-                FROM price_candle
-                WHERE ticker IN ('{korean_tickers}')
-                  AND (low_price > high_price
-                    OR close_price > high_price
-                    OR close_price < low_price
-                    OR open_price > high_price
-                    OR open_price < low_price)
-                GROUP BY ticker
-            """)
-
-            invalid_data = cursor.fetchall()
-            if invalid_data:
-                logger.error("데이터 무결성 오류 발견:")
-                for ticker, count in invalid_data:
-                    logger.error(f"  {ticker}: {count}개 잘못된 레코드")
-            else:
+            names = {ticker: info['name'] for ticker, info in self.korean_stocks.items()}
+            if not self._log_verification(stats, names=names, min_records=100):
                 logger.info("✅ 모든 한국 종목 데이터 무결성 검증 통과")
 
         except Exception as e:
             logger.error(f"한국 종목 데이터 품질 검증 실패: {e}")
-        finally:
-            cursor.close()
-            conn.close()
 
     def run_full_enhancement(self):
         """전체 데이터 보강 실행"""
         logger.info("=== 주가 데이터 전체 보강 시작 ===")
 
         try:
-            # 한국 주요 종목 보강
-            self.enhance_korean_stocks()
+            if self.swap:
+                # 한국 주요 종목과 글로벌 ETF를 한 섀도 테이블에 적재 후 한 번에 교체
+                self.refresh_with_swap([(self.korean_stocks, *KOREAN_HISTORY),
+                                        (self.global_etfs, *GLOBAL_HISTORY)])
+            else:
+                # 한국 주요 종목 보강
+                self.enhance_korean_stocks()
 
-            # 글로벌 ETF 보강
-            self.enhance_global_etfs()
+                # 글로벌 ETF 보강
+                self.enhance_global_etfs()
 
             # 데이터 품질 검증
-            self.verify_data_quality()
+            if not self.dry_run:
+                self.verify_data_quality()
+
+            logger.info("=== 주가 데이터 보강 완료 ===")
+
+        except Exception as e:
+            logger.error(f"데이터 보강 중 오류 발생: {e}")
+            raise
+
+class AsyncPriceDataEnhancer(PriceDataEnhancer):
+    """
+    asyncio 기반 적재기 (aiomysql)
+
+    데이터 생성은 PriceDataEnhancer와 같고, 삽입은 aiomysql 커넥션 풀에서 최대
+    in_flight개의 배치를 동시에 보낸다. 스레드 없이 한 프로세스에서 여러 연결로
+    DB 쓰기 용량을 채울 수 있다. run_korean_stocks_only, run_full_enhancement는
+    코루틴이라 다른 asyncio 서비스 안에서 그대로 await할 수 있다. DB 작업(삭제, 삽입,
+    요약, 봉 재집계, 검증)은 모두 aiomysql로 하며, 블로킹 드라이버가 필요한 기능
+    (UNSUPPORTED_OPTIONS의 옵션)은 생성 시점에 거부한다.
+
+    Usage:
+        enhancer = AsyncPriceDataEnhancer(seed=42, connections=8, in_flight=16)
+        await enhancer.run_full_enhancement()
+    """
+
+    # 비동기 적재기가 지원하지 않는 옵션 {옵션: (지원하지 않는 값인지 판별, 설명)}
+    UNSUPPORTED_OPTIONS = {
+        'workers': (lambda value: value > 1, '프로세스 풀 생성 (--workers 2 이상)'),
+        'pipeline': (bool, '생성/삽입 파이프라인 (--pipeline)'),
+        'defer_indexes': (bool, '보조 인덱스 지연 생성 (--defer-indexes)'),
+        'incremental': (bool, '증분 보강 (--incremental)'),
+        'write_mode': (lambda value: value == 'sync', '해시 동기화 (--write-mode sync)'),
+        'swap': (bool, '섀도 테이블 교체 (--swap)'),
+        'loader': (lambda value: value == 'infile', 'LOAD DATA 적재 (--loader infile)'),
+        'journal': (lambda value: value is not None, '적재 저널 이어받기 (--journal)'),
+    }
+
+    def __init__(self, *args, connections=4, in_flight=8, **kwargs):
+        unsupported = [description for option, (rejected, description) in self.UNSUPPORTED_OPTIONS.items()
+                       if option in kwargs and rejected(kwargs[option])]
+        if unsupported:
+            raise ValueError(f"비동기 적재기는 다음 기능을 지원하지 않습니다: {', '.join(unsupported)}")
+        super().__init__(*args, **kwargs)
+        if aiomysql is None:
+            raise ImportError("비동기 적재에는 aiomysql 패키지가 필요합니다 (pip install aiomysql)")
+
+        self.connections = max(1, connections)
+        self.in_flight = max(1, in_flight)
+        self._async_pool = None
+        self._summary_async_lock = asyncio.Lock()
+
+    async def _get_async_pool(self):
+        """aiomysql 커넥션 풀 (처음 사용할 때 생성)"""
+        if self._async_pool is None:
+            config = dict(self.db_config)
+            self._async_pool = await aiomysql.create_pool(
+                host=config['host'], port=config['port'], user=config['user'],
+                password=config['password'], db=config['database'], charset=config['charset'],
+                minsize=1, maxsize=self.connections, autocommit=False
+            )
+            logger.info(f"비동기 커넥션 풀 생성 (최대 {self.connections}개, 동시 배치 {self.in_flight}개)")
+        return self._async_pool
+
+    async def close(self):
+        """비동기 커넥션 풀 종료"""
+        if self._async_pool is not None:
+            self._async_pool.close()
+            await self._async_pool.wait_closed()
+            self._async_pool = None
+
+    async def run_and_close(self, coroutine):
+        """보강 외 단독 작업(요약 재구축, 검증) 코루틴을 실행하고 커넥션 풀 종료"""
+        try:
+            return await coroutine
+        finally:
+            await self.close()
+
+    async def _execute(self, query, params=None, fetch=False):
+        """쿼리 하나를 실행하고 커밋 - fetch면 결과 행, 아니면 영향 행 수 반환"""
+        pool = await self._get_async_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    await cursor.execute(query, params)
+                    result = await cursor.fetchall() if fetch else cursor.rowcount
+                    await conn.commit()
+                    return result
+                except Exception:
+                    await conn.rollback()
+                    raise
+
+    async def fetch_inventory_async(self, tickers, start_date, end_date):
+        """fetch_inventory의 비동기 버전 (요약 행 없이 데이터가 있던 종목은 쓰기 전에 요약 재집계)"""
+        if not tickers:
+            return {}
+        rows = await self._execute(*self._inventory_query(tickers, start_date, end_date), fetch=True)
+        inventory = self._inventory_from_rows(rows)
+        if self.summary and inventory and not self.dry_run:
+            await self.ensure_summary_table_async()
+            held = sorted({ticker for ticker, _ in inventory})
+            summarized = await self._execute(f"""
+                SELECT DISTINCT ticker FROM {SUMMARY_TABLE}
+                WHERE ticker IN ({', '.join(['%s'] * len(held))})
+            """, tuple(held), fetch=True)
+            unsummarized = sorted(set(held) - {row[0] for row in summarized})
+            if unsummarized:
+                logger.info(f"{SUMMARY_TABLE}에 없는 기존 데이터 {len(unsummarized)}개 종목 - 요약 재집계")
+                await self.refresh_summary_async(unsummarized)
+        return inventory
+
+    async def ensure_summary_table_async(self):
+        """ensure_summary_table의 비동기 버전"""
+        if self._summary_ready:
+            return
+        async with self._summary_async_lock:
+            if self._summary_ready:
+                return
+            pool = await self._get_async_pool()
+            async with pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    try:
+                        await cursor.execute("""
+                            SELECT COUNT(*) FROM information_schema.tables
+                            WHERE table_schema = DATABASE() AND table_name = %s
+                        """, (SUMMARY_TABLE,))
+                        if not (await cursor.fetchone())[0]:
+                            await cursor.execute(self._summary_table_ddl())
+                            await cursor.execute(*self._summary_aggregate_query())
+                            for statement in self._summary_replace_statements(await cursor.fetchall()):
+                                await cursor.execute(*statement)
+                            await conn.commit()
+                            logger.info(f"{SUMMARY_TABLE} 생성 - 기존 price_candle로 초기화")
+                    except Exception:
+                        await conn.rollback()
+                        raise
+            self._summary_ready = True
+
+    async def refresh_summary_async(self, tickers=None):
+        """refresh_summary의 비동기 버전 - 잠금 없는 집계 후 요약 테이블만 교체"""
+        if not self.summary:
+            return
+        if self.dry_run:
+            target = '전체' if tickers is None else f"{len(tickers)}개 종목"
+            logger.info(f"드라이런 - {SUMMARY_TABLE} {target} 재집계 생략")
+            return
+        try:
+            await self.ensure_summary_table_async()
+            rows = await self._execute(*self._summary_aggregate_query(tickers), fetch=True)
+            pool = await self._get_async_pool()
+            async with pool.acquire() as conn:
+                async with conn.cursor() as cursor:
+                    try:
+                        for statement in self._summary_replace_statements(list(rows), tickers):
+                            await cursor.execute(*statement)
+                        await conn.commit()
+                    except Exception:
+                        await conn.rollback()
+                        raise
+        except Exception as e:
+            logger.error(f"{SUMMARY_TABLE} 갱신 실패 (--rebuild-summary로 재구축 필요): {e}")
+
+    async def flush_summary_async(self):
+        """flush_summary의 비동기 버전"""
+        with self._summary_lock:
+            stale, self._summary_stale = sorted(self._summary_stale), set()
+        if not stale:
+            return
+        for start in range(0, len(stale), SUMMARY_WRITE_ROWS):
+            await self.refresh_summary_async(stale[start:start + SUMMARY_WRITE_ROWS])
+        logger.info(f"{SUMMARY_TABLE} {len(stale)}개 종목 재집계")
+
+    async def clear_existing_data_async(self, ticker):
+        """clear_existing_data의 비동기 버전 - 청크 단위로 나눠 커밋하고 마지막 청크와 함께 종목 요약 삭제"""
+        if self.summary:
+            await self.ensure_summary_table_async()
+        deleted_count = 0
+        chunks = 0
+        complete = False
+        lower = None
+        started = time.perf_counter()
+        try:
+            while True:
+                chunk_rows = min(self.delete_chunk_rows, self.throttle.batch_rows) if self.throttle else self.delete_chunk_rows
+                boundary = await self._execute(*self._delete_boundary_query("ticker = %s", (ticker,), lower, chunk_rows),
+                                               fetch=True)
+                query, params, lower = self._delete_range_statement(
+                    "ticker = %s", (ticker,), lower, boundary[0][0] if boundary else None)
+                chunk_deleted = await self._execute(query, params)
+                deleted_count += chunk_deleted
+                chunks += 1
+                if lower is None:
+                    break
+                if self.throttle:
+                    # 상태 확인과 대기는 블로킹이므로 스레드로 넘긴다
+                    await asyncio.to_thread(self.throttle.after_batch, chunk_deleted)
+
+                if chunks % DELETE_PROGRESS_CHUNKS == 0:
+                    elapsed = max(time.perf_counter() - started, 1e-9)
+                    logger.info(f"  {ticker} 삭제 진행 {deleted_count}개 ({deleted_count / elapsed:,.0f}행/초)")
+                await asyncio.sleep(self.delete_pause)
+            if self.summary:
+                await self._execute(f"DELETE FROM {SUMMARY_TABLE} WHERE ticker = %s", (ticker,))
+            complete = True
+            logger.info(f"{ticker} 기존 데이터 {deleted_count}개 삭제")
+        except Exception as e:
+            logger.error(f"{ticker} 데이터 삭제 실패 ({deleted_count}개까지 삭제됨): {e}")
+        if deleted_count and self.summary and not complete:
+            with self._summary_lock:
+                self._summary_stale.add(ticker)
+
+    async def _read_summary_stored_async(self, cursor, candles, tickers, timeframe='DAILY', replace_range=None):
+        """_read_summary_stored의 비동기 버전"""
+        if not self._summary_tracked() or (len(candles) == 0 and replace_range is None):
+            return None
+        results = []
+        for statement in self._summary_stored_queries(candles, tickers, timeframe, replace_range):
+            await cursor.execute(*statement)
+            results.append(await cursor.fetchall())
+        return tuple(results)
+
+    async def insert_candles_async(self, candles, tickers):
+        """
+        insert_candles의 비동기 버전 - 다중 행 INSERT를 commit_rows마다 커밋
+
+        Returns:
+            int: 커밋된 행 수 (앞에서부터)
+        """
+        if len(candles) == 0:
+            return 0
+
+        if self._max_allowed_packet is None:
+            rows = await self._execute("SELECT @@max_allowed_packet", fetch=True)
+            self._max_allowed_packet = int(rows[0][0])
+        statement_rows = self._statement_rows(None)
+        rows = self.candles_to_rows(candles, tickers)
+        if self.summary:
+            await self.ensure_summary_table_async()
+
+        pool = await self._get_async_pool()
+        committed = 0
+        pending = 0
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    stored = (await self._read_summary_stored_async(cursor, candles, tickers)
+                              if self.write_mode == 'upsert' else None)
+                    start = 0
+                    while start < len(rows):
+                        batch_rows = min(statement_rows, self.throttle.batch_rows) if self.throttle else statement_rows
+                        batch = rows[start:start + batch_rows]
+                        await cursor.execute(self._insert_statement(len(batch)),
+                                             [value for row in batch for value in row])
+                        pending += len(batch)
+                        start += len(batch)
+                        if pending >= self.commit_rows or start >= len(rows):
+                            for statement in self._summary_statements(candles[committed:start], tickers, stored):
+                                await cursor.execute(*statement)
+                            await conn.commit()
+                            committed += pending
+                            if self.throttle:
+                                # 대기는 커밋 뒤에만, 상태 확인과 대기는 블로킹이므로 스레드로 넘긴다
+                                await asyncio.to_thread(self.throttle.after_batch, pending)
+                            pending = 0
+                except Exception as e:
+                    await conn.rollback()
+                    logger.error(f"데이터 삽입 실패 ({committed}/{len(rows)}행까지 커밋됨): {e}")
+        return committed
+
+    async def insert_rollups_async(self, bars, tickers, timeframe, replace_range=None):
+        """write_rollups의 비동기 버전 - 주봉/월봉을 한 트랜잭션으로 upsert"""
+        if len(bars) == 0 and replace_range is None:
+            return 0
+        if self.summary:
+            await self.ensure_summary_table_async()
+        if self._max_allowed_packet is None:
+            rows = await self._execute("SELECT @@max_allowed_packet", fetch=True)
+            self._max_allowed_packet = int(rows[0][0])
+        pool = await self._get_async_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                try:
+                    stored = await self._read_summary_stored_async(cursor, bars, tickers, timeframe, replace_range)
+                    for statement in self._rollup_statements(bars, tickers, timeframe, self._statement_rows(None),
+                                                             replace_range, stored):
+                        await cursor.execute(*statement)
+                    await conn.commit()
+                    return len(bars)
+                except Exception as e:
+                    await conn.rollback()
+                    logger.error(f"{timeframe} 봉 {len(bars)}개 쓰기 실패: {e}")
+                    return 0
+
+    async def refresh_rollups_async(self, ticker, start_date, end_date):
+        """refresh_rollups의 비동기 버전"""
+        if not self.rollups:
+            return
+        bounds, query = self._rollup_refresh_plan(ticker, start_date, end_date)
+        rows = await self._execute(*query, fetch=True)
+        for timeframe, bars, replace_range in self._refreshed_rollups(ticker, bounds, list(rows)):
+            await self.insert_rollups_async(bars, [ticker], timeframe, replace_range=replace_range)
+
+    async def load_universe_async(self, universe, start_date, end_date, clear_existing=()):
+        """
+        load_universe의 비동기 버전
+
+        청크를 생성해 종목별 삽입 태스크로 띄우고, 동시에 진행 중인 배치가 in_flight개에
+        이르면 하나가 끝날 때까지 다음 생성을 미룬다. 생성은 이벤트 루프에서 하므로
+        그동안 이미 보낸 배치는 서버에서 처리된다.
+        """
+        slots = asyncio.Semaphore(self.in_flight)
+        inserted = {}
+        cleared = set()
+        rollup_carry = {}
+        last_day = self._last_trading_day(start_date, end_date)
+
+        async def write(ticker, ticker_candles, tickers):
+            try:
+                count = await self.insert_candles_async(ticker_candles, tickers)
+                inserted[ticker] = inserted.get(ticker, 0) + count
+            except Exception as e:
+                logger.error(f"{ticker} 처리 중 오류 발생: {e}")
+            finally:
+                slots.release()
+
+        async def write_rollups(bars, tickers, timeframe):
+            try:
+                await self.insert_rollups_async(bars, tickers, timeframe)
+            finally:
+                slots.release()
+
+        tasks = []
+        for chunk in self.iter_price_chunks(universe, start_date, end_date, self.chunk_rows):
+            tickers = chunk['tickers']
+            try:
+                candles = self.matrix_to_candles(chunk)
+            except Exception as e:
+                # 검증 실패(--validate reject) 청크만 건너뛰고 나머지 종목과 청크는 계속 적재
+                logger.error(f"{', '.join(tickers)} 처리 중 오류 발생: {e}")
+                for ticker in tickers:
+                    self._mark_failed(ticker)
+                continue
+            for ticker_id, ticker_candles in self._split_by_ticker(candles):
+                ticker = tickers[ticker_id]
+                if ticker in clear_existing and ticker not in cleared:
+                    await self.clear_existing_data_async(ticker)
+                    cleared.add(ticker)
+
+                await slots.acquire()
+                tasks.append(asyncio.create_task(write(ticker, ticker_candles, tickers)))
+            for timeframe, bars in self._rollup_stream(rollup_carry, candles, tickers, last_day):
+                await slots.acquire()
+                tasks.append(asyncio.create_task(write_rollups(bars, tickers, timeframe)))
+            # 생성 사이에 이벤트 루프에 제어권을 넘겨 진행 중인 배치를 처리
+            await asyncio.sleep(0)
+
+        for timeframe, bars, tickers in self._flush_rollups(rollup_carry):
+            await slots.acquire()
+            tasks.append(asyncio.create_task(write_rollups(bars, tickers, timeframe)))
+        await asyncio.gather(*tasks)
+        for ticker, count in inserted.items():
+            logger.info(f"{ticker} 완료 - {count}개 레코드 생성")
+
+    async def execute_plan_async(self, plan, universe, start_date, end_date):
+        """execute_plan의 비동기 버전 (증분 보강과 해시 동기화는 생성 시점에 거부되므로 계획에 없다)"""
+        self.log_plan(plan, universe)
+        if self.dry_run:
+            logger.info("드라이런 - DB 쓰기 생략")
+            return
+
+        def targets(*actions):
+            return {e['ticker']: universe[e['ticker']] for e in plan if e['action'] in actions}
+
+        for ticker in targets('rollup'):
+            await self.refresh_rollups_async(ticker, start_date, end_date)
+
+        load_targets = targets('upsert', 'generate', 'regenerate', 'resume')
+        if load_targets:
+            await self.load_universe_async(load_targets, start_date, end_date,
+                                           clear_existing=set(targets('regenerate')))
+        await self.flush_summary_async()
+
+    async def _enhance_async(self, universe, start_date, end_date, skip_threshold=None):
+        """종목 묶음 계획 수립 후 실행"""
+        inventory = await self.fetch_inventory_async(list(universe.keys()), start_date, end_date)
+        plan = self.plan_universe(universe, start_date, end_date, skip_threshold, inventory=inventory)
+        await self.execute_plan_async(plan, universe, start_date, end_date)
+
+    async def stream_verify_async(self, tickers=None, sample_fraction=None):
+        """stream_verify의 비동기 버전 - aiomysql 서버 측 커서(SSCursor)로 한 번만 읽는다"""
+        if tickers is not None and not tickers:
+            return {}
+
+        stats = {}
+        pool = await self._get_async_pool()
+        async with pool.acquire() as conn:
+            ranges = [None]
+            if sample_fraction:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SELECT MIN(id), MAX(id) FROM price_candle")
+                    low, high = await cursor.fetchone()
+                if low is None:
+                    return {}
+                ranges = self._verify_sample_ranges(low, high, sample_fraction)
+
+            for id_range in ranges:
+                async with conn.cursor(aiomysql.SSCursor) as cursor:
+                    await cursor.execute(*self._verify_query(tickers, id_range))
+                    while True:
+                        rows = await cursor.fetchmany(VERIFY_FETCH_ROWS)
+                        if not rows:
+                            break
+                        self._update_candle_stats(stats, rows, track_days=not sample_fraction)
+            await conn.commit()
+        return stats
+
+    async def verify_data_quality_async(self):
+        """verify_data_quality의 비동기 버전"""
+        logger.info("데이터 품질 검증 시작" + (f" (표본 {self.verify_sample:.1%})" if self.verify_sample else ""))
+
+        try:
+            stats = await self.stream_verify_async(sample_fraction=self.verify_sample)
+            logger.info("=== 데이터 품질 검증 결과 ===")
+            if not self._log_verification(stats):
+                logger.info("✅ 모든 데이터 무결성 검증 통과")
+
+        except Exception as e:
+            logger.error(f"데이터 품질 검증 실패: {e}")
+
+    async def verify_korean_data_quality_async(self):
+        """verify_korean_data_quality의 비동기 버전"""
+        logger.info("한국 종목 데이터 품질 검증 시작" + (f" (표본 {self.verify_sample:.1%})" if self.verify_sample else ""))
+
+        try:
+            stats = await self.stream_verify_async(list(self.korean_stocks.keys()), sample_fraction=self.verify_sample)
+            logger.info("=== 한국 종목 데이터 검증 결과 ===")
+            names = {ticker: info['name'] for ticker, info in self.korean_stocks.items()}
+            if not self._log_verification(stats, names=names, min_records=100):
+                logger.info("✅ 모든 한국 종목 데이터 무결성 검증 통과")
+
+        except Exception as e:
+            logger.error(f"한국 종목 데이터 품질 검증 실패: {e}")
+
+    async def run_korean_stocks_only(self):
+        """한국 종목만 우선 보강 실행 (코루틴)"""
+        logger.info("=== 한국 주요 종목 데이터 보강 시작 (비동기) ===")
+
+        try:
+            sorted_stocks = dict(sorted(self.korean_stocks.items(), key=lambda x: x[1]['priority']))
+            await self._enhance_async(sorted_stocks, *KOREAN_HISTORY, skip_threshold=100)
+
+            if not self.dry_run:
+                await self.verify_korean_data_quality_async()
+
+            logger.info("=== 한국 주요 종목 데이터 보강 완료 ===")
+
+        except Exception as e:
+            logger.error(f"한국 종목 데이터 보강 중 오류 발생: {e}")
+            raise
+        finally:
+            await self.close()
+
+    async def run_full_enhancement(self):
+        """전체 데이터 보강 실행 (코루틴)"""
+        logger.info("=== 주가 데이터 전체 보강 시작 (비동기) ===")
+
+        try:
+            sorted_stocks = dict(sorted(self.korean_stocks.items(), key=lambda x: x[1]['priority']))
+            await self._enhance_async(sorted_stocks, *KOREAN_HISTORY, skip_threshold=100)
+            await self._enhance_async(self.global_etfs, *GLOBAL_HISTORY)
+
+            if not self.dry_run:
+                await self.verify_data_quality_async()
 
             logger.info("=== 주가 데이터 보강 완료 ===")
 
         except Exception as e:
             logger.error(f"데이터 보강 중 오류 발생: {e}")
             raise
+        finally:
+            await self.close()
+
+def _generate_universe_chunk(universe, start_date, end_date, seed, rng_mode, validate='repair'):
+    """프로세스 풀 작업 함수 - 종목 묶음의 캔들 생성과 검증 (구조화 배열로 반환해 전송량 최소화)"""
+    enhancer = PriceDataEnhancer(seed=seed, rng_mode=rng_mode, validate=validate)
+    matrix = enhancer.generate_price_matrix(universe, start_date, end_date)
+    return enhancer.matrix_to_candles(matrix), matrix['tickers']
+
+
+def _generate_ticker_chunk(ticker, info, start_date, end_date, seed, rng_mode, validate, chunk_rows, offset,
+                           state=None):
+    """
+    프로세스 풀 작업 함수 - 긴 기간 종목의 청크 하나 생성과 검증
+
+    Returns:
+        tuple: (캔들, [종목 코드], 다음 청크 작업에 넘길 상태)
+    """
+    enhancer = PriceDataEnhancer(seed=seed, rng_mode=rng_mode, validate=validate, chunk_rows=chunk_rows)
+    date_range = pd.bdate_range(start=start_date, end=end_date)
+    chunk, state = enhancer._ticker_chunk(ticker, info, date_range, offset, chunk_rows, state)
+    return enhancer.matrix_to_candles(chunk), chunk['tickers'], state
+
 
 def main():
     """메인 실행 함수"""
-    enhancer = PriceDataEnhancer()
+    parser = argparse.ArgumentParser(description='주가 데이터 보강 스크립트')
+    parser.add_argument('--full', action='store_true',
+                        help='글로벌 ETF까지 포함한 전체 보강 실행 (기본: 한국 주요 종목만)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='데이터 생성 프로세스 수 (기본: 1)')
+    parser.add_argument('--writers', type=int, default=None,
+                        help='데이터 삽입용 DB 연결 수 (기본: --workers와 동일)')
+    parser.add_argument('--seed', type=int, default=None,
+                        help='난수 시드 (같은 시드면 워커 수, 처리 순서와 관계없이 종목별로 같은 데이터 생성)')
+    parser.add_argument('--tickers', nargs='+', default=None,
+                        help='지정한 종목만 처리 (같은 --seed로 일부 종목만 재생성할 때 사용)')
+    parser.add_argument('--pool-size', type=int, default=None,
+                        help='DB 커넥션 풀 크기 (기본: --writers + 1, 최소 5, 최대 32)')
+    parser.add_argument('--loader', choices=['insert', 'infile'], default='insert',
+                        help='삽입 방식: insert(다중 행 INSERT), infile(메모리 버퍼 기반 LOAD DATA LOCAL INFILE)')
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS,
+                        help=f'다중 행 INSERT 문장당 행 수 (max_allowed_packet 이내로 자동 제한, 기본: {DEFAULT_BATCH_ROWS})')
+    parser.add_argument('--commit-rows', type=int, default=DEFAULT_COMMIT_ROWS,
+                        help=f'커밋 간격(행) - 커밋된 구간은 중간 실패 시에도 유지 (기본: {DEFAULT_COMMIT_ROWS})')
+    parser.add_argument('--write-mode', choices=['replace', 'upsert', 'sync'], default='replace',
+                        help='쓰기 방식: replace(종목 삭제 후 재삽입), upsert(ON DUPLICATE KEY UPDATE로 바뀐 행만 갱신, '
+                             '같은 --seed로 재실행하면 실제 쓰기 없음), sync(월 단위 내용 해시가 다른 월만 다시 씀)')
+    parser.add_argument('--diff-db', default=None, metavar='HOST[:PORT][/DATABASE]',
+                        help='다른 DB와 price_candle 내용 해시 비교만 수행 (계정은 현재 설정과 같게 사용)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='증분 보강: 기존 데이터는 두고 빠진 거래일만 마지막 저장 종가에 이어서 생성')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='종목별 실행 계획(skip/gap_fill/upsert/generate/regenerate)과 예상 행 수만 출력 - '
+                             '--window, --rebuild-summary, --rollback-swap, --restore-indexes도 할 일만 출력')
+    parser.add_argument('--swap', action='store_true',
+                        help=f'무중단 전체 교체: {STAGING_TABLE}에 적재, 검증 후 RENAME TABLE로 교체 '
+                             f'(이전 테이블은 {RETIRED_TABLE}에 보관)')
+    parser.add_argument('--rollback-swap', action='store_true',
+                        help=f'직전 교체 되돌리기 ({RETIRED_TABLE}를 다시 운영 테이블로)')
+    parser.add_argument('--defer-indexes', action='store_true',
+                        help='대량 적재 동안 price_candle 비고유 보조 인덱스를 내리고 적재 후 한 번에 재생성')
+    parser.add_argument('--restore-indexes', action='store_true',
+                        help=f'중단된 --defer-indexes 적재가 내려 둔 보조 인덱스를 {DEFERRED_INDEX_TABLE} 기록대로 재생성')
+    parser.add_argument('--index-report', action='store_true',
+                        help='보조 인덱스별 크기, 삽입 처리량 비용, 중복 여부 보고 (측정용 임시 테이블 사용)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='--workers 1에서도 생성과 삽입을 겹쳐 실행 (--workers 2 이상이면 항상 사용)')
+    parser.add_argument('--queue-depth', type=int, default=None,
+                        help='생성 결과 대기 큐 크기 - 차면 생성이 삽입을 기다림 (기본: --writers x 2)')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='asyncio + aiomysql 적재기 사용 (스레드 없이 여러 배치를 동시에 전송)')
+    parser.add_argument('--connections', type=int, default=4,
+                        help='--async 커넥션 수 (기본: 4)')
+    parser.add_argument('--in-flight', type=int, default=8,
+                        help='--async 동시 전송 배치 수 (기본: 8)')
+    parser.add_argument('--delete-chunk-rows', type=int, default=DEFAULT_DELETE_CHUNK_ROWS,
+                        help=f'기존 데이터 삭제 시 청크당 행 수 - 청크마다 커밋 (기본: {DEFAULT_DELETE_CHUNK_ROWS})')
+    parser.add_argument('--delete-pause', type=float, default=0.0,
+                        help='삭제 청크 사이 대기 시간(초) - 운영 중 조회 부하 완화 (기본: 0)')
+    parser.add_argument('--max-rows-per-sec', type=float, default=None,
+                        help='초당 쓰기 행 수 상한 (지정하면 부하 기반 쓰기 조절 사용)')
+    parser.add_argument('--max-lag', type=float, default=None,
+                        help='복제 지연 상한(초) - 넘으면 배치 축소, 대기 증가 (--replica-host 필요)')
+    parser.add_argument('--replica-host', default=None,
+                        help='복제 지연을 잴 복제 서버 HOST[:PORT] (계정은 원본과 같게 사용)')
+    parser.add_argument('--max-threads-running', type=int, default=32,
+                        help='원본 서버 Threads_running 상한 - 쓰기 조절 사용 시 (기본: 32)')
+    parser.add_argument('--journal', default=None, metavar='PATH|table',
+                        help='적재 진행 저널 (파일 경로 또는 table=price_candle_load_journal) - 중단 후 재실행하면 '
+                             '끝난 종목/청크는 건너뛰고 이어서 적재 (--seed 생략 시 저널의 마지막 시드 사용)')
+    parser.add_argument('--verify-sample', type=float, default=None, metavar='FRACTION',
+                        help='품질 검증을 id 블록 표본(0~1 비율)으로만 수행 - 빠른 점검용 추정치')
+    parser.add_argument('--validate', choices=['repair', 'reject', 'off'], default='repair',
+                        help='삽입 전 캔들 검증: repair(보정 후 삽입), reject(위반 청크 거부), off (기본: repair)')
+    parser.add_argument('--no-summary', dest='summary', action='store_false',
+                        help=f'{SUMMARY_TABLE} 요약 테이블 갱신/조회 생략')
+    parser.add_argument('--no-rollups', dest='rollups', action='store_false',
+                        help='주봉/월봉(WEEKLY/MONTHLY) 집계 적재 생략 - 일봉만 적재')
+    parser.add_argument('--rebuild-summary', action='store_true',
+                        help=f'{SUMMARY_TABLE}를 price_candle 전체로 다시 집계 (다른 경로로 데이터를 바꾼 뒤 사용)')
+    parser.add_argument('--verify-only', action='store_true',
+                        help='데이터 보강 없이 품질 검증만 실행 (--full이면 전체, 아니면 한국 종목)')
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f'청크당 최대 생성 행 수 - 기간이 길어도 메모리 사용량 일정 (기본: {DEFAULT_CHUNK_ROWS})')
+    parser.add_argument('--rng', choices=['stream', 'counter'], default='stream',
+                        help="난수 모드: stream(종목별 순차 스트림), counter(거래일 번호 기반 Philox, 구간 생성 가능)")
+    parser.add_argument('--window', nargs=2, metavar=('START', 'END'), default=None,
+                        help='지정 구간만 생성해 반영 (--rng counter 필요)')
+    args = parser.parse_args()
+
+    if args.window and args.rng != 'counter':
+        parser.error('--window 는 --rng counter 와 함께 사용해야 합니다')
+    if args.verify_sample is not None and not 0 < args.verify_sample <= 1:
+        parser.error('--verify-sample 은 0 초과 1 이하 비율이어야 합니다')
+    if args.max_lag is not None and not args.replica_host:
+        parser.error('--max-lag 는 --replica-host 와 함께 사용해야 합니다')
+    if args.use_async and (args.swap or args.window or args.loader == 'infile' or args.journal or args.workers > 1
+                           or args.pipeline or args.defer_indexes or args.incremental or args.write_mode == 'sync'):
+        parser.error('--async 는 --swap, --window, --loader infile, --journal, --workers 2 이상, --pipeline, '
+                     '--defer-indexes, --incremental, --write-mode sync 와 함께 쓸 수 없습니다')
+    if args.use_async and (args.diff_db or args.rollback_swap or args.restore_indexes or args.index_report):
+        parser.error('--async 는 --diff-db, --rollback-swap, --restore-indexes, --index-report 와 함께 쓸 수 없습니다 '
+                     '(--async 없이 실행)')
+    if args.swap and (args.incremental or args.window or args.write_mode != 'replace'):
+        parser.error('--swap 은 전체 교체 전용이라 --incremental, --window, --write-mode upsert/sync 와 함께 쓸 수 없습니다')
+
+    options = dict(seed=args.seed, workers=args.workers, writers=args.writers,
+                   rng_mode=args.rng, chunk_rows=args.chunk_rows, pool_size=args.pool_size,
+                   loader=args.loader, batch_rows=args.batch_rows, commit_rows=args.commit_rows,
+                   write_mode=args.write_mode, incremental=args.incremental,
+                   dry_run=args.dry_run, swap=args.swap, defer_indexes=args.defer_indexes,
+                   pipeline=args.pipeline, queue_depth=args.queue_depth,
+                   delete_chunk_rows=args.delete_chunk_rows, delete_pause=args.delete_pause,
+                   verify_sample=args.verify_sample, validate=args.validate, summary=args.summary,
+                   rollups=args.rollups)
+    if args.use_async:
+        enhancer = AsyncPriceDataEnhancer(connections=args.connections, in_flight=args.in_flight, **options)
+    else:
+        enhancer = PriceDataEnhancer(**options)
+
+    if args.journal:
+        if args.journal == 'table':
+            enhancer.journal = TableLoadJournal(enhancer.connect_db)
+        else:
+            enhancer.journal = FileLoadJournal(args.journal)
+        # 시드를 지정하지 않으면 저널의 마지막 실행을 이어서 진행
+        if args.seed is None:
+            journal_seed = enhancer.journal.latest_seed()
+            if journal_seed is not None:
+                enhancer.seed = journal_seed
+                logger.info("저널에 기록된 마지막 실행의 시드로 이어서 진행")
+    if args.max_rows_per_sec or args.max_lag is not None:
+        lag_probe = None
+        if args.replica_host:
+            host, _, port = args.replica_host.partition(':')
+            replica_config = dict(enhancer.db_config, host=host, port=int(port or enhancer.db_config['port']))
+            lag_probe = replica_lag_probe(lambda: mysql.connector.connect(**replica_config))
+        # 상태 확인은 커넥션 풀과 별개의 전용 연결로 (풀이 삽입 연결로 다 차도 확인이 막히지 않게)
+        enhancer.throttle = ThrottleController(
+            lambda: mysql.connector.connect(**enhancer.db_config), max_rows_per_sec=args.max_rows_per_sec, max_lag_seconds=args.max_lag,
+            lag_probe=lag_probe, max_threads_running=args.max_threads_running, batch_rows=args.batch_rows)
+    if args.tickers:
+        enhancer.select_tickers(args.tickers)
+    logger.info(f"난수 시드: {enhancer.seed} (재현하려면 --seed {enhancer.seed})")
 
-    # 한국 주요 종목만 우선 처리
-    enhancer.run_korean_stocks_only()
+    if args.diff_db:
+        address, _, database = args.diff_db.partition('/')
+        host, _, port = address.partition(':')
+        other_config = dict(enhancer.db_config, host=host, port=int(port or enhancer.db_config['port']),
+                            database=database or enhancer.db_config['database'])
+        enhancer.diff_databases(other_config, tickers=args.tickers)
+    elif args.rebuild_summary:
+        enhancer.summary = True
+        if args.use_async:
+            asyncio.run(enhancer.run_and_close(enhancer.refresh_summary_async()))
+        else:
+            enhancer.refresh_summary()
+    elif args.verify_only:
+        if args.use_async:
+            asyncio.run(enhancer.run_and_close(enhancer.verify_data_quality_async() if args.full
+                                               else enhancer.verify_korean_data_quality_async()))
+        elif args.full:
+            enhancer.verify_data_quality()
+        else:
+            enhancer.verify_korean_data_quality()
+    elif args.rollback_swap:
+        enhancer.rollback_swap()
+    elif args.restore_indexes:
+        enhancer.restore_deferred_indexes()
+    elif args.index_report:
+        enhancer.report_index_costs()
+    elif args.window:
+        enhancer.materialize_windows(*args.window)
+    elif args.use_async:
+        asyncio.run(enhancer.run_full_enhancement() if args.full else enhancer.run_korean_stocks_only())
+    elif args.full:
+        enhancer.run_full_enhancement()
+    else:
+        # 한국 주요 종목만 우선 처리
+        enhancer.run_korean_stocks_only()
 
-    # 전체 보강이 필요한 경우 아래 주석 해제
-    # enhancer.run_full_enhancement()
+    if enhancer.throttle:
+        enhancer.throttle.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()